@@ -1,41 +1,24 @@
-(* CSV Importer *)
+(* CSV and TSV Importers *)
 
 Begin["System`Convert`TableDump`"]
 
-
-Options[ImportCSV] = {
-    "CharacterEncoding" :> $CharacterEncoding,
-    "FieldSeparators" -> ","
-};
-
-ImportCSV[filename_String, OptionsPattern[]]:=
-    Module[{stream, data, grid, sep = OptionValue["FieldSeparators"]},
-        stream = OpenRead[filename, CharacterEncoding -> OptionValue["CharacterEncoding"]];
-        data = StringSplit[#, sep]& /@ ReadList[stream, String];
-        grid = Grid[data];
-        Close[stream];
-        {
-            "Data" -> data,
-            "Grid" -> grid
-        }
-]
-
-ImportExport`RegisterImport[
-    "CSV",
-    System`Convert`TableDump`ImportCSV,
-    {
-        "Data" :> GetData,
-	    "Grid" :> GetGrid
-    },
+RegisterTableImport[type_, importer_] := ImportExport`RegisterImport[
+    type,
+    importer,
+    {},
     (* Sources -> ImportExport`DefaultSources["Table"], *)
     FunctionChannels -> {"FileNames"},
     AvailableElements -> {"Data", "Grid"},
     DefaultElement -> "Data",
+    PartialAccess -> True,
     Options -> {
         "CharacterEncoding",
-        "FieldSeparators"
+        "FieldSeparators",
+        "HeaderLines"
     }
-]
+];
 
+RegisterTableImport["CSV", System`Convert`TableDump`ImportCSV];
+RegisterTableImport["TSV", System`Convert`TableDump`ImportTSV];
 
 End[]
@@ -0,0 +1,19 @@
+(* JSON Exporter *)
+
+Begin["System`Convert`JSONDump`"]
+
+ImportExport`RegisterExport[
+    "JSON",
+    System`Convert`JSONDump`ExportJSON,
+    FunctionChannels -> {"FileNames"},
+    Options -> {"Compact"}
+]
+
+ImportExport`RegisterExport[
+    "JSONLines",
+    System`Convert`JSONDump`ExportJSONLines,
+    FunctionChannels -> {"FileNames"},
+    Options -> {}
+]
+
+End[]
@@ -6,8 +6,13 @@ from __future__ import print_function
 from __future__ import absolute_import
 from __future__ import division
 
-import time
+import io
+import json
+import os
+import platform
+import sys
 from argparse import ArgumentParser
+from timeit import default_timer
 
 
 try:
@@ -18,11 +23,19 @@ except ImportError:
     median = lambda l: sorted(l)[len(l) // 2]
 
 
+try:
+    import tracemalloc
+except ImportError:     # Python 2
+    tracemalloc = None
+
+
 import mathics
+from mathics import settings
 from mathics.core.parser import parse, MultiLineFeeder, SingleLineFeeder
 from mathics.core.definitions import Definitions
 from mathics.core.evaluation import Evaluation
 
+import six
 from six.moves import map
 from six.moves import range
 
@@ -33,6 +46,43 @@ TESTS_PER_BENCHMARK = None
 # Mathics expressions to benchmark
 BENCHMARKS = {
     'Arithmetic': ['1 + 2', '5 * 3'],
+    'Evaluation': [
+        'Do[x = i^2, {i, 100}]',
+        'Module[{s = 0}, For[i = 1, i <= 100, i++, s += i]; s]',
+        'Nest[1 + 1/# &, 1, 100]',
+        'fib[n_] := If[n < 2, n, fib[n - 1] + fib[n - 2]]; fib[10]',
+        'Table[If[EvenQ[i], i, -i], {i, 200}]'],
+    'Patterns': [
+        'Table[i x, {i, 200}] /. x -> 2',
+        'Cases[Table[f[i, g[i]], {i, 200}], f[_, g[n_?EvenQ]] :> n]',
+        'Range[30] //. {a___, x_, b___, x_, c___} :> {a, x, b, c}',
+        'MatchQ[Range[20], {___, 5, ___, 10, ___}]',
+        'Table[a + b + c + d, {20}] /. (x_ + y_ + d) :> {x, y}',
+        'Expand[(1 + x + y)^6] /. a_. x^k_ + b_. y^k_ :> c[a, b, k]',
+        'Sum[f[i] g[i], {i, 6}] /. f[i_] g[j_] + f[j_] g[i_] /; i != j :> 0',
+        'Sum[a[i], {i, 10}] /. a_ + b_ /; False :> 0',
+        'g[2, Sum[a[i], {i, 10}]] /. g[n_, x_ + y_ /; n > 3] :> 0',
+        'MatchQ[Range[40], {a_, b___, c___, d___} /; a > 1]',
+        'Range[200] /. Dispatch[Table[i -> -i, {i, 200}]]'],
+    'Lists': [
+        'Sort[RandomInteger[1000, 2000]]',
+        'Union[RandomInteger[100, 2000]]',
+        'Tally[RandomInteger[100, 2000]]',
+        'Total[Range[5000]]',
+        'Flatten[Table[{i, {i, i}}, {i, 200}]]',
+        'Transpose[RandomInteger[10, {50, 50}]]'],
+    'Strings': [
+        'StringJoin[Table[ToString[i], {i, 100}]]',
+        'StringSplit[StringJoin[Table["ab cd ", {1000}]]]',
+        'StringReplace[StringJoin[Table["abcabc", {1000}]], "b" -> "x"]',
+        'StringMatchQ["aaaaaaaaaaaaaaaaab", ("a" ..) ~~ "b"]',
+        'StringCases[StringJoin[Table["a1b22c333", {200}]], DigitCharacter ..]'],
+    'LinearAlgebra': [
+        'Inverse[RandomReal[1, {50, 50}]]',
+        'Det[RandomInteger[10, {8, 8}]]',
+        'Eigenvalues[RandomReal[1, {30, 30}]]',
+        'LinearSolve[RandomReal[1, {50, 50}], RandomReal[1, 50]]',
+        'Inverse[RandomInteger[10, {5, 5}]]'],
     'Plot': [
         'Plot[0, {x, -3, 3}]',
         'Plot[x^2 + x + 1, {x, -3, 3}]',
@@ -45,6 +95,11 @@ BENCHMARKS = {
         'Plot3D[Sin[100 x + 100 y ^ 2], {x, 0, 1}, {y, 0, 1}]'],
     'DensityPlot': [
         'DensityPlot[x + y^2, {x, -3, 3}, {y, -2, 2}]'],
+    'Image': [
+        'ImageData[Image[RandomReal[1, {64, 64}]]]',
+        'ImageResize[Image[RandomReal[1, {64, 64}]], 32]',
+        'Blur[Image[RandomReal[1, {64, 64}]], 2]',
+        'ImageAdjust[Image[RandomReal[1, {64, 64}]]]'],
     'Trig': [
         'Sin[RandomReal[]]', 'ArcTan[RandomReal[]]'],
     'Random': [
@@ -62,6 +117,16 @@ BENCHMARKS = {
         'RandomInteger[{0,10}, {10,10}] + RandomInteger[{0,10}, {10,10}]'],
 }
 
+# Mathics expressions whose results are formatted as MathML (boxes_to_xml)
+# and TeX (boxes_to_tex), as the web interface and the documentation do
+FORMAT_BENCHMARKS = [
+    'Table[x^i / (i + 1), {i, 50}]',
+    'Expand[(a + b + c)^8]',
+    'RandomInteger[100, {20, 20}]',
+    'Integrate[Sin[x]^3 Cos[x]^2, x]',
+    'Graphics[Table[Circle[{i, 0}], {i, 20}]]',
+]
+
 DEPTH = 300
 
 PARSING_BENCHMARKS = [
@@ -90,6 +155,28 @@ def format_time_units(seconds):
         return "{0:4.3g} s ".format(seconds)
 
 
+# regressions are reported if the best time or the memory peak of a
+# benchmark grows by more than this percentage over the baseline
+REGRESSION_THRESHOLD = 20
+
+# the results of the benchmarks run so far, see record()
+RESULTS = []
+
+
+def peak_memory(func):
+    # the peak of the memory allocated by an additional call of func, in
+    # bytes. it is measured apart from the timings since tracing slows down
+    # the allocations.
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
 def timeit(func, repeats=None):
     if repeats is None:
         global TESTS_PER_BENCHMARK
@@ -99,29 +186,43 @@ def timeit(func, repeats=None):
     if repeats is not None:
         # Fixed number of repeats
         for i in range(repeats):
-            times.append(time.clock())
+            times.append(default_timer())
             func()
     else:
         # Automatic number of repeats
         repeats = 10000
         for i in range(repeats):
-            times.append(time.clock())
+            times.append(default_timer())
             func()
-            if (i + 1) in (5, 10, 100, 1000, 5000):
-                if times[-1] > times[0] + 1:
+            if (i + 1) in (1, 5, 10, 100, 1000, 5000):
+                if default_timer() > times[0] + 1:
                     repeats = i + 1
                     break
 
-    times.append(time.clock())
+    times.append(default_timer())
 
     times = [times[i+1] - times[i] for i in range(repeats)]
 
-    average_time = format_time_units(mean(times))
-    best_time = format_time_units(min(times))
-    median_time = format_time_units(median(times))
+    result = {
+        'repeats': repeats,
+        'mean': mean(times),
+        'best': min(times),
+        'median': median(times),
+        'peak_memory': peak_memory(func),
+    }
 
     print("    {0:5n} loops, avg: {1}, best: {2}, median: {3} per loop".format(
-        repeats, average_time, best_time, median_time))
+        repeats, format_time_units(result['mean']),
+        format_time_units(result['best']), format_time_units(result['median'])))
+    if result['peak_memory'] is not None:
+        print("    memory peak: {0:.1f} kB".format(result['peak_memory'] / 1024))
+    return result
+
+
+def record(category, name, result):
+    result = dict(result, category=category, name=name)
+    RESULTS.append(result)
+    return result
 
 
 def truncate_line(string):
@@ -132,7 +233,8 @@ def truncate_line(string):
 
 def benchmark_parse(expression_string):
     print("  '{0}'".format(truncate_line(expression_string)))
-    timeit(lambda: parse(definitions, SingleLineFeeder(expression_string)))
+    record('Parser', expression_string, timeit(
+        lambda: parse(definitions, SingleLineFeeder(expression_string))))
 
 
 def benchmark_parse_file(fname):
@@ -142,14 +244,18 @@ def benchmark_parse_file(fname):
         print('install urllib for Combinatorica parsing test')
         return
     print("  '{0}'".format(truncate_line(fname)))
-    with urllib.request.urlopen(fname) as f:
-        code = f.read().decode('utf-8')
+    try:
+        with urllib.request.urlopen(fname) as f:
+            code = f.read().decode('utf-8')
+    except IOError as exc:
+        print("    skipped: {0}".format(exc))
+        return
 
     def do_parse():
         feeder = MultiLineFeeder(code)
         while not feeder.empty():
             parse(definitions, feeder)
-    timeit(do_parse)
+    record('Parser', fname, timeit(do_parse))
 
 
 def benchmark_parser():
@@ -158,24 +264,56 @@ def benchmark_parser():
         benchmark_parse(expression_string)
     benchmark_parse_file(
         'http://www.cs.uiowa.edu/~sriram/Combinatorica/NewCombinatorica.m')
+    print()
 
 
-def benchmark_format(expression_string):
-    print("  '{0}'".format(expression_string))
+def check_messages(expression_string):
+    # benchmarks whose builtins are not available in this installation
+    # (e.g. Image[] without PIL) only give messages. they are skipped.
+    evaluation.out = []
     expr = parse(definitions, SingleLineFeeder(expression_string))
-    timeit(lambda: expr.default_format(evaluation, "FullForm"))
+    result = expr.evaluate(evaluation)
+    messages = [six.text_type(out) for out in evaluation.out if out.is_message]
+    evaluation.out = []
+    if messages:
+        print("    skipped: {0}".format(truncate_line(messages[0])))
+        return None
+    return result
+
+
+def benchmark_format(expression_string):
+    value = check_messages(expression_string)
+    if value is None:
+        return
+    for format in ('xml', 'tex'):
+        print("  {0}: '{1}'".format(format, truncate_line(expression_string)))
+        record('Formatting', '%s: %s' % (format, expression_string), timeit(
+            lambda: evaluation.format_output(value, format)))
 
 
-def benchmark_expression(expression_string):
-    print("  '{0}'".format(expression_string))
+def benchmark_formatting():
+    print("FORMATTING BENCHMARKS:")
+    for expression_string in FORMAT_BENCHMARKS:
+        benchmark_format(expression_string)
+    print()
+
+
+def benchmark_expression(expression_string, category='Expression'):
+    print("  '{0}'".format(truncate_line(expression_string)))
+    if check_messages(expression_string) is None:
+        return
     expr = parse(definitions, SingleLineFeeder(expression_string))
-    timeit(lambda: expr.evaluate(evaluation))
+    record(category, expression_string, timeit(lambda: expr.evaluate(evaluation)))
 
 
 def benchmark_section(section_name):
+    if section_name == 'Parser':
+        return benchmark_parser()
+    elif section_name == 'Formatting':
+        return benchmark_formatting()
     print(section_name)
     for benchmark in BENCHMARKS.get(section_name):
-        benchmark_expression(benchmark)
+        benchmark_expression(benchmark, section_name)
     print()
 
 
@@ -185,6 +323,58 @@ def benchmark_all_sections():
         benchmark_section(section_name)
 
 
+def write_results(filename, stdout=None):
+    # filename - writes to stdout, or sys.stdout if that is not given
+    data = {
+        'mathics': mathics.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': RESULTS,
+    }
+    text = json.dumps(data, indent=1, sort_keys=True)
+    if filename == '-':
+        print(text, file=stdout or sys.stdout)
+    else:
+        directory = os.path.dirname(filename)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with io.open(filename, 'w', encoding='utf-8') as f:
+            f.write(six.text_type(text))
+
+
+def read_results(filename):
+    with io.open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return dict(((result['category'], result['name']), result)
+                for result in data['results'])
+
+
+def compare_results(baseline, threshold):
+    # returns the number of regressions, i.e. benchmarks whose best time or
+    # memory peak grew by more than threshold percent over the baseline
+    regressions = 0
+    print("COMPARISON WITH BASELINE:")
+    for result in RESULTS:
+        old = baseline.get((result['category'], result['name']))
+        if old is None:
+            continue
+        changes = []
+        for key, unit in (('best', 'time'), ('peak_memory', 'memory')):
+            if result.get(key) is None or not old.get(key):
+                continue
+            change = 100. * (result[key] - old[key]) / old[key]
+            regression = change > threshold
+            if regression:
+                regressions += 1
+            changes.append("{0} {1:+.0f}%{2}".format(
+                unit, change, ' REGRESSION' if regression else ''))
+        print("  {0} '{1}': {2}".format(
+            result['category'], truncate_line(result['name']), ', '.join(changes)))
+    print()
+    print("{0} regression(s) beyond {1}%".format(regressions, threshold))
+    return regressions
+
+
 def main():
     global evaluation, TESTS_PER_BENCHMARK
     parser = ArgumentParser(
@@ -212,11 +402,40 @@ def main():
         '--number', '-n', dest="repeat", metavar="REPEAT",
         help="loop REPEAT number of times")
 
+    parser.add_argument(
+        '--json', dest="json", metavar="FILE",
+        help="write the results as JSON to FILE (- for stdout, in which "
+        "case all other output goes to stderr)")
+
+    parser.add_argument(
+        '--save-baseline', dest="save_baseline", metavar="FILE", nargs='?',
+        const=settings.BENCHMARK_BASELINE,
+        help="store the results as baseline in FILE (default: %(const)s)")
+
+    parser.add_argument(
+        '--compare', dest="compare", metavar="FILE", nargs='?',
+        const=settings.BENCHMARK_BASELINE,
+        help="compare the results with the baseline in FILE (default: "
+        "%(const)s) and exit with status 1 if there are regressions")
+
+    parser.add_argument(
+        '--threshold', dest="threshold", metavar="PERCENT", type=float,
+        default=REGRESSION_THRESHOLD,
+        help="report regressions beyond PERCENT (default: %(default)s)")
+
     args = parser.parse_args()
 
     if args.repeat is not None:
         TESTS_PER_BENCHMARK = int(args.repeat)
 
+    # read it first to fail early if it is missing
+    baseline = read_results(args.compare) if args.compare else None
+
+    # keep stdout machine readable if the JSON goes there
+    stdout = sys.stdout
+    if '-' in (args.json, args.save_baseline):
+        sys.stdout = sys.stderr
+
     if args.expression:
         benchmark_expression(args.expression)
     elif args.section:
@@ -225,7 +444,15 @@ def main():
         benchmark_parser()
     else:
         benchmark_all_sections()
+        benchmark_formatting()
         benchmark_parser()
 
+    if args.json:
+        write_results(args.json, stdout)
+    if args.save_baseline:
+        write_results(args.save_baseline, stdout)
+    if baseline is not None and compare_results(baseline, args.threshold):
+        sys.exit(1)
+
 if __name__ == '__main__':
     main()
@@ -4,32 +4,53 @@
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
-from mathics.builtin import (
-    algebra, arithmetic, assignment, attributes, calculus, combinatorial, compilation,
-    comparison, control, datentime, diffeqns, evaluation, exptrig, functional,
-    graphics, graphics3d, image, inout, integer, linalg, lists, logic, manipulate, natlang, numbertheory,
-    numeric, options, patterns, plot, physchemdata, randomnumbers, recurrence,
-    specialfunctions, scoping, strings, structure, system, tensors, xmlformat)
+import importlib
+import threading
 
 from mathics.builtin.base import (
     Builtin, SympyObject, BoxConstruct, Operator, PatternObject)
 
 from mathics.settings import ENABLE_FILES_MODULE
 
-modules = [
-    algebra, arithmetic, assignment, attributes, calculus, combinatorial, compilation,
-    comparison, control, datentime, diffeqns, evaluation, exptrig, functional,
-    graphics, graphics3d, image, inout, integer, linalg, lists, logic, manipulate, natlang, numbertheory,
-    numeric, options, patterns, plot, physchemdata, randomnumbers, recurrence,
-    specialfunctions, scoping, strings, structure, system, tensors, xmlformat]
+module_names = ['mathics.builtin.%s' % name for name in [
+    'algebra', 'arithmetic', 'assignment', 'attributes', 'calculus',
+    'combinatorial', 'compilation', 'comparison', 'control', 'datentime',
+    'diffeqns', 'evaluation', 'exptrig', 'functional', 'graphics',
+    'graphics3d', 'image', 'inout', 'integer', 'linalg', 'lists', 'logic',
+    'manipulate', 'natlang', 'numbertheory', 'numeric', 'options',
+    'parallel', 'patterns', 'plot', 'physchemdata', 'randomnumbers',
+    'recurrence', 'specialfunctions', 'scoping', 'strings', 'structure',
+    'system', 'tensors', 'xmlformat']]
+
+# These modules pull in large optional packages (numpy, PIL, scikit-image,
+# spacy, nltk, llvmlite, ipywidgets) when imported. They are only imported
+# once one of their builtins is actually needed: the builtin definitions
+# snapshot already holds their names, attributes and rules, and the rules
+# load their module when first applied (see BuiltinRule). Anything that
+# needs all builtins calls load_lazy_modules() first.
+lazy_module_names = [
+    'mathics.builtin.compilation', 'mathics.builtin.image',
+    'mathics.builtin.manipulate', 'mathics.builtin.natlang',
+    'mathics.builtin.plot']
 
 if ENABLE_FILES_MODULE:
-    from mathics.builtin import files, importexport
-    modules += [files, importexport]
+    module_names += ['mathics.builtin.files', 'mathics.builtin.importexport',
+                     'mathics.builtin.csvformat']
 
-builtins = []
+modules = []
+builtins = {}
 builtins_by_module = {}
 
+mathics_to_sympy = {}
+sympy_to_mathics = {}
+
+box_constructs = {}
+pattern_objects = {}
+builtins_precedence = {}
+listable_kernels = {}
+
+_load_lock = threading.RLock()
+
 
 def is_builtin(var):
     if var == Builtin:
@@ -38,7 +59,27 @@ def is_builtin(var):
         return any(is_builtin(base) for base in var.__bases__)
     return False
 
-for module in modules:
+
+def add_builtins(new_builtins):
+    for var_name, builtin in new_builtins:
+        name = builtin.get_name()
+        if isinstance(builtin, SympyObject):
+            mathics_to_sympy[name] = builtin
+            for sympy_name in builtin.get_sympy_names():
+                sympy_to_mathics[sympy_name] = builtin
+        if isinstance(builtin, BoxConstruct):
+            box_constructs[name] = builtin
+        if isinstance(builtin, Operator):
+            builtins_precedence[name] = builtin.precedence
+        if isinstance(builtin, PatternObject):
+            pattern_objects[name] = builtin.__class__
+        if hasattr(builtin, 'listable_kernel'):
+            listable_kernels[name] = builtin.listable_kernel
+    builtins.update(dict(new_builtins))
+
+
+def add_module(module):
+    new_builtins = []
     builtins_by_module[module.__name__] = []
     vars = dir(module)
     for name in vars:
@@ -52,38 +93,31 @@ for module in modules:
             instance = var(expression=False)
 
             if isinstance(instance, Builtin):
-                builtins.append((instance.get_name(), instance))
+                new_builtins.append((instance.get_name(), instance))
                 builtins_by_module[module.__name__].append(instance)
 
+    add_builtins(new_builtins)
 
-# builtins = dict(builtins)
+    # keep modules in the order of module_names, whenever they got loaded.
+    modules[:] = [importlib.import_module(name) for name in module_names
+                  if name in builtins_by_module]
 
-mathics_to_sympy = {}
-sympy_to_mathics = {}
 
-box_constructs = {}
-pattern_objects = {}
-builtins_precedence = {}
+def load_module(module_name):
+    if module_name not in builtins_by_module:
+        with _load_lock:
+            if module_name not in builtins_by_module:
+                add_module(importlib.import_module(module_name))
 
 
-def add_builtins(new_builtins):
-    for var_name, builtin in new_builtins:
-        name = builtin.get_name()
-        if isinstance(builtin, SympyObject):
-            mathics_to_sympy[name] = builtin
-            for sympy_name in builtin.get_sympy_names():
-                sympy_to_mathics[sympy_name] = builtin
-        if isinstance(builtin, BoxConstruct):
-            box_constructs[name] = builtin
-        if isinstance(builtin, Operator):
-            builtins_precedence[name] = builtin.precedence
-        if isinstance(builtin, PatternObject):
-            pattern_objects[name] = builtin.__class__
-    builtins.update(dict(new_builtins))
+def load_lazy_modules():
+    for module_name in lazy_module_names:
+        load_module(module_name)
 
-new_builtins = builtins
-builtins = {}
-add_builtins(new_builtins)
+
+for module_name in module_names:
+    if module_name not in lazy_module_names:
+        add_module(importlib.import_module(module_name))
 
 
 def get_module_doc(module):
@@ -104,6 +138,8 @@ def get_module_doc(module):
 
 
 def contribute(definitions):
+    load_lazy_modules()
+
     # let MakeBoxes contribute first
     builtins['System`MakeBoxes'].contribute(definitions)
     for name, item in builtins.items():
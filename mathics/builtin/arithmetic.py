@@ -12,20 +12,57 @@ from __future__ import absolute_import
 
 import sympy
 import mpmath
+import six
 
 from mathics.builtin.base import (
     Builtin, Predefined, BinaryOperator, PrefixOperator, PostfixOperator, Test,
     SympyFunction, SympyConstant)
 
 from mathics.core.expression import (
-    Expression, Number, Integer, Rational, Real, Symbol, Complex, String)
+    Expression, Number, Integer, Rational, Real, MachineReal, Symbol, Complex,
+    String, PackedArray)
 from mathics.core.numbers import (
     min_prec, dps, SpecialValueError)
+from mathics.builtin.numpy_utils import packed_kind, packed_add, packed_multiply, packed_abs, packed_map
 
 from mathics.builtin.lists import _IterationFunction
 from mathics.core.convert import from_sympy
 
 
+def _packed_operands(leaves):
+    # gives the packed arrays and the values of the machine numbers in leaves,
+    # or None if there are other leaves.
+    operands = []
+    for leaf in leaves:
+        packed = leaf.get_packed()
+        if packed is None:
+            if not isinstance(leaf, (Integer, MachineReal)):
+                return None
+            packed = leaf.value
+        operands.append(packed)
+    return operands
+
+
+def _has_machine_reals(leaves):
+    for leaf in leaves:
+        packed = leaf.get_packed()
+        if isinstance(leaf, MachineReal) or (packed is not None and packed_kind(packed) == 'f'):
+            return True
+    return False
+
+
+def _packed_binary(f, leaves):
+    # applies f to two operands, one of them packed and the other one a
+    # packed array of the same shape or a machine number.
+    if len(leaves) != 2:
+        return None
+    operands = _packed_operands(leaves)
+    if operands is not None:
+        result = f(*operands)
+        if result is not None:
+            return PackedArray(result)
+
+
 class _MPMathFunction(SympyFunction):
 
     attributes = ('Listable', 'NumericFunction')
@@ -91,6 +128,35 @@ class _MPMathFunction(SympyFunction):
                     result = Number.from_mpmath(result, d)
         return result
 
+    def listable_kernel(self, leaves, evaluation):
+        # with machine reals, apply() calls mpmath on python floats, which we
+        # do here for all the values in the packed arrays at once. results
+        # that are not machine reals are left to apply().
+        if six.get_method_function(self.apply) is not six.get_unbound_function(_MPMathFunction.apply):
+            return None
+        if len(leaves) != self.nargs:
+            return None
+        mpmath_function = self.get_mpmath_function(leaves)
+        if mpmath_function is None or not _has_machine_reals(leaves):
+            return None
+        operands = _packed_operands(leaves)
+        if operands is None:
+            return None
+
+        def f(*args):
+            return self.call_mpmath_machine(mpmath_function, args)
+
+        result = packed_map(f, *operands)
+        if result is not None:
+            return PackedArray(result)
+
+    def call_mpmath_machine(self, mpmath_function, float_args):
+        # gives the result of call_mpmath as a python float, or None if it
+        # is not a machine real.
+        result = self.call_mpmath(mpmath_function, float_args)
+        if isinstance(result, mpmath.mpf) and not (mpmath.isinf(result) or mpmath.isnan(result)):
+            return float(result)
+
     def call_mpmath(self, mpmath_function, mpmath_args):
         try:
             return mpmath_function(*mpmath_args)
@@ -266,8 +332,8 @@ class Plus(BinaryOperator, SympyFunction):
                     leaves.append(last_item)
                 else:
                     if last_item.has_form('Times', None):
-                        last_item.leaves.insert(0, from_sympy(last_count))
-                        leaves.append(last_item)
+                        leaves.append(Expression(
+                            'Times', from_sympy(last_count), *last_item.leaves))
                     else:
                         leaves.append(Expression(
                             'Times', from_sympy(last_count), last_item))
@@ -327,6 +393,9 @@ class Plus(BinaryOperator, SympyFunction):
             leaves.sort()
             return Expression('Plus', *leaves)
 
+    def listable_kernel(self, leaves, evaluation):
+        return _packed_binary(packed_add, leaves)
+
 
 class Subtract(BinaryOperator):
     """
@@ -590,8 +659,9 @@ class Times(BinaryOperator, SympyFunction):
             elif (leaves and item.has_form('Power', 2) and
                   leaves[-1].has_form('Power', 2) and
                   item.leaves[0].same(leaves[-1].leaves[0])):
-                leaves[-1].leaves[1] = Expression(
-                    'Plus', item.leaves[1], leaves[-1].leaves[1])
+                leaves[-1] = Expression(
+                    'Power', leaves[-1].leaves[0],
+                    Expression('Plus', item.leaves[1], leaves[-1].leaves[1]))
             elif (leaves and item.has_form('Power', 2) and
                   item.leaves[0].same(leaves[-1])):
                 leaves[-1] = Expression(
@@ -626,8 +696,8 @@ class Times(BinaryOperator, SympyFunction):
         elif number.is_zero:
             return number
         elif number.same(Integer(-1)) and leaves and leaves[0].has_form('Plus', None):
-            leaves[0].leaves = [Expression('Times', Integer(-1), leaf)
-                                for leaf in leaves[0].leaves]
+            leaves[0] = Expression('Plus', *[Expression('Times', Integer(-1), leaf)
+                                             for leaf in leaves[0].leaves])
             number = None
 
         for leaf in leaves:
@@ -643,6 +713,9 @@ class Times(BinaryOperator, SympyFunction):
         else:
             return Expression('Times', *leaves)
 
+    def listable_kernel(self, leaves, evaluation):
+        return _packed_binary(packed_multiply, leaves)
+
 
 class Divide(BinaryOperator):
     """
@@ -783,6 +856,12 @@ class Power(BinaryOperator, _MPMathFunction):
 
     #> a ^ b
      = a ^ b
+
+    #> {0., 2., -4.} ^ 0.5
+     = {0., 1.41421, 0. + 2. I}
+    #> {0., 2.} ^ {-1., 3}
+     : Infinite expression 1 / 0. encountered.
+     = {ComplexInfinity, 8.}
     """
 
     operator = '^'
@@ -848,6 +927,11 @@ class Power(BinaryOperator, _MPMathFunction):
         if result is None or result != Symbol('Null'):
             return result
 
+    def call_mpmath_machine(self, mpmath_function, float_args):
+        # leave zero bases to apply_check
+        if float_args[0] != 0:
+            return super(Power, self).call_mpmath_machine(mpmath_function, float_args)
+
 
 class Sqrt(SympyFunction):
     """
@@ -1133,6 +1217,12 @@ class Abs(_MPMathFunction):
     sympy_name = 'Abs'
     mpmath_name = 'fabs'  # mpmath actually uses python abs(x) / x.__abs__()
 
+    def listable_kernel(self, leaves, evaluation):
+        if len(leaves) == 1:
+            result = packed_abs(leaves[0].get_packed())
+            if result is not None:
+                return PackedArray(result)
+
 
 class I(Predefined):
     """
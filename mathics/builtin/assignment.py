@@ -442,6 +442,15 @@ class SetDelayed(Set):
      = p[3]
     >> f[-3]
      = f[-3]
+
+    #> g[1] := a /; False
+    #> g[x_] := b[x]
+    #> g[{1, "c"}] := c
+    #> {g[1], g[2], g[{1, "c"}], g[{1., "c"}]}
+     = {b[1], b[2], c, b[{1., c}]}
+    #> h /: g[h, 2] := d
+    #> {g[h, 2], g[h, 3]}
+     = {d, g[h, 3]}
     """
 
     operator = ':='
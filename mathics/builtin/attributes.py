@@ -328,6 +328,15 @@ class Orderless(Predefined):
     >> SetAttributes[f, Flat]
     >> f[a, b, c] /. f[a, c] -> d
      = f[b, d]
+
+    #> ClearAll[f]; SetAttributes[f, Orderless]
+    #> f[x, 1, g[2], y] /. f[a_, b_g, c_Integer, d__] :> {a, b, c, {d}}
+     = {x, g[2], 1, {y}}
+    #> f[1, 2, g[3], h[4]] /. f[a_, b_, c_h, d_g] :> {a, b, c, d}
+     = {1, 2, h[4], g[3]}
+    #> f[1, 2, g[3]] /. f[a_, b_, c_h] :> {a, b, c}
+     = f[1, 2, g[3]]
+    #> ClearAll[f]
     """
 
 
@@ -215,22 +215,28 @@ class Builtin(object):
 
         return None
 
-    def _get_unavailable_function(self):
+    def _get_missing_package(self):
         requires = getattr(self, 'requires', [])
 
         for package in requires:
             try:
                 importlib.import_module(package)
             except ImportError:
-                def apply(**kwargs):  # will override apply method
-                    kwargs['evaluation'].message(
-                        'General', 'pyimport',  # see inout.py
-                        strip_context(self.get_name()), package)
-
-                return apply
+                return package
 
         return None
 
+    def _get_unavailable_function(self):
+        if self._get_missing_package() is None:
+            return None
+        # a bound method (and not a closure), so rules using it can be pickled
+        return self._apply_unavailable
+
+    def _apply_unavailable(self, **kwargs):  # will override apply method
+        kwargs['evaluation'].message(
+            'General', 'pyimport',  # see inout.py
+            strip_context(self.get_name()), self._get_missing_package())
+
     def get_option_string(self, *params):
         s = self.get_option(*params)
         if isinstance(s, String):
@@ -50,10 +50,39 @@ class Compile(Builtin):
     #> cf[0, -2]
      = 0.5
 
-    Loops and variable assignments are not yet supported
-    >> Compile[{{a, _Integer}, {b, _Integer}}, While[b != 0, {a, b} = {b, Mod[a, b]}]; a]       (* GCD of a, b *)
-     : Expression While[b != 0, {a, b} = {b, Mod[a, b]}] ; a could not be compiled.
-     = Compile[{{a, _Integer}, {b, _Integer}}, While[b != 0, {a, b} = {b, Mod[a, b]}] ; a]
+    Loops, local variables and assignments are supported as well
+    >> cf = Compile[{{a, _Integer}, {b, _Integer}}, While[b != 0, {a, b} = {b, Mod[a, b]}]; a]       (* GCD of a, b *)
+     = CompiledFunction[{a, b}, ..., -CompiledCode-]
+    >> cf[24, 42]
+     = 6
+    >> cf = Compile[{{n, _Integer}}, Module[{s = 0.}, Do[s += 1 / i ^ 2, {i, n}]; s]];
+    >> cf[1000]
+     = 1.64393
+    #> cf = Compile[{{n, _Integer}}, Module[{s = 0}, For[i = 1, i <= n, i++, If[Mod[i, 3] == 0, Continue[]]; If[i > 10, Break[]]; s += i]; s]]
+     : Expression Module[{s = 0}, For[i = 1, i <= n, i++, If[Mod[i, 3] == 0, Continue[]] ; If[i > 10, Break[]] ; s += i] ; s] could not be compiled.
+     = Compile[{{n, _Integer}}, Module[{s = 0}, For[i = 1, i <= n, i++, If[Mod[i, 3] == 0, Continue[]] ; If[i > 10, Break[]] ; s += i] ; s]]
+    #> cf = Compile[{{n, _Integer}}, Module[{s = 0, i}, For[i = 1, i <= n, i++, If[Mod[i, 3] == 0, Continue[]]; If[i > 10, Break[]]; s += i]; s]];
+    #> cf[100]
+     = 37
+
+    Arguments can be vectors or matrices of integers or reals, given by their rank
+    >> Compile[{{v, _Real, 1}}, Module[{w = v}, Do[w[[i]] = w[[i]] ^ 2, {i, Length[w]}]; w]][{1, 2, 3}]
+     = {1., 4., 9.}
+    >> cf = Compile[{{m, _Integer, 2}}, Table[m[[j, i]], {i, Length[m[[1]]]}, {j, Length[m]}]];
+    >> cf[{{1, 2, 3}, {4, 5, 6}}]
+     = {{1, 4}, {2, 5}, {3, 6}}
+    #> cf[{{1, 2}, {3}}]
+     : Invalid argument {{1, 2}, {3}} should be Integer, Real or boolean.
+     = CompiledFunction[{m}, Table[m[[j, i]], {i, Length[m[[1]]]}, {j, Length[m]}], -CompiledCode-][{{1, 2}, {3}}]
+    #> Compile[{{v, _Real, 1}}, Total[v]][{1, 2.5, 3}]
+     = 6.5
+
+    Code failing at runtime is evaluated without compiling it
+    >> cf = Compile[{{v, _Integer, 1}, {i, _Integer}}, v[[i]]];
+    >> cf[{1, 2, 3}, 4]
+     : Compiled code failed: Part specification is out of range.; proceeding with uncompiled evaluation.
+     : Part 4 of {1, 2, 3} does not exist.
+     = {1, 2, 3}[[4]]
     '''
 
     requires = (
@@ -71,7 +100,8 @@ class Compile(Builtin):
 
     def apply(self, vars, expr, evaluation):
         'Compile[vars_, expr_]'
-        from mathics.builtin.compile import _compile, int_type, real_type, bool_type, CompileArg, CompileError
+        from mathics.builtin.compile import (
+            _compile, int_type, real_type, bool_type, tensor_type, CompileArg, CompileError)
 
         # _Complex not implemented
         permitted_types = {
@@ -90,11 +120,16 @@ class Compile(Builtin):
                 symb = var
                 name = symb.get_name()
                 typ = real_type
-            elif var.has_form('List', 2):
-                symb, typ = var.get_leaves()
-                if isinstance(symb, Symbol) and typ in permitted_types:
+            elif var.has_form('List', 2, 3):
+                symb, typ = var.get_leaves()[:2]
+                rank = var.leaves[2].get_int_value() if len(var.leaves) == 3 else 0
+                if isinstance(symb, Symbol) and typ in permitted_types and rank in (0, 1, 2):
                     name = symb.get_name()
                     typ = permitted_types[typ]
+                    if rank > 0:
+                        if typ == bool_type:
+                            return evaluation.message('Compile', 'invar', var)
+                        typ = tensor_type(typ, rank)
                 else:
                     return evaluation.message('Compile', 'invar', var)
             else:
@@ -145,7 +180,7 @@ class CompiledCode(Atom):
         return None
 
     def __hash__(self):
-        return hash(("CompiledCode", ctypes.addressof(self.cfunc)))  # XXX hack
+        return hash(("CompiledCode", id(self.cfunc)))
 
     def atom_to_boxes(self, f, evaluation):
         return Expression('CompiledCodeBox')
@@ -163,12 +198,17 @@ class CompiledCodeBox(BoxConstruct):
 
 
 class CompiledFunction(Builtin):
+    # the compiled expression is kept as it is
+    attributes = ('HoldAll',)
+
     messages = {
         'argerr': 'Invalid argument `1` should be Integer, Real or boolean.',
+        'cfex': 'Compiled code failed: `1`; proceeding with uncompiled evaluation.',
     }
 
     def apply(self, argnames, expr, code, args, evaluation):
         'CompiledFunction[argnames_, expr_, code_CompiledCode][args__]'
+        from mathics.builtin.compile import CompiledRuntimeError, is_tensor_type
 
         argseq = args.get_sequence()
 
@@ -176,17 +216,38 @@ class CompiledFunction(Builtin):
             return
 
         py_args = []
-        for arg in argseq:
-            if isinstance(arg, Integer):
-                py_args.append(arg.get_int_value())
-            elif arg.same(Symbol('True')):
-                py_args.append(True)
-            elif arg.same(Symbol('False')):
-                py_args.append(False)
+        for arg, code_arg in zip(argseq, code.args):
+            if is_tensor_type(code_arg.type):
+                py_args.append(to_tensor(arg, evaluation))
             else:
-                py_args.append(arg.round_to_float(evaluation))
+                py_args.append(to_scalar(arg, evaluation))
         try:
             result = code.cfunc(*py_args)
         except (TypeError, ctypes.ArgumentError):
             return evaluation.message('CompiledFunction', 'argerr', args)
+        except CompiledRuntimeError as exc:
+            evaluation.message('CompiledFunction', 'cfex', String(str(exc)))
+            return Expression(Expression('Function', argnames, expr), *argseq)
         return from_python(result)
+
+
+def to_scalar(arg, evaluation):
+    if isinstance(arg, Integer):
+        return arg.get_int_value()
+    elif arg.same(Symbol('True')):
+        return True
+    elif arg.same(Symbol('False')):
+        return False
+    else:
+        return arg.round_to_float(evaluation)
+
+
+def to_tensor(arg, evaluation):
+    # anything that isn't a rectangular tensor of numbers is rejected when
+    # it's converted to a buffer.
+    if not arg.has_form('List', None):
+        return None
+    if arg.get_packed() is not None:
+        return arg.to_python()
+    return [to_tensor(leaf, evaluation) if leaf.has_form('List', None)
+            else to_scalar(leaf, evaluation) for leaf in arg.leaves]
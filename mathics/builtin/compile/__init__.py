@@ -11,5 +11,5 @@ except ImportError:
 if has_llvmlite:
     from .ir import IRGenerator
     from .compile import _compile
-    from .base import CompileArg, CompileError
+    from .base import CompileArg, CompileError, CompiledRuntimeError
     from .types import *
@@ -6,6 +6,13 @@ class CompileError(Exception):
     pass
 
 
+class CompiledRuntimeError(Exception):
+    '''
+    Raised when compiled code fails, e.g. on a Part that is out of range.
+    '''
+    pass
+
+
 class CompileArg(object):
     def __init__(self, name, type):
         self.name = name
@@ -3,8 +3,10 @@ import llvmlite.binding as llvm
 from llvmlite.llvmpy.core import Type
 from ctypes import CFUNCTYPE
 
-from mathics.builtin.compile.utils import llvm_to_ctype
+from mathics.builtin.compile.utils import llvm_to_ctype, flatten_type
 from mathics.builtin.compile.ir import IRGenerator
+from mathics.builtin.compile.runtime import RuntimeFunction
+from mathics.builtin.compile.types import is_tensor_type
 
 
 # setup llvm for code generation
@@ -36,6 +38,9 @@ def compile_ir(engine, llvm_ir):
     # Create a LLVM module object from the IR
     mod = llvm.parse_assembly(llvm_ir)
     mod.verify()
+    # variables and loops make for lots of loads and stores, which these
+    # optimisations turn into registers.
+    pass_manager.run(mod)
     # Now add the module and make sure it is ready for execution
     engine.add_module(mod)
     engine.finalize_object()
@@ -44,6 +49,11 @@ def compile_ir(engine, llvm_ir):
 
 engine = create_execution_engine()
 
+pass_manager_builder = llvm.create_pass_manager_builder()
+pass_manager_builder.opt_level = 2
+pass_manager = llvm.create_module_pass_manager()
+pass_manager_builder.populate(pass_manager)
+
 
 def _compile(expr, args):
     ir_gen = IRGenerator(expr, args, 'mathics')
@@ -53,7 +63,18 @@ def _compile(expr, args):
     # lookup function pointer
     func_ptr = engine.get_function_address('mathics')
 
+    # tensors are passed as several arguments, tensor results are returned
+    # through a pointer.
+    arg_types = [llvm_to_ctype(t) for arg in args for t in flatten_type(arg.type)]
+    if is_tensor_type(ret_type):
+        restype = None
+        arg_types.append(llvm_to_ctype(ret_type.as_pointer()))
+    else:
+        restype = llvm_to_ctype(ret_type)
+
     # run function via ctypes
-    cfunc = CFUNCTYPE(llvm_to_ctype(ret_type), *(llvm_to_ctype(arg.type) for arg in args))(func_ptr)
+    cfunc = CFUNCTYPE(restype, *arg_types)(func_ptr)
+    if ir_gen.uses_runtime or is_tensor_type(ret_type) or any(
+            is_tensor_type(arg.type) for arg in args):
+        return RuntimeFunction(cfunc, args, ret_type)
     return cfunc
-
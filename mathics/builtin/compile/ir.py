@@ -1,13 +1,18 @@
 from functools import reduce
 import itertools
+import math
 
 from llvmlite import ir
 import ctypes
 
 from mathics.core.expression import Expression, Integer, Symbol, Real, String
-from mathics.builtin.compile.types import int_type, real_type, bool_type, void_type
-from mathics.builtin.compile.utils import pairwise, llvm_to_ctype
+from mathics.builtin.compile.types import (
+    int_type, real_type, bool_type, void_type, null_type, byte_ptr_type,
+    int_vector_type, real_vector_type, tensor_type, is_tensor_type, tensor_rank,
+    tensor_element_type)
+from mathics.builtin.compile.utils import pairwise, llvm_to_ctype, flatten_type
 from mathics.builtin.compile.base import CompileError
+from mathics.builtin.compile import runtime
 
 
 def single_real_arg(f):
@@ -96,6 +101,25 @@ def bool_args(f):
     return wrapped_f
 
 
+class _VariableTypeChanged(Exception):
+    '''
+    A local variable got assigned a real after it had been typed as an
+    integer, the code is generated again with the variable typed as a real.
+    '''
+    pass
+
+
+null_value = ir.Constant(null_type, None)
+
+constants = {
+    'System`True': bool_type(1),
+    'System`False': bool_type(0),
+    'System`Null': null_value,
+    'System`Pi': real_type(math.pi),
+    'System`E': real_type(math.e),
+}
+
+
 class IRGenerator(object):
     def __init__(self, expr, args, func_name):
         self.expr = expr
@@ -104,7 +128,9 @@ class IRGenerator(object):
         self.builder = None
         self._known_ret_type = None
         self._returned_type = None
-        self.lookup_args = None
+        self._variable_types = {}       # types of locals found by previous attempts
+        self.ret_type = None
+        self.uses_runtime = False
 
     def generate_ir(self):
         '''
@@ -113,22 +139,54 @@ class IRGenerator(object):
         # assume that the function returns a real. Note that this is verified by
         # looking at the type of the head of the converted expression.
         ret_type = real_type if self._known_ret_type is None else self._known_ret_type
+        self.ret_type = ret_type
 
         # create an empty module
         module = ir.Module(name=__file__)
 
-        func_type = ir.FunctionType(ret_type, tuple(arg.type for arg in self.args))
+        # tensor arguments are passed as their data pointer followed by their
+        # dimensions, tensor results are stored into an extra last argument.
+        arg_types = [t for arg in self.args for t in flatten_type(arg.type)]
+        if is_tensor_type(ret_type):
+            func_type = ir.FunctionType(void_type, arg_types + [ret_type.as_pointer()])
+        else:
+            func_type = ir.FunctionType(ret_type, arg_types)
 
         # declare a function inside the module
         func = ir.Function(module, func_type, name=self.func_name)
 
         # implement the function
-        block = func.append_basic_block(name='entry')
-        self.builder = ir.IRBuilder(block)
-
-        self.lookup_args = {arg.name: func_arg for arg, func_arg in zip(self.args, func.args)}
-
-        ir_code = self._gen_ir(self.expr)
+        self.entry_block = func.append_basic_block(name='entry')
+        self.builder = ir.IRBuilder(self.entry_block)
+
+        # every variable (arguments, locals of Module etc. and iterators) is
+        # kept on the stack, under a key that is unique to its scope.
+        self.variables = {}     # name -> key
+        self.pointers = {}      # key -> pointer to the value
+        self.arg_keys = set()
+        self.loops = []         # (continue block, break block) of the loops we're in
+        self._next_key = 0
+
+        func_args = iter(func.args)
+        for arg in self.args:
+            if is_tensor_type(arg.type):
+                value = ir.Constant(arg.type, ir.Undefined)
+                for i in range(len(arg.type.elements)):
+                    value = self.builder.insert_value(value, next(func_args), i)
+            else:
+                value = next(func_args)
+            key = self._declare(arg.name, arg.type)
+            self.arg_keys.add(key)
+            self.builder.store(value, self.pointers[key])
+        self.ret_pointer = next(func_args, None)
+
+        try:
+            ir_code = self._gen_ir(self.expr)
+        except _VariableTypeChanged:
+            return self.generate_ir()
+
+        if ir_code.type == null_type:
+            raise CompileError()
 
         # if the return type isn't correct then try again
         if self._known_ret_type is None:
@@ -150,10 +208,16 @@ class IRGenerator(object):
 
         # void handles its own returns
         if ir_code.type != void_type:
-            self.builder.ret(ir_code)
+            self._ret(ir_code)
 
         return str(module), ret_type
 
+    def _ret(self, value):
+        if is_tensor_type(value.type):
+            self.builder.store(value, self.ret_pointer)
+            return self.builder.ret_void()
+        return self.builder.ret(value)
+
     def call_fp_intr(self, name, args, ret_type=real_type):
         '''
         call a LLVM intrinsic floating-point operation
@@ -197,16 +261,94 @@ class IRGenerator(object):
             return self.builder.ret_void()
         return call
 
+    def call_runtime(self, address, ret_type, args):
+        '''
+        calls one of the callbacks in mathics.builtin.compile.runtime
+        '''
+        self.uses_runtime = True
+        func_type = ir.FunctionType(ret_type, [arg.type for arg in args])
+        f = self.builder.inttoptr(int_type(address), func_type.as_pointer())
+        return self.builder.call(f, args)
+
+    def check(self, failed, error):
+        '''
+        returns from the function and reports the runtime error if failed
+        '''
+        builder = self.builder
+        error_block = builder.append_basic_block('error')
+        ok_block = builder.append_basic_block()
+        builder.cbranch(failed, error_block, ok_block)
+
+        builder.position_at_end(error_block)
+        self.call_runtime(runtime.error_address, void_type, [int_type(error)])
+        if is_tensor_type(self.ret_type):
+            builder.ret_void()
+        else:
+            builder.ret(ir.Constant(self.ret_type, None))
+        builder.position_at_end(ok_block)
+
+    def alloc(self, size):
+        '''
+        allocates size bytes, which live until the compiled function returns
+        '''
+        address = self.call_runtime(runtime.alloc_address, int_type, [size])
+        return self.builder.inttoptr(address, byte_ptr_type)
+
+    def _declare(self, name, t=None):
+        '''
+        declares a variable with the given name in the current scope. its
+        type is known once something is assigned to it.
+        '''
+        key = '%s$%d' % (name, self._next_key)
+        self._next_key += 1
+        self.variables[name] = key
+        t = self._variable_types.get(key, t)
+        if t is not None:
+            self._allocate(key, t)
+        return key
+
+    def _allocate(self, key, t):
+        with self.builder.goto_block(self.entry_block):
+            pointer = self.builder.alloca(t)
+            # compiled code never sees uninitialised values
+            self.builder.store(ir.Constant(t, None), pointer)
+        self.pointers[key] = pointer
+        self._variable_types[key] = t
+
+    def _assign(self, key, value):
+        pointer = self.pointers.get(key)
+        if pointer is None:
+            self._allocate(key, value.type)
+            pointer = self.pointers[key]
+        t = pointer.type.pointee
+        if value.type == t:
+            pass
+        elif value.type == int_type and t == real_type:
+            value = self.int_to_real(value)
+        elif value.type == real_type and t == int_type and key not in self.arg_keys:
+            self._variable_types[key] = real_type
+            raise _VariableTypeChanged()
+        else:
+            raise CompileError()
+        self.builder.store(value, pointer)
+        return value
+
     def _gen_ir(self, expr):
         '''
         walks an expression tree and constructs the ir block
         '''
         if isinstance(expr, Symbol):
-            try:
-                arg = self.lookup_args[expr.get_name()]
-            except KeyError:
+            name = expr.get_name()
+            key = self.variables.get(name)
+            if key is None:
+                if name in constants:
+                    return constants[name]
                 raise CompileError()
-            return arg
+            pointer = self.pointers.get(key)
+            if pointer is None:
+                # nothing was assigned to this variable yet
+                raise CompileError()
+            return self.builder.load(pointer)
         elif isinstance(expr, Integer):
             return int_type(expr.get_int_value())
         elif isinstance(expr, Real):
@@ -227,7 +369,7 @@ class IRGenerator(object):
         return method(expr)
 
     def _gen_If(self, expr):
-        if not expr.has_form('If', 3):
+        if not (expr.has_form('If', 2) or expr.has_form('If', 3)):
             raise CompileError()
 
         builder = self.builder
@@ -235,6 +377,8 @@ class IRGenerator(object):
 
         # condition
         cond = self._gen_ir(args[0])
+        if cond.type == void_type:
+            return cond
         if cond.type == int_type:
             cond = self.int_to_bool(cond)
         if cond.type != bool_type:
@@ -247,47 +391,48 @@ class IRGenerator(object):
         # branch to then or else block
         builder.cbranch(cond, then_block, else_block)
 
-        # results for both block
-        with builder.goto_block(then_block):
-            then_result = self._gen_ir(args[1])
-        with builder.goto_block(else_block):
-            else_result = self._gen_ir(args[2])
+        # results for both blocks, together with the blocks they end in
+        results = []
+        for block, leaf in ((then_block, args[1]),
+                            (else_block, args[2] if len(args) == 3 else Symbol('Null'))):
+            builder.position_at_end(block)
+            result = self._gen_ir(leaf)
+            results.append((result, builder.block))
 
         # type check both blocks - determine resulting type
-        if then_result.type == void_type and else_result.type == void_type:
+        if all(result.type == void_type for result, block in results):
             # both blocks terminate so no continuation block
-            return then_result
-        elif then_result.type == else_result.type:
-            ret_type = then_result.type
-        elif then_result.type == int_type and else_result.type == real_type:
-            builder.position_at_end(then_block)
-            then_result = self.int_to_real(then_result)
-            ret_type = real_type
-        elif then_result.type == real_type and else_result.type == int_type:
-            builder.position_at_end(else_block)
-            else_result = self.int_to_real(else_result)
+            return results[0][0]
+        results = [(result, block) for result, block in results
+                   if result.type != void_type]
+        types = set(result.type for result, block in results)
+        if types == set([int_type, real_type]):
+            for i, (result, block) in enumerate(results):
+                if result.type == int_type:
+                    builder.position_at_end(block)
+                    results[i] = (self.int_to_real(result), block)
             ret_type = real_type
-        elif then_result.type == void_type and else_result.type != void_type:
-            ret_type = else_result.type
-        elif then_result.type != void_type and else_result.type == void_type:
-            ret_type = then_result.type
+        elif len(types) == 1:
+            ret_type = results[0][0].type
+        elif null_type in types:
+            ret_type = null_type
         else:
             raise CompileError()
 
         # continuation block
         cont_block = builder.append_basic_block()
-        builder.position_at_start(cont_block)
-        result = builder.phi(ret_type)
 
         # both blocks branch to continuation block (unless they terminate)
-        if then_result.type != void_type:
-            with builder.goto_block(then_block):
-                builder.branch(cont_block)
-            result.add_incoming(then_result, then_block)
-        if else_result.type != void_type:
-            with builder.goto_block(else_block):
-                builder.branch(cont_block)
-            result.add_incoming(else_result, else_block)
+        for result, block in results:
+            builder.position_at_end(block)
+            builder.branch(cont_block)
+
+        builder.position_at_end(cont_block)
+        if ret_type == null_type:
+            return null_value
+        result = builder.phi(ret_type)
+        for value, block in results:
+            result.add_incoming(value, block)
         return result
 
     def _gen_Return(self, expr):
@@ -309,7 +454,7 @@ class IRGenerator(object):
             self._returned_type = arg.type
         else:
             raise CompileError('Conflicting return types {} and {}.'.format(self._returned_type, arg.type))
-        return self.builder.ret(arg)
+        return self._ret(arg)
 
     @int_real_args(1)
     def _gen_Plus(self, args, ret_type):
@@ -595,3 +740,660 @@ class IRGenerator(object):
     @int_args
     def _gen_BitNot(self, args):
         return self.builder.not_(args[0])
+
+    @int_real_args(2)
+    def _gen_Mod(self, args, ret_type):
+        if len(args) != 2:
+            raise CompileError()
+        x, y = args
+        builder = self.builder
+        if ret_type == real_type:
+            # x - y Floor[x / y]
+            quotient = self.call_fp_intr('llvm.floor', [builder.fdiv(x, y)])
+            return builder.fsub(x, builder.fmul(y, quotient))
+        remainder, adjust = self._int_division(x, y)
+        # the result has the sign of y
+        return builder.select(adjust, builder.add(remainder, y), remainder)
+
+    @int_real_args(2)
+    def _gen_Quotient(self, args, ret_type):
+        if len(args) != 2:
+            raise CompileError()
+        x, y = args
+        builder = self.builder
+        if ret_type == real_type:
+            quotient = self.call_fp_intr('llvm.floor', [builder.fdiv(x, y)])
+            return builder.fptosi(quotient, int_type)
+        remainder, adjust = self._int_division(x, y)
+        # rounds towards minus infinity
+        quotient = builder.sdiv(x, y)
+        return builder.select(adjust, builder.sub(quotient, int_type(1)), quotient)
+
+    def _int_division(self, x, y):
+        '''
+        the remainder of x / y (with the sign of x) and whether it has to be
+        adjusted to round towards minus infinity.
+        '''
+        builder = self.builder
+        self.check(builder.icmp_signed('==', y, int_type(0)), 2)
+        remainder = builder.srem(x, y)
+        adjust = builder.and_(
+            builder.icmp_signed('!=', remainder, int_type(0)),
+            builder.icmp_signed('<', builder.xor(remainder, y), int_type(0)))
+        return remainder, adjust
+
+    def _gen_CompoundExpression(self, expr):
+        result = null_value
+        for leaf in expr.get_leaves():
+            result = self._gen_ir(leaf)
+            if result.type == void_type:
+                # no code after a Return etc. is reached
+                break
+        return result
+
+    def _gen_Module(self, expr):
+        leaves = expr.get_leaves()
+        if len(leaves) != 2 or not leaves[0].has_form('List', None):
+            raise CompileError()
+
+        # initial values refer to the variables outside
+        names, values = [], []
+        for var in leaves[0].get_leaves():
+            if var.has_form('Set', 2):
+                var, value = var.get_leaves()
+                value = self._gen_ir(value)
+                if value.type == void_type:
+                    return value
+                if is_tensor_type(value.type):
+                    value = self.copy_tensor(value)
+            else:
+                value = None
+            if not isinstance(var, Symbol):
+                raise CompileError()
+            names.append(var.get_name())
+            values.append(value)
+
+        saved = self.variables.copy()
+        try:
+            for name, value in zip(names, values):
+                key = self._declare(name)
+                if value is not None:
+                    self._assign(key, value)
+            return self._gen_ir(leaves[1])
+        finally:
+            self.variables = saved
+
+    # there's no difference for compiled code
+    _gen_Block = _gen_Module
+    _gen_With = _gen_Module
+
+    def _gen_Set(self, expr):
+        leaves = expr.get_leaves()
+        if len(leaves) != 2:
+            raise CompileError()
+        lhs, rhs = leaves
+
+        if lhs.has_form('List', None):
+            # {a, b} = {b, a} assigns all values at once
+            if not rhs.has_form('List', len(lhs.leaves)):
+                raise CompileError()
+            values = []
+            for leaf in rhs.get_leaves():
+                value = self._gen_ir(leaf)
+                if value.type == void_type:
+                    return value
+                values.append(value)
+            for var, leaf, value in zip(lhs.get_leaves(), rhs.get_leaves(), values):
+                self._assign(self._lookup(var), self._copy_unless_fresh(leaf, value))
+            return null_value
+
+        if lhs.has_form('Part', None):
+            return self._assign_part(lhs, rhs)
+
+        key = self._lookup(lhs)
+        value = self._gen_ir(rhs)
+        if value.type == void_type:
+            return value
+        return self._assign(key, self._copy_unless_fresh(rhs, value))
+
+    def _lookup(self, var):
+        key = self.variables.get(var.get_name()) if isinstance(var, Symbol) else None
+        if key is None:
+            # only locals and arguments can be assigned to
+            raise CompileError()
+        return key
+
+    def _copy_unless_fresh(self, expr, value):
+        # tensors have value semantics, but are passed around by reference.
+        # new tensors don't need another copy.
+        if is_tensor_type(value.type) and expr.get_head_name() not in (
+                'System`Table', 'System`ConstantArray', 'System`List'):
+            return self.copy_tensor(value)
+        return value
+
+    def _gen_AddTo(self, expr):
+        if len(expr.leaves) != 2:
+            raise CompileError()
+        var, value = expr.leaves
+        return self._gen_ir(Expression('Set', var, Expression('Plus', var, value)))
+
+    def _gen_SubtractFrom(self, expr):
+        if len(expr.leaves) != 2:
+            raise CompileError()
+        var, value = expr.leaves
+        return self._gen_ir(Expression('Set', var, Expression(
+            'Plus', var, Expression('Times', Integer(-1), value))))
+
+    def _gen_TimesBy(self, expr):
+        if len(expr.leaves) != 2:
+            raise CompileError()
+        var, value = expr.leaves
+        return self._gen_ir(Expression('Set', var, Expression('Times', var, value)))
+
+    def _gen_DivideBy(self, expr):
+        if len(expr.leaves) != 2:
+            raise CompileError()
+        var, value = expr.leaves
+        return self._gen_ir(Expression('Set', var, Expression(
+            'Times', var, Expression('Power', value, Integer(-1)))))
+
+    def _gen_PreIncrement(self, expr):
+        if len(expr.leaves) != 1:
+            raise CompileError()
+        return self._gen_ir(Expression('AddTo', expr.leaves[0], Integer(1)))
+
+    def _gen_PreDecrement(self, expr):
+        if len(expr.leaves) != 1:
+            raise CompileError()
+        return self._gen_ir(Expression('SubtractFrom', expr.leaves[0], Integer(1)))
+
+    def _gen_Increment(self, expr):
+        if len(expr.leaves) != 1:
+            raise CompileError()
+        old = self._gen_ir(expr.leaves[0])
+        self._gen_ir(Expression('AddTo', expr.leaves[0], Integer(1)))
+        return old
+
+    def _gen_Decrement(self, expr):
+        if len(expr.leaves) != 1:
+            raise CompileError()
+        old = self._gen_ir(expr.leaves[0])
+        self._gen_ir(Expression('SubtractFrom', expr.leaves[0], Integer(1)))
+        return old
+
+    def _gen_condition(self, expr):
+        cond = self._gen_ir(expr)
+        if cond.type == int_type:
+            cond = self.int_to_bool(cond)
+        elif cond.type not in (bool_type, void_type):
+            raise CompileError()
+        return cond
+
+    def _gen_While(self, expr):
+        leaves = expr.get_leaves()
+        if len(leaves) not in (1, 2):
+            raise CompileError()
+
+        builder = self.builder
+        cond_block = builder.append_basic_block('while.cond')
+        body_block = builder.append_basic_block('while.body')
+        end_block = builder.append_basic_block('while.end')
+
+        builder.branch(cond_block)
+        builder.position_at_end(cond_block)
+        cond = self._gen_condition(leaves[0])
+        if cond.type == void_type:
+            return cond
+        builder.cbranch(cond, body_block, end_block)
+
+        builder.position_at_end(body_block)
+        if len(leaves) == 2:
+            self.loops.append((cond_block, end_block))
+            result = self._gen_ir(leaves[1])
+            self.loops.pop()
+        else:
+            result = null_value
+        if result.type != void_type:
+            builder.branch(cond_block)
+
+        builder.position_at_end(end_block)
+        return null_value
+
+    def _gen_For(self, expr):
+        leaves = expr.get_leaves()
+        if len(leaves) not in (3, 4):
+            raise CompileError()
+
+        builder = self.builder
+        start = self._gen_ir(leaves[0])
+        if start.type == void_type:
+            return start
+
+        cond_block = builder.append_basic_block('for.cond')
+        body_block = builder.append_basic_block('for.body')
+        incr_block = builder.append_basic_block('for.incr')
+        end_block = builder.append_basic_block('for.end')
+
+        builder.branch(cond_block)
+        builder.position_at_end(cond_block)
+        cond = self._gen_condition(leaves[1])
+        if cond.type == void_type:
+            return cond
+        builder.cbranch(cond, body_block, end_block)
+
+        builder.position_at_end(body_block)
+        if len(leaves) == 4:
+            self.loops.append((incr_block, end_block))
+            result = self._gen_ir(leaves[3])
+            self.loops.pop()
+        else:
+            result = null_value
+        if result.type != void_type:
+            builder.branch(incr_block)
+
+        builder.position_at_end(incr_block)
+        result = self._gen_ir(leaves[2])
+        if result.type != void_type:
+            builder.branch(cond_block)
+
+        builder.position_at_end(end_block)
+        return null_value
+
+    def _gen_Break(self, expr):
+        if expr.leaves or not self.loops:
+            raise CompileError()
+        return self.builder.branch(self.loops[-1][1])
+
+    def _gen_Continue(self, expr):
+        if expr.leaves or not self.loops:
+            raise CompileError()
+        return self.builder.branch(self.loops[-1][0])
+
+    def _gen_loop(self, count, body):
+        '''
+        generates count iterations of body(k), k = 0, 1, ..., count - 1.
+        '''
+        builder = self.builder
+        with builder.goto_block(self.entry_block):
+            counter = builder.alloca(int_type)
+        builder.store(int_type(0), counter)
+
+        cond_block = builder.append_basic_block('loop.cond')
+        body_block = builder.append_basic_block('loop.body')
+        incr_block = builder.append_basic_block('loop.incr')
+        end_block = builder.append_basic_block('loop.end')
+
+        builder.branch(cond_block)
+        builder.position_at_end(cond_block)
+        k = builder.load(counter)
+        builder.cbranch(builder.icmp_signed('<', k, count), body_block, end_block)
+
+        builder.position_at_end(body_block)
+        self.loops.append((incr_block, end_block))
+        result = body(k)
+        self.loops.pop()
+        if result.type != void_type:
+            builder.branch(incr_block)
+
+        builder.position_at_end(incr_block)
+        builder.store(builder.add(builder.load(counter), int_type(1)), counter)
+        builder.branch(cond_block)
+
+        builder.position_at_end(end_block)
+
+    def _gen_iterator(self, spec):
+        '''
+        generates the bounds of an iterator specification n, {i, n},
+        {i, a, b} or {i, a, b, di}. returns the name of the variable (or None),
+        its first value, its step and the number of iterations.
+        '''
+        builder = self.builder
+        if spec.has_form('List', 2, 3, 4):
+            var = spec.leaves[0]
+            if not isinstance(var, Symbol):
+                raise CompileError()
+            name = var.get_name()
+            bounds = spec.leaves[1:]
+            if len(bounds) == 1:
+                bounds = [Integer(1)] + bounds
+            if len(bounds) == 2:
+                bounds = bounds + [Integer(1)]
+        else:
+            name = None
+            bounds = [Integer(1), spec, Integer(1)]
+
+        values = []
+        for bound in bounds:
+            value = self._gen_ir(bound)
+            if value.type not in (int_type, real_type):
+                raise CompileError()
+            values.append(value)
+        if name is None and values[1].type != int_type:
+            raise CompileError()
+        start, stop, step = values
+
+        if any(value.type == real_type for value in values):
+            start, stop, step = [value if value.type == real_type else self.int_to_real(value)
+                                 for value in values]
+            self.check(builder.fcmp_unordered('==', step, real_type(0.)), 3)
+            count = self.call_fp_intr(
+                'llvm.floor', [builder.fdiv(builder.fsub(stop, start), step)])
+            count = builder.fptosi(count, int_type)
+        else:
+            self.check(builder.icmp_signed('==', step, int_type(0)), 3)
+            difference = builder.sub(stop, start)
+            remainder, adjust = self._int_division(difference, step)
+            count = builder.sdiv(difference, step)
+            count = builder.select(adjust, builder.sub(count, int_type(1)), count)
+        count = builder.add(count, int_type(1))
+        count = builder.select(
+            builder.icmp_signed('<', count, int_type(0)), int_type(0), count)
+        return name, start, step, count
+
+    def _iterator_value(self, start, step, k):
+        builder = self.builder
+        if start.type == real_type:
+            return builder.fadd(start, builder.fmul(step, self.int_to_real(k)))
+        return builder.add(start, builder.mul(step, k))
+
+    def _gen_Do(self, expr):
+        leaves = expr.get_leaves()
+        if len(leaves) < 2:
+            raise CompileError()
+        body, specs = leaves[0], leaves[1:]
+        if len(specs) > 1:
+            # Do[expr, i, j] is Do[Do[expr, j], i]
+            body = Expression('Do', body, *specs[1:])
+
+        name, start, step, count = self._gen_iterator(specs[0])
+        saved = self.variables.copy()
+        try:
+            key = self._declare(name) if name is not None else None
+
+            def loop_body(k):
+                if key is not None:
+                    self._assign(key, self._iterator_value(start, step, k))
+                return self._gen_ir(body)
+
+            self._gen_loop(count, loop_body)
+        finally:
+            self.variables = saved
+        return null_value
+
+    def make_tensor(self, data, element_type, dims):
+        t = tensor_type(element_type, len(dims))
+        tensor = ir.Constant(t, ir.Undefined)
+        data = self.builder.bitcast(data, element_type.as_pointer())
+        tensor = self.builder.insert_value(tensor, data, 0)
+        for i, dim in enumerate(dims):
+            tensor = self.builder.insert_value(tensor, dim, i + 1)
+        return tensor
+
+    def tensor_dims(self, tensor):
+        return [self.builder.extract_value(tensor, i + 1)
+                for i in range(tensor_rank(tensor.type))]
+
+    def tensor_size(self, tensor):
+        return reduce(self.builder.mul, self.tensor_dims(tensor))
+
+    def copy_tensor(self, tensor):
+        builder = self.builder
+        # integers and reals both take 8 bytes
+        size = builder.mul(self.tensor_size(tensor), int_type(8))
+        data = self.alloc(size)
+        source = builder.bitcast(builder.extract_value(tensor, 0), byte_ptr_type)
+        memcpy = builder.module.declare_intrinsic(
+            'llvm.memcpy', [byte_ptr_type, byte_ptr_type, int_type])
+        builder.call(memcpy, [data, source, size, bool_type(0)])
+        return self.make_tensor(
+            data, tensor_element_type(tensor.type), self.tensor_dims(tensor))
+
+    def _gen_Table(self, expr):
+        leaves = expr.get_leaves()
+        if len(leaves) not in (2, 3):
+            raise CompileError()
+        body, specs = leaves[0], leaves[1:]
+
+        # the inner iterator can't depend on the outer one, tensors are
+        # rectangular.
+        if len(specs) == 2 and specs[0].has_form('List', 2, 3, 4) and \
+                specs[1].has_symbol(specs[0].leaves[0].get_name()):
+            raise CompileError()
+
+        iterators = [self._gen_iterator(spec) for spec in specs]
+        counts = [count for name, start, step, count in iterators]
+        size = reduce(self.builder.mul, counts)
+        data = self.alloc(self.builder.mul(size, int_type(8)))
+        element_types = []
+
+        saved = self.variables.copy()
+        try:
+            keys = [self._declare(name) if name is not None else None
+                    for name, start, step, count in iterators]
+
+            def loop_body(depth, index):
+                def generate(k):
+                    name, start, step, count = iterators[depth]
+                    if keys[depth] is not None:
+                        self._assign(keys[depth], self._iterator_value(start, step, k))
+                    if depth == 0:
+                        position = k
+                    else:
+                        position = self.builder.add(
+                            self.builder.mul(index, counts[depth]), k)
+                    if depth + 1 < len(iterators):
+                        self._gen_loop(counts[depth + 1], loop_body(depth + 1, position))
+                        return null_value
+
+                    value = self._gen_ir(body)
+                    if value.type == void_type:
+                        return value
+                    if value.type not in (int_type, real_type):
+                        raise CompileError()
+                    element_types.append(value.type)
+                    pointer = self.builder.bitcast(data, value.type.as_pointer())
+                    self.builder.store(value, self.builder.gep(pointer, [position]))
+                    return value
+                return generate
+
+            self._gen_loop(counts[0], loop_body(0, None))
+        finally:
+            self.variables = saved
+
+        if not element_types:
+            raise CompileError()
+        return self.make_tensor(data, element_types[0], counts)
+
+    def _gen_ConstantArray(self, expr):
+        leaves = expr.get_leaves()
+        if len(leaves) != 2:
+            raise CompileError()
+        value, dims = leaves
+        if dims.has_form('List', 1, 2):
+            dims = dims.leaves
+        else:
+            dims = [dims]
+        return self._gen_ir(Expression(
+            'Table', value, *dims))
+
+    def _gen_List(self, expr):
+        leaves = expr.get_leaves()
+        if not leaves:
+            raise CompileError()
+        values = []
+        for leaf in leaves:
+            value = self._gen_ir(leaf)
+            if value.type == void_type:
+                return value
+            values.append(value)
+
+        builder = self.builder
+        types = set(value.type for value in values)
+        if types <= set([int_type, real_type]):
+            # a vector
+            dims = [int_type(len(values))]
+        elif types <= set([int_vector_type, real_vector_type]):
+            # a matrix, from vectors of the same length
+            dims = [int_type(len(values)), builder.extract_value(values[0], 1)]
+            for value in values[1:]:
+                self.check(builder.icmp_signed(
+                    '!=', builder.extract_value(value, 1), dims[1]), 4)
+        else:
+            raise CompileError()
+
+        if real_type in types or real_vector_type in types:
+            element_type = real_type
+        else:
+            element_type = int_type
+
+        size = int_type(len(values)) if len(dims) == 1 else builder.mul(dims[0], dims[1])
+        data = builder.bitcast(self.alloc(builder.mul(size, int_type(8))),
+                               element_type.as_pointer())
+        for i, value in enumerate(values):
+            if len(dims) == 1:
+                if value.type == int_type and element_type == real_type:
+                    value = self.int_to_real(value)
+                builder.store(value, builder.gep(data, [int_type(i)]))
+            else:
+                row = builder.gep(data, [builder.mul(int_type(i), dims[1])])
+                self._copy_elements(value, row)
+        return self.make_tensor(data, element_type, dims)
+
+    def _copy_elements(self, vector, target):
+        source = self.builder.extract_value(vector, 0)
+
+        def copy(k):
+            value = self.builder.load(self.builder.gep(source, [k]))
+            if value.type != target.type.pointee:
+                value = self.int_to_real(value)
+            self.builder.store(value, self.builder.gep(target, [k]))
+            return value
+
+        self._gen_loop(self.builder.extract_value(vector, 1), copy)
+
+    def _index(self, index, dim):
+        '''
+        converts a part specification (counting from 1, negative ones from the
+        end) to an index counting from 0, checking that it's in range.
+        '''
+        builder = self.builder
+        negative = builder.icmp_signed('<', index, int_type(0))
+        index = builder.select(
+            negative, builder.add(index, dim), builder.sub(index, int_type(1)))
+        # negative indices are huge when compared unsigned
+        self.check(builder.icmp_unsigned('>=', index, dim), 1)
+        return index
+
+    def _part_pointer(self, tensor, indices):
+        '''
+        the pointer to an element or a row of a tensor and the dimension of
+        the row (if any).
+        '''
+        builder = self.builder
+        dims = self.tensor_dims(tensor)
+        indices = [self._index(index, dim) for index, dim in zip(indices, dims)]
+        offset = indices[0]
+        if len(dims) == 2:
+            offset = builder.mul(offset, dims[1])
+            if len(indices) == 2:
+                offset = builder.add(offset, indices[1])
+        pointer = builder.gep(builder.extract_value(tensor, 0), [offset])
+        return pointer, dims[len(indices):]
+
+    def _gen_part_spec(self, expr):
+        leaves = expr.get_leaves()
+        if len(leaves) < 2:
+            raise CompileError()
+        tensor = self._gen_ir(leaves[0])
+        if tensor.type == void_type:
+            return tensor, None
+        if not is_tensor_type(tensor.type) or len(leaves) - 1 > tensor_rank(tensor.type):
+            raise CompileError()
+        indices = []
+        for leaf in leaves[1:]:
+            index = self._gen_ir(leaf)
+            if index.type == void_type:
+                return index, None
+            if index.type != int_type:
+                raise CompileError()
+            indices.append(index)
+        return tensor, indices
+
+    def _gen_Part(self, expr):
+        tensor, indices = self._gen_part_spec(expr)
+        if indices is None:
+            return tensor
+        pointer, dims = self._part_pointer(tensor, indices)
+        if dims:
+            return self.make_tensor(pointer, tensor_element_type(tensor.type), dims)
+        return self.builder.load(pointer)
+
+    def _assign_part(self, lhs, rhs):
+        # only parts of local tensors can be assigned to
+        self._lookup(lhs.leaves[0])
+        tensor, indices = self._gen_part_spec(lhs)
+        if indices is None:
+            return tensor
+        value = self._gen_ir(rhs)
+        if value.type == void_type:
+            return value
+        pointer, dims = self._part_pointer(tensor, indices)
+        element_type = tensor_element_type(tensor.type)
+        if dims:
+            # assigning a row
+            if not is_tensor_type(value.type) or tensor_rank(value.type) != 1 or (
+                    tensor_element_type(value.type) == real_type and element_type == int_type):
+                raise CompileError()
+            self.check(self.builder.icmp_signed(
+                '!=', self.builder.extract_value(value, 1), dims[0]), 4)
+            self._copy_elements(value, pointer)
+            return value
+        if value.type == int_type and element_type == real_type:
+            value = self.int_to_real(value)
+        elif value.type != element_type:
+            raise CompileError()
+        self.builder.store(value, pointer)
+        return value
+
+    def _gen_Length(self, expr):
+        leaves = expr.get_leaves()
+        if len(leaves) != 1:
+            raise CompileError()
+        value = self._gen_ir(leaves[0])
+        if value.type == void_type:
+            return value
+        if is_tensor_type(value.type):
+            return self.builder.extract_value(value, 1)
+        elif value.type in (int_type, real_type):
+            # atoms have no leaves
+            return int_type(0)
+        raise CompileError()
+
+    def _gen_Total(self, expr):
+        leaves = expr.get_leaves()
+        if len(leaves) != 1:
+            raise CompileError()
+        vector = self._gen_ir(leaves[0])
+        if vector.type == void_type:
+            return vector
+        if not is_tensor_type(vector.type) or tensor_rank(vector.type) != 1:
+            raise CompileError()
+
+        builder = self.builder
+        element_type = tensor_element_type(vector.type)
+        with builder.goto_block(self.entry_block):
+            total = builder.alloca(element_type)
+        builder.store(ir.Constant(element_type, None), total)
+        data = builder.extract_value(vector, 0)
+
+        def add(k):
+            value = builder.load(builder.gep(data, [k]))
+            if element_type == real_type:
+                value = builder.fadd(builder.load(total), value)
+            else:
+                value = builder.add(builder.load(total), value)
+            builder.store(value, total)
+            return value
+
+        self._gen_loop(builder.extract_value(vector, 1), add)
+        return builder.load(total)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Support for compiled code that works on tensors.
+
+Compiled code can't allocate memory on its own or raise exceptions, so it
+calls back into python for that. The buffers it allocates live until the
+end of the call, so results are copied out before returning.
+'''
+
+import ctypes
+import threading
+
+import six
+
+from mathics.builtin.compile.base import CompiledRuntimeError
+from mathics.builtin.compile.types import (
+    is_tensor_type, tensor_rank, tensor_element_type)
+from mathics.builtin.compile.utils import llvm_to_ctype
+
+
+errors = {
+    1: 'Part specification is out of range.',
+    2: 'Division by zero.',
+    3: 'Iterator step is zero.',
+    4: 'Tensor dimensions are incompatible.',
+}
+
+_state = threading.local()
+
+
+def _alloc(size):
+    buffer = ctypes.create_string_buffer(max(size, 1))
+    _state.buffers.append(buffer)
+    return ctypes.addressof(buffer)
+
+
+def _error(code):
+    if _state.error is None:
+        _state.error = code
+
+
+# the compiled code calls these by address, so they have to stay alive.
+alloc_callback = ctypes.CFUNCTYPE(ctypes.c_int64, ctypes.c_int64)(_alloc)
+error_callback = ctypes.CFUNCTYPE(None, ctypes.c_int64)(_error)
+
+alloc_address = ctypes.cast(alloc_callback, ctypes.c_void_p).value
+error_address = ctypes.cast(error_callback, ctypes.c_void_p).value
+
+
+def _tensor_struct(rank):
+    class Tensor(ctypes.Structure):
+        _fields_ = [('data', ctypes.c_void_p)] + [
+            ('dim%d' % i, ctypes.c_int64) for i in range(rank)]
+    return Tensor
+
+
+_tensor_structs = {1: _tensor_struct(1), 2: _tensor_struct(2)}
+
+
+def to_buffer(value, t):
+    '''
+    Converts a (nested) list to the arguments passing it as a tensor of type
+    t. Raises TypeError if it doesn't fit.
+    '''
+    ctype = llvm_to_ctype(tensor_element_type(t))
+    if not isinstance(value, (list, tuple)):
+        raise TypeError(value)
+    dims = [len(value)]
+    if tensor_rank(t) == 2:
+        if any(not isinstance(row, (list, tuple)) for row in value):
+            raise TypeError(value)
+        dims.append(len(value[0]) if value else 0)
+        if any(len(row) != dims[1] for row in value):
+            raise TypeError(value)
+        value = [item for row in value for item in row]
+    if ctype is ctypes.c_int64 and any(
+            not isinstance(item, six.integer_types) or isinstance(item, bool) for item in value):
+        # ctypes would truncate reals
+        raise TypeError(value)
+    return [(ctype * len(value))(*value)] + dims
+
+
+def from_buffer(tensor, t):
+    ctype = llvm_to_ctype(tensor_element_type(t))
+    if tensor_rank(t) == 1:
+        dims = [tensor.dim0]
+    else:
+        dims = [tensor.dim0, tensor.dim1]
+    size = 1
+    for dim in dims:
+        size *= dim
+    if size == 0:
+        values = []
+    else:
+        values = list((ctype * size).from_address(tensor.data))
+    if len(dims) == 1:
+        return values
+    return [values[i * dims[1]:(i + 1) * dims[1]] for i in range(dims[0])]
+
+
+class RuntimeFunction(object):
+    '''
+    Calls compiled code that uses tensors or the runtime callbacks. Tensor
+    arguments and results are given as (nested) lists.
+    '''
+
+    def __init__(self, cfunc, args, ret_type):
+        self.cfunc = cfunc
+        self.args = args
+        self.ret_type = ret_type
+
+    def __call__(self, *py_args):
+        if len(py_args) != len(self.args):
+            raise TypeError('expected %d arguments' % len(self.args))
+        c_args = []
+        for arg, value in zip(self.args, py_args):
+            if is_tensor_type(arg.type):
+                c_args.extend(to_buffer(value, arg.type))
+            else:
+                c_args.append(value)
+        out = None
+        if is_tensor_type(self.ret_type):
+            out = _tensor_structs[tensor_rank(self.ret_type)]()
+            c_args.append(ctypes.addressof(out))
+
+        saved = getattr(_state, 'buffers', None), getattr(_state, 'error', None)
+        _state.buffers, _state.error = [], None
+        try:
+            result = self.cfunc(*c_args)
+            if _state.error is not None:
+                raise CompiledRuntimeError(errors[_state.error])
+            if out is not None:
+                result = from_buffer(out, self.ret_type)
+        finally:
+            _state.buffers, _state.error = saved
+        return result
@@ -7,3 +7,36 @@ int_type = ir.IntType(64)
 real_type = ir.DoubleType()
 bool_type = ir.IntType(1)
 void_type = ir.VoidType()
+byte_ptr_type = ir.IntType(8).as_pointer()
+
+# the type of statements like loops and assignments to lists, which don't
+# give a value that could be used in compiled code.
+null_type = ir.LiteralStructType([])
+
+
+def tensor_type(element_type, rank):
+    '''
+    A rank 1 or 2 tensor of integers or reals, passed around as a pointer to
+    its elements (in row-major order) followed by its dimensions.
+    '''
+    return ir.LiteralStructType([element_type.as_pointer()] + [int_type] * rank)
+
+
+int_vector_type = tensor_type(int_type, 1)
+real_vector_type = tensor_type(real_type, 1)
+int_matrix_type = tensor_type(int_type, 2)
+real_matrix_type = tensor_type(real_type, 2)
+
+tensor_types = (int_vector_type, real_vector_type, int_matrix_type, real_matrix_type)
+
+
+def is_tensor_type(t):
+    return t in tensor_types
+
+
+def tensor_rank(t):
+    return len(t.elements) - 1
+
+
+def tensor_element_type(t):
+    return t.elements[0].pointee
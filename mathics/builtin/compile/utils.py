@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from mathics.builtin.compile.types import int_type, real_type, bool_type, void_type
+from mathics.builtin.compile.types import int_type, real_type, bool_type, void_type, is_tensor_type
+from llvmlite import ir
 from ctypes import c_int64, c_double, c_bool, c_void_p
 
 
@@ -27,7 +28,14 @@ def llvm_to_ctype(t):
         return c_double
     elif t == bool_type:
         return c_bool
-    elif t == void_type:
+    elif t == void_type or isinstance(t, ir.PointerType):
         return c_void_p
     else:
         raise TypeError(t)
+
+
+def flatten_type(t):
+    'the types of the arguments passing a value of type t'
+    if is_tensor_type(t):
+        return list(t.elements)
+    return [t]
@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+CSV and TSV
+"""
+
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import csv
+import io
+import math
+import re
+import six
+
+from itertools import islice
+
+from mathics.builtin.base import Builtin
+from mathics.builtin.importexport import PartSpec
+from mathics.builtin.numpy_utils import packed_buffer, packed_from_buffer
+from mathics.builtin.strings import to_python_encoding
+from mathics.core.expression import (
+    Expression, Integer, MachineReal, PackedArray, String, Symbol)
+
+
+# the first group matches integers
+_number_cell = re.compile(r'\s*[+-]?(?:(\d+)|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)\s*$')
+
+
+def _parse_cell(text):
+    match = _number_cell.match(text)
+    if match is None:
+        return text
+    if match.group(1) is not None:
+        return int(text)
+    value = float(text)
+    if math.isinf(value) or math.isnan(value):
+        return text
+    return value
+
+
+# rows of integers only or of reals only, with the cells joined by \x00
+_integer_row = re.compile(r'{0}(?:\x00{0})*\Z'.format(r'\s*[+-]?\d+\s*'))
+_real_row = re.compile(r'{0}(?:\x00{0})*\Z'.format(
+    r'\s*[+-]?(?:(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?|\d+[eE][+-]?\d+)\s*'))
+
+
+def _parse_row(cells):
+    # gives the values of the cells together with their packed kind (see
+    # _packed_kind). rows of numbers of one kind are converted in one go.
+    text = '\x00'.join(cells)
+    try:
+        if _integer_row.match(text):
+            return list(map(int, cells)), 'i'
+        elif _real_row.match(text):
+            values = list(map(float, cells))
+            # the sum is only infinite or nan if a value is (or if it
+            # overflows, in which case the cells are looked at one by one)
+            total = sum(values)
+            if not (math.isinf(total) or math.isnan(total)):
+                return values, 'f'
+    except ValueError:  # a cell containing \x00
+        pass
+    values = [_parse_cell(cell) for cell in cells]
+    return values, _packed_kind(values) if values else None
+
+
+def _packed_kind(values):
+    # 'i' or 'f' if values are all python ints or all floats
+    if all(type(value) in six.integer_types for value in values):
+        return 'i'
+    if all(type(value) is float for value in values):
+        return 'f'
+    return None
+
+
+def _pack(values):
+    # packs a row or a rectangular list of rows of numbers of one kind
+    from mathics.builtin.numpy_utils import pack
+
+    if not values:
+        return None
+    if isinstance(values[0], list):
+        width = len(values[0])
+        if width == 0 or any(not isinstance(row, list) or len(row) != width for row in values):
+            return None
+        kinds = set(_packed_kind(row) for row in values)
+        if len(kinds) != 1:
+            return None
+        kind = kinds.pop()
+    else:
+        kind = _packed_kind(values)
+    if kind is None:
+        return None
+    packed = pack(values, kind)
+    if packed is None:
+        return None
+    return PackedArray(packed)
+
+
+def _to_expression(value, now):
+    # now is the timestamp of the definitions. the Lists of atoms built here
+    # are marked as evaluated, so that the evaluation of big tables does not
+    # need to look at each of their rows again.
+    if isinstance(value, list):
+        packed = _pack(value)
+        if packed is not None:
+            return packed
+        expr = Expression('List', *[_to_expression(item, now) for item in value])
+        if not value or not isinstance(value[0], list):
+            expr.last_evaluated = now
+        return expr
+    elif isinstance(value, float):
+        return MachineReal(value)
+    elif isinstance(value, six.integer_types):
+        return Integer(value)
+    else:
+        return String(value)
+
+
+class _TableBuilder(object):
+    """
+    Builds the expression of a table from its rows, which are added one by
+    one as they are read. As long as all rows are numbers of one kind and
+    of the same length, their values go into one packed buffer. Once a row
+    does not fit, the rows read so far and all further ones become row
+    expressions right away instead. Either way, the table never exists as
+    python lists of its values.
+    """
+
+    def __init__(self, now):
+        self.now = now          # see _to_expression
+        self.kind = None
+        self.width = None
+        self.buffer = None      # the values of the packed rows
+        self.count = 0          # the number of packed rows
+        self.rows = None        # the row expressions, if the table is not packed
+
+    def add(self, values, kind):
+        # kind is the packed kind of values, if any
+        if self.rows is None:
+            if kind is not None and (self.count == 0 or (kind == self.kind and len(values) == self.width)):
+                try:
+                    row = packed_buffer(kind, values)
+                except OverflowError:
+                    pass
+                else:
+                    if self.count == 0:
+                        self.kind, self.width, self.buffer = kind, len(values), row
+                    else:
+                        self.buffer.extend(row)
+                    self.count += 1
+                    return
+            self._unpack()
+        self.rows.append(_to_expression(values, self.now))
+
+    def _unpack(self):
+        width = self.width
+        self.rows = [PackedArray(packed_from_buffer(self.buffer[i * width:(i + 1) * width], (width,)))
+                     for i in range(self.count)]
+        self.buffer = None
+        self.count = 0
+
+    def get_expression(self):
+        if self.rows is None and self.count:
+            packed = packed_from_buffer(self.buffer, (self.count, self.width))
+            if packed is not None:
+                return PackedArray(packed)
+            self._unpack()
+        if self.rows is None:
+            return _to_expression([], self.now)
+        return Expression('List', *self.rows)
+
+
+def _split_rows(lines, separators):
+    # no quoting for multi-character or several separators
+    pattern = re.compile('|'.join(
+        re.escape(sep) for sep in sorted(separators, key=len, reverse=True)))
+    for line in lines:
+        line = line.rstrip('\r\n')
+        yield pattern.split(line) if line else []
+
+
+def _read_rows(f, separators):
+    if len(separators) == 1 and len(separators[0]) == 1:
+        sep = separators[0]
+        if six.PY2:
+            # the csv module of python 2 only reads byte strings
+            if len(sep.encode('utf-8')) == 1:
+                reader = csv.reader((line.encode('utf-8') for line in f),
+                                    delimiter=sep.encode('utf-8'))
+                return ([cell.decode('utf-8') for cell in row] for row in reader)
+        else:
+            return csv.reader(f, delimiter=sep)
+    return _split_rows(f, separators)
+
+
+def _format_real(value):
+    # the shortest representation that reads back as the same machine real,
+    # e.g. 1. or 2.5e-20
+    text = repr(value)
+    if 'e' in text:
+        mantissa, exponent = text.split('e')
+        if '.' not in mantissa:
+            mantissa += '.'
+        return '%se%d' % (mantissa, int(exponent))
+    if text.endswith('.0'):
+        return text[:-1]
+    return text
+
+
+def _quote(cell, sep):
+    if sep in cell or '"' in cell or '\n' in cell or '\r' in cell:
+        return '"%s"' % cell.replace('"', '""')
+    return cell
+
+
+class _TableFormat(Builtin):
+    context = 'System`Convert`TableDump`'
+
+    # messages are given as messages of Import and Export, respectively
+    caller = None
+
+    def _encoding(self, options, evaluation):
+        encoding = self.get_option(options, 'CharacterEncoding', evaluation)
+        py_encoding = None
+        if isinstance(encoding, String):
+            py_encoding = to_python_encoding(encoding.get_string_value())
+        if py_encoding is None:
+            evaluation.message('General', 'charcode', encoding)
+        return py_encoding
+
+    def _separators(self, options, evaluation):
+        value = self.get_option(options, 'FieldSeparators', evaluation)
+        if value.has_form('List', 1, None):
+            separators = [leaf.get_string_value() for leaf in value.leaves]
+        else:
+            separators = [value.get_string_value()]
+        if not all(separators):
+            evaluation.message(self.caller, 'fsep', value)
+            return None
+        return separators
+
+
+class ImportCSV(_TableFormat):
+    """
+    <dl>
+    <dt>'System`Convert`TableDump`ImportCSV["$file$"]'
+      <dd>reads the CSV file $file$ row by row, returning its '"Data"' and '"Grid"' elements.
+    <dt>'System`Convert`TableDump`ImportCSV["$file$", {$rows$, $cols$}]'
+      <dd>only returns the given parts of the table.
+    </dl>
+    """
+
+    caller = 'Import'
+
+    options = {
+        'CharacterEncoding': '$CharacterEncoding',
+        'FieldSeparators': '","',
+        'HeaderLines': '0',
+    }
+
+    def apply(self, filename, evaluation, options):
+        '%(name)s[filename_String, OptionsPattern[%(name)s]]'
+        return self.apply_parts(filename, Expression('List'), evaluation, options)
+
+    def apply_parts(self, filename, parts, evaluation, options):
+        '%(name)s[filename_String, parts_List, OptionsPattern[%(name)s]]'
+
+        encoding = self._encoding(options, evaluation)
+        if encoding is None:
+            return Symbol('$Failed')
+        separators = self._separators(options, evaluation)
+        if separators is None:
+            return Symbol('$Failed')
+        header_lines = self.get_option(options, 'HeaderLines', evaluation)
+        skip = header_lines.get_int_value() if isinstance(header_lines, Integer) else None
+        if skip is None or skip < 0:
+            evaluation.message(self.caller, 'hdrl', header_lines)
+            return Symbol('$Failed')
+
+        specs = parts.leaves
+        try:
+            selection = [PartSpec(spec) for spec in specs] if len(specs) <= 2 else None
+        except ValueError:
+            selection = None
+        limit = selection[0].limit if selection else None
+
+        path = filename.get_string_value()
+        now = evaluation.definitions.now
+        try:
+            with io.open(path, 'r', encoding=encoding, newline='') as f:
+                rows = islice(_read_rows(f, separators), skip,
+                              None if limit is None else skip + limit)
+                if specs:
+                    rows = [_parse_row(row)[0] for row in rows]
+                else:
+                    table = _TableBuilder(now)
+                    for row in rows:
+                        table.add(*_parse_row(row))
+        except UnicodeDecodeError:
+            evaluation.message('General', 'ucdec')
+            return Symbol('$Failed')
+        except csv.Error as e:
+            evaluation.message(self.caller, 'csverr', filename, String(str(e)))
+            return Symbol('$Failed')
+        except IOError:
+            evaluation.message('General', 'noopen', filename)
+            return Symbol('$Failed')
+
+        if not specs:
+            data = table.get_expression()
+        elif selection is not None:
+            try:
+                selected = selection[0].select(rows)
+                if len(selection) > 1:
+                    if selection[0].single:
+                        selected = selection[1].select(selected)
+                    else:
+                        selected = [selection[1].select(row) for row in selected]
+                data = _to_expression(selected, now)
+            except IndexError:
+                selection = None
+        if specs and selection is None:
+            # let Part deal with anything else, including the messages
+            data = Expression('Part', _to_expression(rows, now), *specs).evaluate(evaluation)
+
+        return Expression(
+            'List',
+            Expression('Rule', String('Data'), data),
+            Expression('Rule', String('Grid'), Expression('Grid', data)))
+
+
+class ImportTSV(ImportCSV):
+    """
+    <dl>
+    <dt>'System`Convert`TableDump`ImportTSV["$file$"]'
+      <dd>reads the tab-separated file $file$ row by row, returning its '"Data"' and '"Grid"' elements.
+    </dl>
+    """
+
+    options = {
+        'CharacterEncoding': '$CharacterEncoding',
+        'FieldSeparators': '"\t"',
+        'HeaderLines': '0',
+    }
+
+
+class ExportCSV(_TableFormat):
+    """
+    <dl>
+    <dt>'System`Convert`TableDump`ExportCSV["$file$", $data$]'
+      <dd>writes the table $data$ row by row into the CSV file $file$.
+    </dl>
+    """
+
+    caller = 'Export'
+
+    options = {
+        'CharacterEncoding': '$CharacterEncoding',
+        'FieldSeparators': '","',
+    }
+
+    def apply(self, filename, expr, evaluation, options):
+        '%(name)s[filename_String, expr_, OptionsPattern[%(name)s]]'
+        from mathics.builtin.numpy_utils import packed_item, packed_kind, packed_shape, packed_tolist
+
+        encoding = self._encoding(options, evaluation)
+        if encoding is None:
+            return Symbol('$Failed')
+        separators = self._separators(options, evaluation)
+        if separators is None:
+            return Symbol('$Failed')
+        sep = separators[0]
+        # whether the text of a number might need quotes
+        quote_numbers = any(c in sep for c in '0123456789.e+-')
+
+        def cell_text(cell):
+            if isinstance(cell, float):
+                return _format_real(cell)
+            elif isinstance(cell, six.integer_types):
+                return str(cell)
+            elif isinstance(cell, String):
+                return cell.get_string_value()
+            elif isinstance(cell, Integer):
+                return str(cell.get_int_value())
+            elif isinstance(cell, MachineReal):
+                return _format_real(cell.value)
+            return Expression('ToString', cell).evaluate(evaluation).get_string_value()
+
+        def cells_text(cells):
+            return sep.join(_quote(cell_text(cell), sep) for cell in cells)
+
+        def vector_text(packed):
+            # all values of a packed vector are of the same type
+            texts = map(_format_real if packed_kind(packed) == 'f' else str, packed_tolist(packed))
+            if quote_numbers:
+                texts = (_quote(text, sep) for text in texts)
+            return sep.join(texts)
+
+        def row_text(row):
+            packed = row.get_packed() if isinstance(row, PackedArray) else None
+            if packed is not None:
+                if len(packed_shape(packed)) == 1:
+                    return vector_text(packed)
+                return cells_text(packed_tolist(packed))
+            elif row.has_form('List', None):
+                return cells_text(row.leaves)
+            return cells_text([row])
+
+        # the text of each row is only created when it is written
+        packed = expr.get_packed() if isinstance(expr, PackedArray) else None
+        if packed is not None:
+            shape = packed_shape(packed)
+            if len(shape) == 2:
+                rows = (vector_text(packed_item(packed, i)) for i in range(shape[0]))
+            else:
+                rows = (cells_text(row if isinstance(row, list) else [row]) for row in packed_tolist(packed))
+        elif expr.has_form('List', None):
+            rows = (row_text(row) for row in expr.leaves)
+        else:
+            rows = [cells_text([expr])]
+
+        try:
+            with io.open(filename.get_string_value(), 'w', encoding=encoding, newline='') as f:
+                for row in rows:
+                    f.write(row)
+                    f.write('\n')
+        except IOError:
+            evaluation.message('General', 'noopen', filename)
+            return Symbol('$Failed')
+        return Symbol('Null')
+
+
+class ExportTSV(ExportCSV):
+    """
+    <dl>
+    <dt>'System`Convert`TableDump`ExportTSV["$file$", $data$]'
+      <dd>writes the table $data$ row by row into the tab-separated file $file$.
+    </dl>
+    """
+
+    options = {
+        'CharacterEncoding': '$CharacterEncoding',
+        'FieldSeparators': '"\t"',
+    }
@@ -5,8 +5,9 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 
 from mathics.builtin.base import Predefined, Builtin
-from mathics.core.expression import Integer
+from mathics.core.expression import Expression, Integer
 from mathics.core.evaluation import MAX_RECURSION_DEPTH, set_python_recursion_limit
+from mathics.core.profiler import EvaluationProfiler
 
 
 class RecursionLimit(Predefined):
@@ -254,6 +255,12 @@ class Unevaluated(Builtin):
     #> h[items___] := Plus[items]
     #> h[1, Unevaluated[Sequence[Unevaluated[2], 3]], Sequence[4, Unevaluated[5]]]
      = 15
+
+    #> k[Unevaluated[1], 1, Unevaluated[x], x]
+     = k[Unevaluated[1], 1, Unevaluated[x], x]
+    #> Attributes[k] = {Flat, Orderless};
+    #> k[Unevaluated[k[1, x]], 1, x]
+     = k[Unevaluated[1], 1, Unevaluated[x], x]
     """
 
     attributes = ('HoldAllComplete',)
@@ -448,3 +455,54 @@ class Out(Builtin):
         '    f:StandardForm|TraditionalForm|InputForm|OutputForm]':
         r'"%%" <> ToString[k]',
     }
+
+
+class EvaluationProfile(Builtin):
+    """
+    <dl>
+    <dt>'EvaluationProfile[$expr$]'
+        <dd>evaluates $expr$ and returns a list containing the result
+        and statistics about the evaluation.
+    </dl>
+
+    The statistics list the evaluated heads under "Heads" and the
+    applied rules under "Rules", the most time consuming ones first.
+    For each head, they give the number of evaluation steps ("Calls"),
+    the time spent in them in seconds including ("Time") and excluding
+    ("SelfTime") nested steps, how many rules were tried on expressions
+    with that head ("Attempts") and how many of them matched
+    ("Matches"). For each rule, they give the number of attempts and
+    matches and the time spent applying it. "Allocations" is the net
+    number of memory blocks allocated meanwhile.
+
+    >> fib[0] = fib[1] = 1;
+    >> fib[n_] := fib[n - 1] + fib[n - 2]
+    >> {result, profile} = EvaluationProfile[fib[10]];
+    >> result
+     = 89
+    >> Cases["Heads" /. profile, (HoldForm[fib] -> stats_) :> ("Calls" /. stats)]
+     = {177}
+
+    Only 88 of these calls needed the general rule for 'fib':
+    >> Cases["Rules" /. profile, (Verbatim[HoldPattern[fib[n_]]] -> stats_) :> ({"Attempts", "Matches"} /. stats)]
+     = {{88, 88}}
+
+    #> First[EvaluationProfile[x = 1; x + 1]]
+     = 2
+    #> Attributes[EvaluationProfile]
+     = {HoldAll, Protected}
+    """
+
+    attributes = ('HoldAll',)
+
+    def apply(self, expr, evaluation):
+        'EvaluationProfile[expr_]'
+
+        profiler = EvaluationProfiler()
+        outer = evaluation.profiler
+        evaluation.profiler = profiler
+        try:
+            result = expr.evaluate(evaluation)
+        finally:
+            evaluation.profiler = outer
+        return Expression('List', result, profiler.to_expression())
@@ -296,6 +296,11 @@ class Sin(_MPMathFunction):
 
     #> N[Sin[1], 40]
      = 0.8414709848078965066525023216302989996226
+
+    #> Sin[Range[5] * 0.3] === Table[Sin[0.3 i], {i, 5}]
+     = True
+    #> Sin[{0., 1.5, x}]
+     = {0., 0.997495, Sin[x]}
     """
 
     mpmath_name = 'sin'
@@ -12,6 +12,9 @@ from __future__ import division
 
 import os
 import io
+import mmap
+import re
+import sys
 import shutil
 import zlib
 import base64
@@ -28,7 +31,8 @@ from six import unichr
 
 from mathics.core.expression import (Expression, Real, Complex, String, Symbol,
                                      from_python, Integer, BoxError,
-                                     MachineReal, Number, valid_context_name)
+                                     MachineReal, Number, PackedArray,
+                                     pack_leaves, valid_context_name)
 from mathics.core.numbers import dps
 from mathics.builtin.base import (Builtin, Predefined, BinaryOperator,
                                   PrefixOperator)
@@ -364,6 +368,41 @@ class OperatingSystem(Predefined):
             return String('Unknown')
 
 
+class ByteOrdering(Predefined):
+    """
+    <dl>
+    <dt>'$ByteOrdering'
+      <dd>returns the native ordering of bytes in binary data on your computer system: -1 for little-endian and 1 for big-endian.
+    </dl>
+
+    X> $ByteOrdering
+     = -1
+    #> $ByteOrdering == -1 || $ByteOrdering == 1
+     = True
+    """
+
+    attributes = ('Protected',)
+    name = '$ByteOrdering'
+
+    def evaluate(self, evaluation):
+        return Integer(1 if sys.byteorder == 'big' else -1)
+
+
+_native_byte_order = '<' if sys.byteorder == 'little' else '>'
+
+
+def _byte_order(builtin, options, evaluation):
+    # the struct byte order for the ByteOrdering option of builtin, or None
+    value = builtin.get_option(options, 'ByteOrdering', evaluation)
+    ordering = value.get_int_value() if value is not None else None
+    if ordering == -1:
+        return '<'
+    elif ordering == 1:
+        return '>'
+    evaluation.message(builtin.get_name(), 'byteord', value)
+    return None
+
+
 class EndOfFile(Builtin):
     """
     <dl>
@@ -430,6 +469,79 @@ class Word(Builtin):
     """
 
 
+class _TokenReader(object):
+    # reads the tokens of a text stream in large chunks, instead of one
+    # character at a time like Read does. tokens end at the given separators
+    # and, if accepted is given, at the first character not in it, which is
+    # then skipped, just like in Read.
+
+    chunk_size = 1 << 16
+
+    def __init__(self, stream, separators, accepted=None):
+        if all(len(s) == 1 for s in separators):
+            chars = ''.join(re.escape(s) for s in separators)
+            separator = '[%s]' % chars
+            token = '[^%s]*' % chars
+        else:
+            separator = '|'.join(re.escape(s) for s in sorted(
+                separators, key=len, reverse=True))
+            token = '(?:(?!%s).)*' % separator
+        if accepted is not None:
+            token = '[%s]*' % ''.join(re.escape(c) for c in accepted)
+        self._token = re.compile('(?:%s)*(%s)' % (separator, token), re.S)
+        self._separator = re.compile(separator)
+        self._longest = max(len(s) for s in separators)
+        self.accepted = accepted
+
+        self.stream = stream
+        self.start = stream.tell()
+        self.buffer = ''
+        self.pos = 0        # position of the next token in buffer
+        self.offset = 0     # number of characters read before buffer
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.stream.read(self.chunk_size)
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+
+    def read(self, n=None):
+        # returns a list of at most n tokens, fewer only at the end of the
+        # stream. an empty token means that a character not accepted was
+        # found.
+        tokens = []
+        match_token = self._token.match
+        while n is None or len(tokens) < n:
+            match = match_token(self.buffer, self.pos)
+            end = match.end()
+            if not self.eof and end + self._longest > len(self.buffer):
+                # the token or separator might go on in the next chunk
+                self._fill()
+                continue
+            token = match.group(1)
+            if not token and end == len(self.buffer):
+                self.pos = end
+                break
+            if (self.accepted is not None and end < len(self.buffer) and
+                    not self._separator.match(self.buffer, end)):
+                end += 1
+            self.pos = end
+            tokens.append(token)
+            if not token:
+                break
+        return tokens
+
+    def close(self):
+        # puts the stream right behind the last token read
+        consumed = self.offset + self.pos
+        if consumed < self.offset + len(self.buffer):
+            self.stream.seek(self.start)
+            self.stream.read(consumed)
+
+
 class Read(Builtin):
     """
     <dl>
@@ -863,6 +975,22 @@ class _BinaryFormat(object):
                 writers[funcname[1:-7]] = getattr(cls, funcname)
         return writers
 
+    # the integers and reals of fixed width, which are read and written in
+    # bulk as packed arrays, and their struct format characters
+    packed_formats = {
+        'Byte': 'B',
+        'Integer8': 'b',
+        'Integer16': 'h',
+        'Integer32': 'i',
+        'Integer64': 'q',
+        'Real32': 'f',
+        'Real64': 'd',
+        'UnsignedInteger8': 'B',
+        'UnsignedInteger16': 'H',
+        'UnsignedInteger32': 'I',
+        'UnsignedInteger64': 'Q',
+    }
+
     # Reader Functions
 
     @staticmethod
@@ -1397,16 +1525,21 @@ class BinaryWrite(Builtin):
 
     messages = {
         'writex': '`1`.',
+        'byteord': 'ByteOrdering -> `1` is not -1 or 1.',
+    }
+
+    options = {
+        'ByteOrdering': '$ByteOrdering',
     }
 
     writers = _BinaryFormat.get_writers()
 
-    def apply_notype(self, name, n, b, evaluation):
-        'BinaryWrite[OutputStream[name_, n_], b_]'
-        return self.apply(name, n, b, None, evaluation)
+    def apply_notype(self, name, n, b, evaluation, options):
+        'BinaryWrite[OutputStream[name_, n_], b_, OptionsPattern[BinaryWrite]]'
+        return self.apply(name, n, b, None, evaluation, options)
 
-    def apply(self, name, n, b, typ, evaluation):
-        'BinaryWrite[OutputStream[name_, n_], b_, typ_]'
+    def apply(self, name, n, b, typ, evaluation, options):
+        'BinaryWrite[OutputStream[name_, n_], b_, typ_?NotOptionQ, OptionsPattern[BinaryWrite]]'
 
         channel = Expression('OutputStream', name, n)
 
@@ -1428,12 +1561,6 @@ class BinaryWrite(Builtin):
             evaluation.message('BinaryWrite', 'openr', channel)
             return expr
 
-        # Check b
-        if b.has_form('List', None):
-            pyb = b.leaves
-        else:
-            pyb = [b]
-
         # Check Type
         if typ.has_form('List', None):
             types = typ.get_leaves()
@@ -1448,6 +1575,23 @@ class BinaryWrite(Builtin):
             evaluation.message('BinaryRead', 'format', typ)
             return expr
 
+        byteorder = _byte_order(self, options, evaluation)
+        if byteorder is None:
+            return expr
+
+        # Write homogeneous lists of numbers at once
+        formats = _BinaryFormat.packed_formats
+        data = None
+        if len(types) == 1 and types[0] in formats:
+            data = self._to_bytes(b, formats[types[0]], byteorder)
+        if data is not None:
+            stream.write(data)
+            pyb = []
+        elif b.has_form('List', None):
+            pyb = b.leaves
+        else:
+            pyb = [b]
+
         # Write to stream
         i = 0
         while i < len(pyb):
@@ -1509,7 +1653,10 @@ class BinaryWrite(Builtin):
                 return evaluation.message('BinaryWrite', 'nocoerce', b)
 
             try:
-                self.writers[t](stream, x)
+                if t in formats and byteorder != _native_byte_order:
+                    stream.write(struct.pack(byteorder + formats[t], x))
+                else:
+                    self.writers[t](stream, x)
             except struct.error:
                 return evaluation.message('BinaryWrite', "nocoerce", b)
             i += 1
@@ -1520,6 +1667,20 @@ class BinaryWrite(Builtin):
             evaluation.message('BinaryWrite', 'writex', err.strerror)
         return channel
 
+    @staticmethod
+    def _to_bytes(b, code, byteorder):
+        # the bytes of a list of machine integers or reals, or None
+        from mathics.builtin.numpy_utils import packed_to_bytes
+
+        packed = b.get_packed()
+        if packed is None and b.has_form('List', 1, None):
+            packed = pack_leaves(b.leaves)
+            if packed is not None:
+                packed = packed.get_packed()
+        if packed is None:
+            return None
+        return packed_to_bytes(packed, code, byteorder)
+
 
 class BinaryRead(Builtin):
     """
@@ -1816,6 +1977,194 @@ class BinaryRead(Builtin):
                 return result[0]
 
 
+class BinaryReadList(Builtin):
+    """
+    <dl>
+    <dt>'BinaryReadList["$file$"]'
+      <dd>reads all the bytes in $file$ as integers from 0 to 255.
+    <dt>'BinaryReadList["$file$", $type$]'
+      <dd>reads all the objects of the specified type in $file$.
+    <dt>'BinaryReadList["$file$", {$type1$, $type2$, ...}]'
+      <dd>reads sequences of objects of the specified types.
+    <dt>'BinaryReadList["$file$", $types$, $n$]'
+      <dd>reads at most $n$ objects or sequences.
+    </dl>
+
+    $file$ may also be a binary input stream, which is then read from its current position on.
+
+    >> strm = OpenWrite[BinaryFormat -> True];
+    >> BinaryWrite[strm, {1, 256, 65536}, "Integer32"];
+    >> file = Close[strm];
+    >> BinaryReadList[file]
+     = {1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0}
+    >> BinaryReadList[file, "Integer32"]
+     = {1, 256, 65536}
+    >> BinaryReadList[file, {"Integer16", "Integer16"}, 2]
+     = {{1, 0}, {256, 0}}
+
+    Integers and reals of fixed width are decoded all at once into packed arrays, with the byte order given by 'ByteOrdering':
+    >> BinaryReadList[file, "Integer32", ByteOrdering -> 1]
+     = {16777216, 65536, 256}
+    >> DeleteFile[file];
+
+    #> strm = OpenWrite[BinaryFormat -> True];
+    #> BinaryWrite[strm, {1.5, -2., 1.*^300, Infinity}, "Real64", ByteOrdering -> 1];
+    #> BinaryWrite[strm, {2 ^ 64 - 1}, "UnsignedInteger64"];
+    #> strm = OpenRead[Close[strm], BinaryFormat -> True];
+    #> BinaryReadList[strm, "Real64", 3, ByteOrdering -> 1]
+     = {1.5, -2., 1.*^300}
+    #> BinaryReadList[strm, "Real64", 1, ByteOrdering -> 1]
+     = {Infinity}
+    #> BinaryReadList[strm, "UnsignedInteger64"]
+     = {18446744073709551615}
+    #> BinaryReadList[strm, "UnsignedInteger64"]
+     = {}
+    #> Close[strm];
+
+    #> Quiet[BinaryReadList[StringToStream["abc"]]]
+     = BinaryReadList[InputStream[String, ...]]
+    #> BinaryReadList["ExampleData/EinsteinSzilLetter.txt", "Byte", ByteOrdering -> 0]
+     : ByteOrdering -> 0 is not -1 or 1.
+     = BinaryReadList[ExampleData/EinsteinSzilLetter.txt, Byte, ByteOrdering -> 0]
+    #> BinaryReadList["ExampleData/EinsteinSzilLetter.txt", "Byte", 3]
+     = {65, 108, 98}
+    """
+
+    messages = {
+        'format': '`1` is not a recognized binary format.',
+        'bfmt': 'The stream `1` has been opened with BinaryFormat -> False and cannot be used with binary data.',
+        'byteord': 'ByteOrdering -> `1` is not -1 or 1.',
+        'intnm': ('Non-negative machine-sized integer expected at '
+                  'position 3 in `1`.'),
+    }
+
+    options = {
+        'ByteOrdering': '$ByteOrdering',
+    }
+
+    readers = _BinaryFormat.get_readers()
+
+    def apply_bytes(self, file, evaluation, options):
+        'BinaryReadList[file_, OptionsPattern[BinaryReadList]]'
+        return self._read_list(file, String('Byte'), None, evaluation, options)
+
+    def apply(self, file, typ, evaluation, options):
+        'BinaryReadList[file_, typ_?NotOptionQ, OptionsPattern[BinaryReadList]]'
+        return self._read_list(file, typ, None, evaluation, options)
+
+    def apply_n(self, file, typ, n, evaluation, options):
+        'BinaryReadList[file_, typ_?NotOptionQ, n_?NotOptionQ, OptionsPattern[BinaryReadList]]'
+        py_n = n.get_int_value()
+        if py_n is None or py_n < 0:
+            evaluation.message('BinaryReadList', 'intnm', Expression(
+                'BinaryReadList', file, typ, n))
+            return
+        return self._read_list(file, typ, py_n, evaluation, options)
+
+    def _read_list(self, file, typ, n, evaluation, options):
+        if typ.has_form('List', None):
+            types = [t.get_string_value() for t in typ.leaves]
+        else:
+            types = [typ.get_string_value()]
+        if not types or not all(t in self.readers for t in types):
+            evaluation.message('BinaryReadList', 'format', typ)
+            return
+
+        byteorder = _byte_order(self, options, evaluation)
+        if byteorder is None:
+            return
+
+        if typ.has_form('List', None):
+            def read(f):
+                return self._read_sequences(f, types, n)
+        elif types[0] in _BinaryFormat.packed_formats:
+            def read(f):
+                return self._read_packed(
+                    f, _BinaryFormat.packed_formats[types[0]], byteorder, n)
+        else:
+            def read(f):
+                return Expression('List', *[
+                    leaf.leaves[0] for leaf in self._read_sequences(f, types, n).leaves])
+
+        if isinstance(file, String):
+            path = path_search(file.get_string_value())
+            try:
+                if path is None:
+                    raise IOError
+                with io.open(path, 'rb') as f:
+                    return read(f)
+            except IOError:
+                evaluation.message('General', 'noopen', file)
+                return Symbol('$Failed')
+        elif file.has_form('InputStream', 2):
+            stream = _lookup_stream(file.leaves[1].get_int_value())
+            if stream is None or stream.closed:
+                evaluation.message('General', 'openx', file)
+                return
+            if getattr(stream, 'mode', None) != 'rb':
+                evaluation.message('BinaryReadList', 'bfmt', file)
+                return
+            return read(stream)
+        else:
+            evaluation.message('General', 'stream', file)
+            return
+
+    def _read_sequences(self, f, types, n):
+        readers = [self.readers[t] for t in types]
+        result = []
+        while n is None or len(result) < n:
+            values = []
+            for reader in readers:
+                try:
+                    values.append(reader(f))
+                except struct.error:
+                    if not values:
+                        return Expression('List', *result)
+                    values.append(Symbol('EndOfFile'))
+            result.append(Expression('List', *values))
+        return Expression('List', *result)
+
+    @staticmethod
+    def _read_packed(f, code, byteorder, n):
+        # decodes the values in one go. files are memory mapped instead of
+        # being read into memory first.
+        from mathics.builtin.numpy_utils import packed_from_bytes
+
+        width = struct.calcsize(code)
+        start = f.tell()
+        mapped = None
+        try:
+            size = os.fstat(f.fileno()).st_size
+            if size > start:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer, offset = mapped, start
+        except (AttributeError, io.UnsupportedOperation):
+            buffer, offset = f.read(), 0
+            size = start + len(buffer)
+
+        count = max(size - start, 0) // width
+        if n is not None:
+            count = min(count, n)
+        try:
+            packed = None
+            if count > 0:
+                packed = packed_from_bytes(buffer, code, byteorder, count, offset)
+            if packed is not None:
+                result = PackedArray(packed)
+            elif count > 0:
+                values = struct.unpack_from(
+                    '%s%d%s' % (byteorder, count, code), buffer, offset)
+                convert = _BinaryFormat._IEEE_real if code in 'fd' else Integer
+                result = Expression('List', *[convert(value) for value in values])
+            else:
+                result = Expression('List')
+        finally:
+            if mapped is not None:
+                mapped.close()
+        f.seek(start + count * width)
+        return result
+
+
 class WriteString(Builtin):
     """
     <dl>
@@ -2796,11 +3145,36 @@ class ReadList(Read):
       <dd>Reads objects of a specified type until the end of file.
     <dt>'ReadList["$file$", {$type1$, $type2$, ...}]'
       <dd>Reads a sequence of specified types until the end of file.
+    <dt>'ReadList["$file$", $types$, $n$]'
+      <dd>Reads at most $n$ objects.
     </dl>
 
     >> ReadList[StringToStream["a 1 b 2"], {Word, Number}]
      = {{a, 1}, {b, 2}}
 
+    Objects of a single type 'Number', 'Real', 'Word' or 'Record' are read in large chunks at once:
+    >> ReadList[StringToStream["1 2.5 3*^2\\n4 5"], Real]
+     = {1., 2.5, 300., 4., 5.}
+
+    A stream is left right behind the objects read, so that it can be processed piece by piece:
+    >> str = StringToStream["1 2 3 4 5"];
+    >> While[(chunk = ReadList[str, Number, 2]) =!= {}, Print[Total[chunk]]]
+     | 3
+     | 7
+     | 5
+    #> Close[str];
+
+    #> str = StringToStream["1 2 3 4 5"];
+    #> {ReadList[str, Number, 2], Read[str, Number], ReadList[str, Number, 7], Read[str, Number]}
+     = {{1, 2}, 3, {4, 5}, EndOfFile}
+    #> Close[str];
+    #> ReadList[StringToStream["a b\\n\\nc  d\\r\\ne"], Record]
+     = {a b, c  d, e}
+    #> ReadList[StringToStream["a\\r\\nb"], Record, RecordSeparators -> {"\\r\\n"}]
+     = {a, b}
+    #> Quiet[ReadList[StringToStream["123xyz 321"], Number]]
+     = ReadList[InputStream[String, ...], Number]
+
     >> str = StringToStream["abc123"];
     >> ReadList[str]
      = {abc123}
@@ -2854,18 +3228,40 @@ class ReadList(Read):
 
     def apply(self, channel, types, evaluation, options):
         'ReadList[channel_, types_, OptionsPattern[ReadList]]'
+        return self._read_list(channel, types, None, evaluation, options)
 
-        # Options
-        # TODO: Implement extra options
-        # py_options = self.check_options(options)
-        # null_records = py_options['NullRecords']
-        # null_words = py_options['NullWords']
-        # record_separators = py_options['RecordSeparators']
-        # token_words = py_options['TokenWords']
-        # word_separators = py_options['WordSeparators']
+    def apply_m(self, channel, types, m, evaluation, options):
+        'ReadList[channel_, types_, m_?NotOptionQ, OptionsPattern[ReadList]]'
+
+        py_m = m.get_int_value()
+        if py_m is None or py_m < 0:
+            evaluation.message(
+                'ReadList', 'intnm', Expression('ReadList', channel, types, m))
+            return
+        return self._read_list(channel, types, py_m, evaluation, options)
+
+    def _read_list(self, channel, types, m, evaluation, options):
+        if isinstance(channel, String):
+            # read the file through a single stream, which is closed again
+            opener = mathics_open(channel.get_string_value())
+            try:
+                with opener:
+                    return self._read_list(
+                        opener.expr, types, m, evaluation, options)
+            except IOError:
+                evaluation.message('General', 'noopen', channel)
+                return Symbol('$Failed')
+
+        reader = self._token_reader(channel, types, options)
+        if reader is not None:
+            try:
+                return self._read_bulk(reader, channel, types, m, evaluation)
+            except UnicodeDecodeError:
+                # let Read deal with the invalid characters
+                reader.stream.seek(reader.start)
 
         result = []
-        while True:
+        while m is None or len(result) < m:
             tmp = super(ReadList, self).apply(
                 channel, types, evaluation, options)
 
@@ -2880,36 +3276,71 @@ class ReadList(Read):
             result.append(tmp)
         return from_python(result)
 
-    def apply_m(self, channel, types, m, evaluation, options):
-        'ReadList[channel_, types_, m_, OptionsPattern[ReadList]]'
+    def _token_reader(self, channel, types, options):
+        # a _TokenReader for the objects of a single type that can be read
+        # in bulk, or None
+        if not channel.has_form('InputStream', 2):
+            return None
+        stream = _lookup_stream(channel.leaves[1].get_int_value())
+        if not (isinstance(stream, io.TextIOBase) and not stream.closed and
+                stream.seekable()):
+            return None
 
-        # Options
-        # TODO: Implement extra options
-        # py_options = self.check_options(options)
-        # null_records = py_options['NullRecords']
-        # null_words = py_options['NullWords']
-        # record_separators = py_options['RecordSeparators']
-        # token_words = py_options['TokenWords']
-        # word_separators = py_options['WordSeparators']
+        py_options = self.check_options(options)
+        record_separators = py_options['RecordSeparators']
+        word_separators = py_options['WordSeparators']
+        digits = '0123456789'
+        if types == Symbol('Word'):
+            separators, accepted = word_separators, None
+        elif types == Symbol('Record'):
+            separators, accepted = record_separators, None
+        elif types == Symbol('Number'):
+            separators, accepted = word_separators + record_separators, '+-.' + digits
+        elif types == Symbol('Real'):
+            separators, accepted = word_separators + record_separators, '+-.eE^*' + digits
+        else:
+            return None
+        if not separators:
+            return None
+        return _TokenReader(stream, separators, accepted)
 
-        py_m = m.get_int_value()
-        if py_m < 0:
-            evaluation.message(
-                'ReadList', 'intnm', Expression('ReadList', channel, types, m))
-            return
+    def _read_bulk(self, reader, channel, typ, m, evaluation):
+        from mathics.builtin.numpy_utils import pack
 
-        result = []
-        for i in range(py_m):
-            tmp = super(ReadList, self).apply(
-                channel, types, evaluation, options)
+        tokens = reader.read(m)
+        reader.close()
 
-            if tmp == Symbol('$Failed'):
-                return
+        if reader.accepted is None:
+            result = Expression('List', *[String(token) for token in tokens])
+            result.last_evaluated = evaluation.definitions.now
+            return result
 
-            if tmp.to_python() == 'EndOfFile':
-                break
-            result.append(tmp)
-        return from_python(result)
+        if typ == Symbol('Number'):
+            def convert(token):
+                if '.' in token:
+                    return float(token)
+                return int(token)
+        else:
+            def convert(token):
+                return float(token.replace('*^', 'E'))
+
+        try:
+            values = [convert(token) for token in tokens]
+        except ValueError:
+            evaluation.message('Read', 'readn', channel)
+            return
+
+        if not values:
+            return Expression('List')
+        if all(isinstance(value, float) for value in values):
+            packed = pack(values, 'f')
+        elif all(isinstance(value, six.integer_types) for value in values):
+            packed = pack(values, 'i')
+        else:
+            packed = None
+        if packed is not None:
+            return PackedArray(packed)
+        return from_python(values)
 
 
 class FilePrint(Builtin):
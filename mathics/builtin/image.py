@@ -9,7 +9,8 @@ from __future__ import division
 from mathics.builtin.base import (
     Builtin, AtomBuiltin, Test, BoxConstruct, String)
 from mathics.core.expression import (
-    Atom, Expression, Integer, Rational, Real, MachineReal, Symbol, from_python)
+    Atom, Expression, Integer, Rational, Real, MachineReal, Symbol, PackedArray,
+    from_python)
 from mathics.builtin.colors import convert as convert_color, colorspaces as known_colorspaces
 
 import six
@@ -122,6 +123,24 @@ def numpy_to_matrix(pixels):
         return pixels.tolist()
 
 
+def numpy_to_packed(pixels):
+    # gives the pixels as a PackedArray, dropping the channel axis like
+    # numpy_to_matrix. float64 pixels are shared with the image, all other
+    # pixel types are converted to the int64 or float64 arrays that packed
+    # arrays hold.
+    if pixels.shape[2] == 1:
+        pixels = pixels[:, :, 0]
+    if pixels.dtype.kind == 'f':
+        packed = pixels.astype(numpy.float64, copy=False)
+        if not numpy.all(numpy.isfinite(packed)):
+            return None
+    else:
+        packed = pixels.astype(numpy.int64)
+    if packed.size == 0:
+        return None
+    return PackedArray(packed)
+
+
 def numpy_flip(pixels, axis):
     f = (numpy.flipud, numpy.fliplr)[axis]
     return f(pixels)
@@ -824,8 +843,9 @@ class ImageAdjust(_ImageBuiltin):
         if not scales.shape:
             scales = numpy.array([scales])
         scales[scales == 0.0] = 1
-        pixels -= cmins
-        pixels /= scales
+        # pixels might be the buffer of image (or of a packed ImageData
+        # result), so do not normalise in place.
+        pixels = (pixels - cmins) / scales
         return Image(pixels, image.color_space)
 
     def apply_contrast_brightness_gamma(self, image, c, b, g, evaluation):
@@ -1731,6 +1751,11 @@ class ImageData(_ImageBuiltin):
     >> ImageData[Image[{{0, 1}, {1, 0}, {1, 1}}], "Bit"]
      = {{0, 1}, {1, 0}, {1, 1}}
 
+    #> ImageData[Image[ImageData[img]]] == ImageData[img]
+     = True
+    #> Image[ImageData[img, "Byte"]] // ImageData
+     = {{1., 1.}, {1., 1.}, {1., 1.}}
+
     #> ImageData[img, "Bytf"]
      : Unsupported pixel format "Bytf".
      = ImageData[-Image-, Bytf]
@@ -1758,6 +1783,9 @@ class ImageData(_ImageBuiltin):
             pixels = pixels.astype(numpy.bool)
         else:
             return evaluation.message('ImageData', 'pixelfmt', stype)
+        packed = numpy_to_packed(pixels)
+        if packed is not None:
+            return packed
         return from_python(numpy_to_matrix(pixels))
 
 
@@ -2022,6 +2050,18 @@ def _image_pixels(matrix):
         return None
 
 
+def _packed_image_pixels(packed):
+    # like _image_pixels, but for the numpy array of a PackedArray, which
+    # is used without going through python lists (and without a copy if it
+    # already holds reals).
+    pixels = numpy.asarray(packed, dtype='float64')
+    shape = pixels.shape
+    if len(shape) == 2 or (len(shape) == 3 and shape[2] in (1, 3, 4)):
+        return pixels
+    else:
+        return None
+
+
 class ImageQ(_ImageTest):
     '''
     <dl>
@@ -2251,11 +2291,17 @@ class ImageAtom(AtomBuiltin):
 
     def apply_create(self, array, evaluation):
         'Image[array_]'
-        pixels = _image_pixels(array.to_python())
+        packed = array.get_packed() if isinstance(array, PackedArray) else None
+        if packed is not None:
+            pixels = _packed_image_pixels(packed)
+        else:
+            pixels = _image_pixels(array.to_python())
         if pixels is not None:
             shape = pixels.shape
             is_rgb = (len(shape) == 3 and shape[2] in (3, 4))
-            return Image(pixels.clip(0, 1), 'RGB' if is_rgb else 'Grayscale')
+            if pixels.size > 0 and (pixels.min() < 0 or pixels.max() > 1):
+                pixels = pixels.clip(0, 1)
+            return Image(pixels, 'RGB' if is_rgb else 'Grayscale')
         else:
             return Expression('Image', array)
 
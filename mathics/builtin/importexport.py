@@ -8,14 +8,23 @@ Importing and Exporting
 from __future__ import unicode_literals
 from __future__ import absolute_import
 import six
+import sympy
 
-from mathics.core.expression import Expression, from_python, strip_context
+from mathics.core.expression import (
+    BaseExpression, Expression, Integer, MachineReal, PrecisionReal, Rational,
+    Real, from_python, pack_leaves, strip_context)
+from mathics.core.numbers import dps, machine_precision
 from mathics.builtin.base import Builtin, Predefined, Symbol, String
 from mathics.builtin.options import options_to_rules
 
 from .pymimesniffer import magic
+import io
+import json
+import math
 import mimetypes
+import re
 import sys
+from collections import OrderedDict
 from itertools import chain
 
 import urllib
@@ -32,6 +41,7 @@ mimetypes.add_type('application/vnd.wolfram.mathematica.package', '.m')
 # Seems that JSON is not registered on the mathics.net server, so we do it manually here.
 # Keep in mind that mimetypes has system-dependent aspects (it inspects "/etc/mime.types" and other files).
 mimetypes.add_type('application/json', '.json')
+mimetypes.add_type('application/x-jsonlines', '.jsonl')
 
 # TODO: Add more file formats
 
@@ -42,6 +52,7 @@ mimetype_dict = {
     'application/eps': 'EPS',
     'application/fits': 'FITS',
     'application/json': 'JSON',
+    'application/x-jsonlines': 'JSONLines',
     'application/mathematica': 'NB',
     'application/mdb': 'MDB',
     'application/mbox': 'MBOX',
@@ -181,6 +192,82 @@ def _importer_exporter_options(available_options, options, evaluation):
 
     return stream_options, custom_options
 
+
+class PartSpec(object):
+    """
+    A part specification of Part (an integer, a list of integers, a Span
+    or All) that importers with PartialAccess apply to python lists while
+    reading. limit is the number of items needed from the start of the
+    list, or None if all items are needed. Raises ValueError for any other
+    specification.
+    """
+
+    def __init__(self, expr):
+        self.single = False
+        self.indices = None
+        self.span = None
+
+        if expr.get_name() == 'System`All':
+            self.span = (1, -1, 1)
+            self.limit = None
+        elif isinstance(expr, Integer):
+            index = expr.get_int_value()
+            if index == 0:
+                raise ValueError
+            self.single = True
+            self.indices = [index]
+            self.limit = index if index > 0 else None
+        elif expr.has_form('List', None):
+            indices = [leaf.get_int_value() if isinstance(leaf, Integer) else None
+                       for leaf in expr.leaves]
+            if any(index is None or index == 0 for index in indices):
+                raise ValueError
+            self.indices = indices
+            if indices and all(index > 0 for index in indices):
+                self.limit = max(indices)
+            else:
+                self.limit = None if indices else 0
+        elif expr.has_form('Span', 2, 3):
+            bounds = []
+            for leaf, default in zip(expr.leaves, (1, -1, 1)):
+                if leaf.get_name() == 'System`All':
+                    bounds.append(default)
+                elif isinstance(leaf, Integer) and leaf.get_int_value() != 0:
+                    bounds.append(leaf.get_int_value())
+                else:
+                    raise ValueError
+            if len(bounds) == 2:
+                bounds.append(1)
+            start, stop, step = bounds
+            if step < 0:
+                raise ValueError
+            self.span = (start, stop, step)
+            self.limit = stop if start > 0 and stop > 0 else None
+        else:
+            raise ValueError
+
+    def select(self, items):
+        # raises IndexError if the specification does not exist in items
+        n = len(items)
+        if self.span is not None:
+            start, stop, step = self.span
+            if start < 0:
+                start += n + 1
+            if stop < 0:
+                stop += n + 1
+            if not (1 <= start <= n + 1 and 0 <= stop <= n and start - 1 <= stop):
+                raise IndexError
+            return items[start - 1:stop:step]
+
+        for index in self.indices:
+            if not -n <= (index - 1 if index > 0 else index) < n:
+                raise IndexError
+        selected = [items[index - 1 if index > 0 else index] for index in self.indices]
+        if self.single:
+            return selected[0]
+        return selected
+
+
 class ImportFormats(Predefined):
     """
     <dl>
@@ -305,6 +392,7 @@ class RegisterImport(Builtin):
         'Encoding': 'False',
         'Extensions': '{}',
         'AlphaChannel': 'False',
+        'PartialAccess': 'False',
     }
 
     rules = {
@@ -480,12 +568,62 @@ class Import(Builtin):
     #> Import["ExampleData/numberdata.csv", "Elements"]
      = {Data, Grid}
     #> Import["ExampleData/numberdata.csv", "Data"]
-    = {{0.88, 0.60, 0.94}, {0.76, 0.19, 0.51}, {0.97, 0.04, 0.26}, {0.33, 0.74, 0.79}, {0.42, 0.64, 0.56}}
+    = {{0.88, 0.6, 0.94}, {0.76, 0.19, 0.51}, {0.97, 0.04, 0.26}, {0.33, 0.74, 0.79}, {0.42, 0.64, 0.56}}
     #> Import["ExampleData/numberdata.csv"]
-    = {{0.88, 0.60, 0.94}, {0.76, 0.19, 0.51}, {0.97, 0.04, 0.26}, {0.33, 0.74, 0.79}, {0.42, 0.64, 0.56}}
+    = {{0.88, 0.6, 0.94}, {0.76, 0.19, 0.51}, {0.97, 0.04, 0.26}, {0.33, 0.74, 0.79}, {0.42, 0.64, 0.56}}
     #> Import["ExampleData/numberdata.csv", "FieldSeparators" -> "."]
     = {{0, 88,0, 60,0, 94}, {0, 76,0, 19,0, 51}, {0, 97,0, 04,0, 26}, {0, 33,0, 74,0, 79}, {0, 42,0, 64,0, 56}}
 
+    Parts of an element are selected like in 'Part'. Tables are read row
+    by row, up to the last selected row:
+    >> Import["ExampleData/numberdata.csv", {"Data", 2 ;; 3, {1, 3}}]
+     = {{0.76, 0.51}, {0.97, 0.26}}
+    #> Import["ExampleData/numberdata.csv", {"Data", -1}]
+     = {0.42, 0.64, 0.56}
+    #> Import["ExampleData/numberdata.csv", {"Data", All, 2}]
+     = {0.6, 0.19, 0.04, 0.74, 0.64}
+    #> Import["ExampleData/ExampleData.txt", {"Lines", 2}]
+     = Created by Angus
+
+    #> Export["table.csv", {{"name", "value"}, {"a, b", 1}, {"say \\"hi\\" twice", 2.5}}];
+    #> FilePrint["table.csv"]
+     | name,value
+     | "a, b",1
+     | "say ""hi"" twice",2.5
+    #> Import["table.csv", "HeaderLines" -> 1]
+     = {{a, b, 1}, {say "hi" twice, 2.5}}
+    #> Import["table.csv", {"Data", 7}]
+     : Part 7 of {{name, value}, {a, b, 1}, {say "hi" twice, 2.5}} does not exist.
+     = {{name, value}, {a, b, 1}, {say "hi" twice, 2.5}}[[7]]
+    #> Import["table.csv", "HeaderLines" -> -1]
+     : Value of option HeaderLines -> -1 should be a non-negative integer.
+     = $Failed
+    #> DeleteFile["table.csv"]
+
+    ## JSON
+    #> Export["data.json", {"a" -> Range[3], "b" -> {"c" -> Null}}, "Compact" -> True]
+     = data.json
+    #> FilePrint[%]
+     | {"a":[1,2,3],"b":{"c":null}}
+    #> Import[%%]
+     = {a -> {1, 2, 3}, b -> {c -> Null}}
+    #> DeleteFile["data.json"]
+    #> Export["data.jsonl", {{1}, {"a" -> 2}}];
+    #> FileFormat["data.jsonl"]
+     = JSONLines
+    #> Import["data.jsonl"]
+     = {{1}, {a -> 2}}
+    #> DeleteFile["data.jsonl"]
+    #> ExportString[{1, x}, "JSON"]
+     : x cannot be exported as JSON.
+     = $Failed
+
+    ## TSV
+    #> Export["table.tsv", {{1, 2, 3}, {4, 5, 6}}];
+    #> Import["table.tsv", "TSV"]
+     = {{1, 2, 3}, {4, 5, 6}}
+    #> DeleteFile["table.tsv"]
+
     ## Text
     >> Import["ExampleData/ExampleData.txt", "Elements"]
      = {Data, Lines, Plaintext, String, Words}
@@ -499,6 +637,17 @@ class Import(Builtin):
     ## JSON
     >> Import["ExampleData/colors.json"]
      = {colorsArray -> {{colorName -> black, rgbValue -> (0, 0, 0), hexValue -> #000000}, {colorName -> red, rgbValue -> (255, 0, 0), hexValue -> #FF0000}, {colorName -> green, rgbValue -> (0, 255, 0), hexValue -> #00FF00}, {colorName -> blue, rgbValue -> (0, 0, 255), hexValue -> #0000FF}, {colorName -> yellow, rgbValue -> (255, 255, 0), hexValue -> #FFFF00}, {colorName -> cyan, rgbValue -> (0, 255, 255), hexValue -> #00FFFF}, {colorName -> magenta, rgbValue -> (255, 0, 255), hexValue -> #FF00FF}, {colorName -> white, rgbValue -> (255, 255, 255), hexValue -> #FFFFFF}}}
+    #> Import["ExampleData/colors.json", {"Data", 1, 2, 2}]
+     = {colorName -> red, rgbValue -> (255, 0, 0), hexValue -> #FF0000}
+    #> ImportString["[1, 2, 3, 4", {"JSON", "Data", 2}]
+     = 2
+    #> ImportString["[1, 2, 3, 4", "JSON"]
+     : Error while reading JSON: Expecting ',' delimiter.
+     = $Failed
+    #> ImportString["{\\"x\\": NaN, \\"y\\": 1e400}", "JSON"]
+     = {x -> Indeterminate, y -> 1.00000000000000*^400}
+    #> ImportString["{\\"a\\":1}\\n{\\"a\\":2}\\n", "JSONLines"]
+     = {{a -> 1}, {a -> 2}}
 
     ## XML
     #> Import["ExampleData/InventionNo1.xml", "Tags"]
@@ -512,6 +661,11 @@ class Import(Builtin):
         'noelem': (
             'The Import element `1` is not present when importing as `2`.'),
         'fmtnosup': '`1` is not a supported Import format.',
+        'fsep': ('Value of option FieldSeparators -> `1` should be a '
+                 'non-empty string or a list of such strings.'),
+        'hdrl': 'Value of option HeaderLines -> `1` should be a non-negative integer.',
+        'csverr': 'Error while reading `1`: `2`.',
+        'jsonerr': 'Error while reading JSON: `1`.',
     }
 
     rules = {
@@ -560,12 +714,17 @@ class Import(Builtin):
         else:
             elements = [elements]
 
-        for el in elements:
-            if not isinstance(el, String):
-                evaluation.message('Import', 'noelem', el)
-                return Symbol('$Failed')
+        # an element may be followed by part specifications, e.g.
+        # {"Data", 1 ;; 10, {1, 3}}
+        count = 0
+        while count < len(elements) and isinstance(elements[count], String):
+            count += 1
+        parts = elements[count:]
+        if parts and not count:
+            evaluation.message('Import', 'noelem', parts[0])
+            return Symbol('$Failed')
 
-        elements = [el.get_string_value() for el in elements]
+        elements = [el.get_string_value() for el in elements[:count]]
 
         # Determine file type
         for el in elements:
@@ -596,20 +755,42 @@ class Import(Builtin):
             # TODO message
             return Symbol('$Failed')
 
+        if parts and (not elements or elements[0] == "Elements"):
+            evaluation.message('Import', 'noelem', parts[0])
+            return Symbol('$Failed')
+
+        # importers registered with PartialAccess -> True get the part
+        # specifications as their second argument, and only read what is
+        # needed. the parts of all other imported elements are taken here.
+        partial_access = parts and importer_options.get(
+            "System`PartialAccess") == Symbol('True')
+        if partial_access:
+            args = [Expression('List', *parts)]
+        else:
+            args = []
+
+        def select(result):
+            if parts and not partial_access:
+                return Expression('Part', result, *parts).evaluate(evaluation)
+            return result
+
         def get_results(tmp_function):
             if function_channels == Expression('List', String('FileNames')):
                 joined_options = list(chain(stream_options, custom_options))
-                tmp = Expression(tmp_function, findfile, *joined_options).evaluate(evaluation)
+                tmp = Expression(tmp_function, findfile, *(args + joined_options)).evaluate(evaluation)
             elif function_channels == Expression('List', String('Streams')):
                 stream = Expression('OpenRead', findfile, *stream_options).evaluate(evaluation)
                 if stream.get_head_name() != 'System`InputStream':
                     evaluation.message('Import', 'nffil')
                     return None
-                tmp = Expression(tmp_function, stream, *custom_options).evaluate(evaluation)
+                tmp = Expression(tmp_function, stream, *(args + custom_options)).evaluate(evaluation)
                 Expression('Close', stream).evaluate(evaluation)
             else:
                 # TODO message
                 return Symbol('$Failed')
+            if tmp == Symbol('$Failed'):
+                # the importer has already given a message
+                return None
             tmp = tmp.get_leaves()
             if not all(expr.has_form('Rule', None) for expr in tmp):
                 return None
@@ -653,7 +834,7 @@ class Import(Builtin):
                     if result is None:
                         return Symbol('$Failed')
                     if len(list(result.keys())) == 1 and list(result.keys())[0] == el:
-                        return list(result.values())[0]
+                        return select(list(result.values())[0])
                 elif el in posts.keys():
                     # TODO: allow use of conditionals
                     result = get_results(posts[el])
@@ -665,7 +846,7 @@ class Import(Builtin):
                         if defaults is None:
                             return Symbol('$Failed')
                     if el in defaults.keys():
-                        return defaults[el]
+                        return select(defaults[el])
                     else:
                         evaluation.message('Import', 'noelem', from_python(el),
                                            from_python(filetype))
@@ -754,6 +935,18 @@ class Export(Builtin):
      | 4,5,6
     #> DeleteFile[%%]
 
+    #> Export["table.csv", {{1, 0.5, 1.5*^20}, {"x", 1/3, a + b}}];
+    #> FilePrint["table.csv"]
+     | 1,0.5,1.5e20
+     | x,1 / 3,a + b
+    #> Export["table.csv", 17];
+    #> FilePrint["table.csv"]
+     | 17
+    #> Export["table.csv", {{1, 2}}, "FieldSeparators" -> ", "];
+    #> FilePrint["table.csv"]
+     | 1, 2
+    #> DeleteFile["table.csv"]
+
     ## SVG
     #> Export["sine.svg", Plot[Sin[x], {x,0,1}]]
      = sine.svg
@@ -766,6 +959,9 @@ class Export(Builtin):
         'chtype': "First argument `1` is not a valid file specification.",
         'infer': "Cannot infer format of file `1`.",
         'noelem': "`1` is not a valid set of export elements for the `2` format.",
+        'fsep': ('Value of option FieldSeparators -> `1` should be a '
+                 'non-empty string or a list of such strings.'),
+        'jsonexpr': '`1` cannot be exported as JSON.',
     }
 
     _extdict = {
@@ -781,6 +977,9 @@ class Export(Builtin):
         'tif': 'TIFF',
         'txt': 'Text',
         'csv': 'CSV',
+        'tsv': 'TSV',
+        'json': 'JSON',
+        'jsonl': 'JSONLines',
         'svg': 'SVG',
     }
 
@@ -877,6 +1076,130 @@ class Export(Builtin):
         return self._extdict.get(ext)
 
 
+class ImportString(Builtin):
+    """
+    <dl>
+    <dt>'ImportString["$data$", "$format$"]'
+      <dd>imports data in the specified format from a string.
+    <dt>'ImportString["$data$", $elements$]'
+      <dd>imports the specified elements from a string.
+    <dt>'ImportString["$data$"]'
+      <dd>attempts to determine the format of the string from its content.
+    </dl>
+
+    >> ImportString["{\\"a\\": [1, 2.5, true, null]}", "JSON"]
+     = {a -> {1, 2.5, True, Null}}
+    >> ImportString["1,2\\n3,4", {"CSV", "Data", 2}]
+     = {3, 4}
+
+    #> ImportString[x, "JSON"]
+     : First argument x is not a string.
+     = $Failed
+    """
+
+    messages = {
+        'string': 'First argument `1` is not a string.',
+    }
+
+    rules = {
+        'ImportString[data_]': 'ImportString[data, {}]',
+    }
+
+    def apply(self, data, evaluation, options={}):
+        'ImportString[data_, OptionsPattern[]]'
+        return self.apply_elements(data, Expression('List'), evaluation, options)
+
+    def apply_element(self, data, element, evaluation, options={}):
+        'ImportString[data_, element_String, OptionsPattern[]]'
+        return self.apply_elements(data, Expression('List', element), evaluation, options)
+
+    def apply_elements(self, data, elements, evaluation, options={}):
+        'ImportString[data_, elements_List?(AllTrue[#, NotOptionQ]&), OptionsPattern[]]'
+        import tempfile
+        import os
+
+        if not isinstance(data, String):
+            evaluation.message('ImportString', 'string', data)
+            return Symbol('$Failed')
+
+        # the importers read files, so the data goes through a temporary one
+        # (just like in FetchURL).
+        temp_handle, temp_path = tempfile.mkstemp(suffix='')
+        try:
+            try:
+                os.write(temp_handle, data.get_string_value().encode('utf-8'))
+            finally:
+                os.close(temp_handle)
+
+            def determine_filetype():
+                return Expression('FileFormat', String(temp_path)).evaluate(
+                    evaluation=evaluation).get_string_value()
+
+            return Import._import(temp_path, determine_filetype, elements, evaluation, options)
+        finally:
+            os.unlink(temp_path)
+
+
+class ExportString(Builtin):
+    """
+    <dl>
+    <dt>'ExportString[$expr$, "$format$"]'
+      <dd>exports $expr$ to a string in the specified format.
+    <dt>'ExportString[$expr$, $elems$]'
+      <dd>exports $expr$ to a string as elements specified by $elems$.
+    </dl>
+
+    >> ExportString[{{1, 2, 3}, {4, 5, 6}}, "CSV"]
+     = 1,2,3
+     . 4,5,6
+     .
+    >> ExportString[{"a" -> {1, 2.5}, "b" -> "text"}, "JSON", "Compact" -> True]
+     = {"a":[1,2.5],"b":"text"}
+
+    #> ExportString[1, "JPF"]
+     : JPF is not a supported ExportString format.
+     = $Failed
+    """
+
+    messages = {
+        'fmtnosup': '`1` is not a supported ExportString format.',
+    }
+
+    rules = {
+        'ExportString[expr_, elems_?NotListQ, opts:OptionsPattern[]]': (
+            'ExportString[expr, {elems}, opts]'),
+    }
+
+    def apply(self, expr, elems, evaluation, options={}):
+        'ExportString[expr_, elems_List?(AllTrue[#, NotOptionQ]&), OptionsPattern[]]'
+        import tempfile
+        import os
+
+        if not any(leaf.get_string_value() in EXPORTERS for leaf in elems.leaves):
+            evaluation.message('ExportString', 'fmtnosup', elems.leaves[0] if elems.leaves else elems)
+            return Symbol('$Failed')
+
+        # the exporters write files, so the result goes through a temporary
+        # one.
+        temp_handle, temp_path = tempfile.mkstemp(suffix='')
+        os.close(temp_handle)
+        try:
+            result = Expression('Export', String(temp_path), expr, elems,
+                                *options_to_rules(options)).evaluate(evaluation)
+            if result.get_string_value() != temp_path:
+                return Symbol('$Failed')
+            with open(temp_path, 'rb') as f:
+                data = f.read()
+        finally:
+            os.unlink(temp_path)
+
+        try:
+            return String(data.decode('utf-8'))
+        except UnicodeDecodeError:
+            # binary formats, one character for each byte
+            return String(data.decode('latin-1'))
+
+
 class FileFormat(Builtin):
     """
     <dl>
@@ -981,3 +1304,305 @@ class FileFormat(Builtin):
             return None
 
         return from_python(result)
+
+
+# JSON
+
+def _json_integer(text):
+    return Integer(int(text))
+
+
+def _json_real(text):
+    value = float(text)
+    if math.isinf(value):
+        # beyond machine reals, keep (about) machine precision
+        return PrecisionReal(sympy.Float(text, dps(machine_precision)))
+    return MachineReal(value)
+
+
+def _json_constant(text):
+    # NaN, Infinity and -Infinity, which Python writes into JSON
+    if text == 'NaN':
+        return Symbol('Indeterminate')
+    return Expression('DirectedInfinity', Integer(-1 if text[0] == '-' else 1))
+
+
+def _json_object(pairs):
+    return Expression('List', *[
+        Expression('Rule', String(key), _from_json(value)) for key, value in pairs])
+
+
+def _from_json(value):
+    # numbers and objects are already converted by the hooks of _json_decoder
+    if isinstance(value, BaseExpression):
+        return value
+    elif isinstance(value, list):
+        leaves = [_from_json(item) for item in value]
+        packed = pack_leaves(leaves)
+        if packed is not None:
+            return packed
+        return Expression('List', *leaves)
+    elif isinstance(value, six.string_types):
+        return String(value)
+    elif value is True:
+        return Symbol('True')
+    elif value is False:
+        return Symbol('False')
+    elif value is None:
+        return Symbol('Null')
+    raise ValueError('unexpected value %r' % value)
+
+
+# converts JSON directly into expressions, in one pass
+_json_decoder = json.JSONDecoder(
+    object_pairs_hook=_json_object, parse_int=_json_integer,
+    parse_float=_json_real, parse_constant=_json_constant)
+
+_json_whitespace = re.compile(r'\s*')
+
+
+class _JSONReader(object):
+    # reads the values of a JSON document one by one, e.g. the items of a
+    # top-level array, without reading the whole document at once.
+
+    chunk_size = 1 << 16
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        # read at least as much as is buffered, so that a big value is
+        # decoded a few times only.
+        chunk = self.f.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        # the next character that is not whitespace, '' at the end
+        while True:
+            self.pos = _json_whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._fill()
+
+    def skip(self):
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _json_decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if self.eof:
+                    raise
+            else:
+                # a number might go on in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return _from_json(value)
+            self._fill()
+
+
+def _read_json(f, limit=None):
+    # only the first limit items of a top-level array are read
+    reader = _JSONReader(f)
+    if reader.peek() != '[':
+        result = reader.value()
+    else:
+        reader.skip()
+        items = []
+        if reader.peek() == ']':
+            reader.skip()
+        else:
+            while True:
+                if limit is not None and len(items) >= limit:
+                    return Expression('List', *items)
+                items.append(reader.value())
+                delimiter = reader.peek()
+                reader.skip()
+                if delimiter == ']':
+                    break
+                elif delimiter != ',':
+                    raise ValueError("Expecting ',' delimiter")
+        result = pack_leaves(items)
+        if result is None:
+            result = Expression('List', *items)
+    if reader.peek() != '':
+        raise ValueError('Extra data')
+    return result
+
+
+def _read_json_lines(f, limit=None):
+    items = []
+    for line in f:
+        if limit is not None and len(items) >= limit:
+            break
+        if line.strip():
+            items.append(_from_json(_json_decoder.decode(line)))
+    return Expression('List', *items)
+
+
+class _JSONError(Exception):
+    def __init__(self, expr):
+        super(_JSONError, self).__init__()
+        self.expr = expr
+
+
+def _to_json(expr):
+    # raises _JSONError for parts of expr that have no JSON counterpart
+    from mathics.builtin.numpy_utils import packed_tolist
+
+    packed = expr.get_packed()
+    if packed is not None:
+        return packed_tolist(packed)
+    elif isinstance(expr, String):
+        return expr.get_string_value()
+    elif isinstance(expr, Integer):
+        return expr.get_int_value()
+    elif isinstance(expr, (Real, Rational)):
+        return expr.round_to_float()
+    elif isinstance(expr, Symbol):
+        name = expr.get_name()
+        if name == 'System`True':
+            return True
+        elif name == 'System`False':
+            return False
+        elif name == 'System`Null':
+            return None
+    elif expr.has_form(('Rule', 'RuleDelayed'), 2):
+        return _to_json(Expression('List', expr))
+    elif expr.has_form('List', None):
+        leaves = expr.leaves
+        if leaves and all(leaf.has_form(('Rule', 'RuleDelayed'), 2) for leaf in leaves):
+            members = OrderedDict()
+            for leaf in leaves:
+                key, value = leaf.leaves
+                if not isinstance(key, String):
+                    raise _JSONError(key)
+                members[key.get_string_value()] = _to_json(value)
+            return members
+        return [_to_json(leaf) for leaf in leaves]
+    raise _JSONError(expr)
+
+
+def _json_encoder(compact):
+    if compact:
+        return json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    return json.JSONEncoder(ensure_ascii=False, indent=4, separators=(',', ': '))
+
+
+class ImportJSON(Builtin):
+    """
+    <dl>
+    <dt>'System`Convert`JSONDump`ImportJSON["$file$"]'
+      <dd>reads the JSON file $file$, returning its '"Data"' element.
+    <dt>'System`Convert`JSONDump`ImportJSON["$file$", {$parts$}]'
+      <dd>only returns the given parts of the data.
+    </dl>
+    """
+
+    context = 'System`Convert`JSONDump`'
+
+    _read = staticmethod(_read_json)
+
+    def apply(self, filename, evaluation):
+        '%(name)s[filename_String]'
+        return self.apply_parts(filename, Expression('List'), evaluation)
+
+    def apply_parts(self, filename, parts, evaluation):
+        '%(name)s[filename_String, parts_List]'
+        specs = parts.leaves
+        try:
+            limit = PartSpec(specs[0]).limit if specs else None
+        except ValueError:
+            limit = None
+
+        try:
+            with io.open(filename.get_string_value(), 'r', encoding='utf-8-sig') as f:
+                data = self._read(f, limit)
+        except UnicodeDecodeError:
+            evaluation.message('General', 'ucdec')
+            return Symbol('$Failed')
+        except ValueError as e:
+            evaluation.message('Import', 'jsonerr', String(str(e)))
+            return Symbol('$Failed')
+        except IOError:
+            evaluation.message('General', 'noopen', filename)
+            return Symbol('$Failed')
+
+        if specs:
+            # the items up to limit are all there is to take the parts from
+            data = Expression('Part', data, *specs).evaluate(evaluation)
+        return Expression('List', Expression('Rule', String('Data'), data))
+
+
+class ImportJSONLines(ImportJSON):
+    """
+    <dl>
+    <dt>'System`Convert`JSONDump`ImportJSONLines["$file$"]'
+      <dd>reads a file of one JSON value per line, returning the list of the values as its '"Data"' element.
+    </dl>
+    """
+
+    _read = staticmethod(_read_json_lines)
+
+
+class ExportJSON(Builtin):
+    """
+    <dl>
+    <dt>'System`Convert`JSONDump`ExportJSON["$file$", $expr$]'
+      <dd>writes $expr$ into the JSON file $file$.
+    </dl>
+    """
+
+    context = 'System`Convert`JSONDump`'
+
+    options = {
+        'Compact': 'False',
+    }
+
+    def _write(self, f, expr, compact):
+        for chunk in _json_encoder(compact).iterencode(_to_json(expr)):
+            f.write(six.text_type(chunk))
+        f.write('\n')
+
+    def apply(self, filename, expr, evaluation, options={}):
+        '%(name)s[filename_String, expr_, OptionsPattern[%(name)s]]'
+        compact = self.get_option(options, 'Compact', evaluation)
+        compact = compact is not None and compact.is_true()
+        try:
+            with io.open(filename.get_string_value(), 'w', encoding='utf-8') as f:
+                self._write(f, expr, compact)
+        except _JSONError as e:
+            evaluation.message('Export', 'jsonexpr', e.expr)
+            return Symbol('$Failed')
+        except IOError:
+            evaluation.message('General', 'noopen', filename)
+            return Symbol('$Failed')
+        return Symbol('Null')
+
+
+class ExportJSONLines(ExportJSON):
+    """
+    <dl>
+    <dt>'System`Convert`JSONDump`ExportJSONLines["$file$", {$expr1$, $expr2$, ...}]'
+      <dd>writes each $expri$ into one line of the file $file$.
+    </dl>
+    """
+
+    options = {}
+
+    def _write(self, f, expr, compact):
+        if not expr.has_form('List', None):
+            raise _JSONError(expr)
+        encoder = _json_encoder(True)
+        for leaf in expr.leaves:
+            for chunk in encoder.iterencode(_to_json(leaf)):
+                f.write(six.text_type(chunk))
+            f.write('\n')
@@ -14,7 +14,8 @@ import math
 
 from mathics.builtin.base import Builtin, SympyFunction
 from mathics.core.convert import from_sympy
-from mathics.core.expression import Integer, String, Expression
+from mathics.core.expression import Integer, String, Expression, PackedArray
+from mathics.builtin.numpy_utils import packed_floor
 
 
 class Floor(SympyFunction):
@@ -49,8 +50,13 @@ class Floor(SympyFunction):
      = 11
     >> Floor[-10.4, -1]
      = -10
+
+    #> Floor[{-0.5, 2.5, 1.*^30}]
+     = {-1, 2, 1000000000000000019884624838656}
     """
 
+    attributes = ('Listable', 'NumericFunction')
+
     rules = {
         'Floor[x_, a_]': 'Floor[x / a] * a'
     }
@@ -61,6 +67,12 @@ class Floor(SympyFunction):
         if x is not None:
             return from_sympy(sympy.floor(x))
 
+    def listable_kernel(self, leaves, evaluation):
+        if len(leaves) == 1:
+            result = packed_floor(leaves[0].get_packed())
+            if result is not None:
+                return PackedArray(result)
+
 
 class Ceiling(SympyFunction):
     """
@@ -16,8 +16,17 @@ import sympy
 from mpmath import mp
 
 from mathics.builtin.base import Builtin
+from mathics.builtin.numpy_utils import (
+    is_numpy_available, packed_kind, packed_shape, packed_item, LinAlgError,
+    machine_array, machine_det, machine_inverse, machine_solve,
+    machine_ill_conditioned,
+    machine_least_squares, machine_pseudo_inverse, machine_null_space,
+    machine_matrix_rank, machine_eigenvalues, machine_eigenvectors,
+    machine_matrix_power, machine_matrix_exp)
 from mathics.core.convert import from_sympy
-from mathics.core.expression import Expression, Integer, Symbol, Real
+from mathics.core.expression import (
+    Expression, Integer, Symbol, Real, Rational, MachineReal, Complex,
+    from_packed)
 
 
 def matrix_data(m):
@@ -58,6 +67,73 @@ def to_mpmath_matrix(data, **kwargs):
         return None
 
 
+def _machine_data(expr):
+    # returns the numbers in the (nested) List expr as a (nested) python
+    # list, and whether they contain machine reals and complex numbers.
+    if isinstance(expr, MachineReal):
+        return expr.value, True, False
+    elif isinstance(expr, Integer):
+        return expr.value, False, False
+    elif isinstance(expr, Rational):
+        return float(expr.value), False, False
+    elif isinstance(expr, Complex):
+        real = _machine_data(expr.real)
+        imag = _machine_data(expr.imag)
+        if real is None or imag is None:
+            return None
+        return complex(real[0], imag[0]), real[1] or imag[1], True
+    packed = expr.get_packed()
+    if packed is not None:
+        return packed, packed_kind(packed) == 'f', False
+    if not expr.has_form('List', 1, None):
+        return None
+    values = []
+    inexact = is_complex = False
+    for leaf in expr.leaves:
+        data = _machine_data(leaf)
+        if data is None:
+            return None
+        values.append(data[0])
+        inexact = inexact or data[1]
+        is_complex = is_complex or data[2]
+    return values, inexact, is_complex
+
+
+def to_machine_arrays(*exprs):
+    """
+    Returns the given matrices and vectors as machine precision arrays (see
+    the linear algebra functions in mathics.builtin.numpy_utils) if they
+    only contain numbers, at least one of which is a machine real, and None
+    otherwise. Exact and arbitrary precision input is left to sympy.
+    """
+    if not is_numpy_available():
+        return None
+    data = [_machine_data(expr) for expr in exprs]
+    if None in data or not any(inexact for _, inexact, _ in data):
+        return None
+    is_complex = any(c for _, _, c in data)
+    arrays = [machine_array(values, is_complex) for values, _, _ in data]
+    if any(array is None for array in arrays):
+        return None
+    return arrays
+
+
+def from_machine(value):
+    """
+    Converts a result of the linear algebra functions in
+    mathics.builtin.numpy_utils into an expression.
+    """
+    if isinstance(value, complex):
+        return Complex(MachineReal(value.real), MachineReal(value.imag))
+    elif isinstance(value, (float, six.integer_types)):
+        return from_packed(value)
+    elif packed_kind(value) == 'c' or packed_shape(value)[0] == 0:
+        return Expression('List', *[
+            from_machine(packed_item(value, i)) for i in range(packed_shape(value)[0])])
+    else:
+        return from_packed(value)
+
+
 class Det(Builtin):
     """
     <dl>
@@ -71,11 +147,27 @@ class Det(Builtin):
     Symbolic determinant:
     >> Det[{{a, b, c}, {d, e, f}, {g, h, i}}]
      = a e i - a f h - b d i + b f g + c d h - c e g
+
+    Machine precision matrices are handled numerically:
+    >> Det[{{1.5, 2}, {3, 4}}]
+     = 0.
+
+    #> Det[{{1. + I, 2}, {3, 4}}]
+     = -2. + 4. I
+    #> Det[{{1., 2}, {3, 4}, {5, 6}}]
+     : Argument {{1., 2}, {3, 4}, {5, 6}} is not a non-empty square matrix.
+     = Det[{{1., 2}, {3, 4}, {5, 6}}]
     """
 
     def apply(self, m, evaluation):
         'Det[m_]'
 
+        machine = to_machine_arrays(m)
+        if machine is not None:
+            det = machine_det(*machine)
+            if det is not None:
+                return from_machine(det)
+
         matrix = to_sympy_matrix(m)
         if matrix is None or matrix.cols != matrix.rows or matrix.cols == 0:
             return evaluation.message('Det', 'matsq', m)
@@ -164,15 +256,41 @@ class Inverse(Builtin):
 
     >> Inverse[{{1, 0, 0}, {0, Sqrt[3]/2, 1/2}, {0,-1 / 2, Sqrt[3]/2}}]
     = {{1, 0, 0}, {0, Sqrt[3] / 2, -1 / 2}, {0, 1 / 2, Sqrt[3] / 2}}
+
+    #> Inverse[{{1., 2}, {3, 4}}]
+     = {{-2., 1.}, {1.5, -0.5}}
+    #> Inverse[{{1.5, I}, {2, 1}}]
+     = {{0.24 + 0.32 I, 0.32 - 0.24 I}, {-0.48 - 0.64 I, 0.36 + 0.48 I}}
+    #> Inverse[{{1., 2}, {2, 4}}]
+     : The matrix {{1., 2}, {2, 4}} is singular.
+     = Inverse[{{1., 2}, {2, 4}}]
+    #> Inverse[{{1., 2.}, {1., 2.000000000000001}}] // Dimensions
+     : Result for Inverse of badly conditioned matrix {{1., 2.}, {1., 2.}} may contain significant numerical errors.
+     = {2, 2}
+    #> Inverse[N[Table[1 / (i + j - 1), {i, 5}, {j, 5}]]][[1, 1]]
+     = 25.
     """
 
     messages = {
         'sing': "The matrix `1` is singular.",
+        'luc': ("Result for Inverse of badly conditioned matrix `1` may "
+                "contain significant numerical errors."),
     }
 
     def apply(self, m, evaluation):
         'Inverse[m_]'
 
+        machine = to_machine_arrays(m)
+        if machine is not None:
+            try:
+                inv = machine_inverse(*machine)
+            except LinAlgError:
+                return evaluation.message('Inverse', 'sing', m)
+            if inv is not None:
+                if machine_ill_conditioned(machine[0], inv):
+                    evaluation.message('Inverse', 'luc', m)
+                return from_machine(inv)
+
         matrix = to_sympy_matrix(m)
         if matrix is None or matrix.cols != matrix.rows or matrix.cols == 0:
             return evaluation.message('Inverse', 'matsq', m)
@@ -293,6 +411,9 @@ class PseudoInverse(Builtin):
     >> PseudoInverse[{{1.0, 2.5}, {2.5, 1.0}}]
      = {{-0.190476, 0.47619}, {0.47619, -0.190476}}
 
+    #> PseudoInverse[{{1., 2}, {2, 3}, {3, 4}}]
+     = {{-1.83333, -0.333333, 1.16667}, {1.33333, 0.333333, -0.666667}}
+
     #> PseudoInverse[{1, {2}}]
     : Argument {1, {2}} at position 1 is not a non-empty rectangular matrix.
     = PseudoInverse[{1, {2}}]
@@ -305,6 +426,12 @@ class PseudoInverse(Builtin):
     def apply(self, m, evaluation):
         'PseudoInverse[m_]'
 
+        machine = to_machine_arrays(m)
+        if machine is not None:
+            pinv = machine_pseudo_inverse(*machine)
+            if pinv is not None:
+                return from_machine(pinv)
+
         matrix = to_sympy_matrix(m)
         if matrix is None:
             return evaluation.message('PseudoInverse', 'matrix', m, 1)
@@ -330,6 +457,13 @@ class LeastSquares(Builtin):
      : Solving for underdetermined system not implemented.
      = LeastSquares[{{1, 1, 1}, {1, 1, 2}}, {1, 3}]
 
+    Machine precision systems are solved numerically, which also finds
+    the solution of minimal norm of underdetermined systems:
+    >> LeastSquares[{{1., 2}, {2, 3}, {5, 6}}, {1, 5, 3}]
+     = {-2.15385, 2.38462}
+    >> LeastSquares[{{1., 1, 1}, {1, 1, 2}}, {1, 3}]
+     = {-0.5, -0.5, 2.}
+
     ## Inconsistent system - ideally we'd print a different message
     #> LeastSquares[{{1, 1, 1}, {1, 1, 1}}, {1, 0}]
      : Solving for underdetermined system not implemented.
@@ -351,6 +485,12 @@ class LeastSquares(Builtin):
     def apply(self, m, b, evaluation):
         'LeastSquares[m_, b_]'
 
+        machine = to_machine_arrays(m, b)
+        if machine is not None:
+            solution = machine_least_squares(*machine)
+            if solution is not None:
+                return from_machine(solution)
+
         matrix = to_sympy_matrix(m)
         if matrix is None:
             return evaluation.message('LeastSquares', 'matrix', m, 1)
@@ -388,6 +528,15 @@ class LinearSolve(Builtin):
      : Linear equation encountered that has no solution.
      = LinearSolve[{{1, 2, 3}, {4, 5, 6}, {7, 8, 9}}, {1, -2, 3}]
 
+    #> LinearSolve[{{1, 1, 0}, {1, 0, 1}, {0, 1, 1}}, {1., 2, 3}]
+     = {0., 1., 2.}
+    #> LinearSolve[{{1., 2, 3}, {4, 5, 6}, {7, 8, 9}}, {1, -2, 3}]
+     : Linear equation encountered that has no solution.
+     = LinearSolve[{{1., 2, 3}, {4, 5, 6}, {7, 8, 9}}, {1, -2, 3}]
+    #> LinearSolve[{{1., 2.}, {1., 2.000000000000001}}, {1., 3.}] // Length
+     : Result for LinearSolve of badly conditioned matrix {{1., 2.}, {1., 2.}} may contain significant numerical errors.
+     = 2
+
     #> LinearSolve[{1, {2}}, {1, 2}]
      : Argument {1, {2}} at position 1 is not a non-empty rectangular matrix.
      = LinearSolve[{1, {2}}, {1, 2}]
@@ -400,12 +549,25 @@ class LinearSolve(Builtin):
         'lslc': ("Coefficient matrix and target vector(s) or matrix "
                  "do not have the same dimensions."),
         'nosol': "Linear equation encountered that has no solution.",
+        'luc': ("Result for LinearSolve of badly conditioned matrix `1` may "
+                "contain significant numerical errors."),
         'matrix': "Argument `1` at position `2` is not a non-empty rectangular matrix.",
     }
 
     def apply(self, m, b, evaluation):
         'LinearSolve[m_, b_]'
 
+        machine = to_machine_arrays(m, b)
+        if machine is not None:
+            try:
+                solution = machine_solve(*machine)
+            except LinAlgError:
+                return evaluation.message('LinearSolve', 'nosol')
+            if solution is not None:
+                if machine_ill_conditioned(machine[0], solution, machine[1]):
+                    evaluation.message('LinearSolve', 'luc', m)
+                return from_machine(solution)
+
         matrix = matrix_data(m)
         if matrix is None:
             return evaluation.message('LinearSolve', 'matrix', m, 1)
@@ -571,6 +733,11 @@ class NullSpace(Builtin):
     >> MatrixRank[A]
      = 3
 
+    #> NullSpace[{{1., 1, 0}, {1, 0, 1}, {0, 1, 1}}]
+     = {}
+    #> Abs[NullSpace[{{1., 2, 3}, {4, 5, 6}, {7, 8, 9}}]]
+     = {{0.408248, 0.816497, 0.408248}}
+
     #> NullSpace[{1, {2}}]
      : Argument {1, {2}} at position 1 is not a non-empty rectangular matrix.
      = NullSpace[{1, {2}}]
@@ -583,6 +750,12 @@ class NullSpace(Builtin):
     def apply(self, m, evaluation):
         'NullSpace[m_]'
 
+        machine = to_machine_arrays(m)
+        if machine is not None:
+            nullspace = machine_null_space(*machine)
+            if nullspace is not None:
+                return from_machine(nullspace)
+
         matrix = to_sympy_matrix(m)
         if matrix is None:
             return evaluation.message('NullSpace', 'matrix', m, 1)
@@ -642,6 +815,8 @@ class MatrixRank(Builtin):
      = 3
     >> MatrixRank[{{a, b}, {3 a, 3 b}}]
      = 1
+    >> MatrixRank[{{1., 2, 3}, {4, 5, 6}, {7, 8, 9}}]
+     = 2
 
     #> MatrixRank[{{1, 0}, {0}}]
      : Argument {{1, 0}, {0}} at position 1 is not a non-empty rectangular matrix.
@@ -655,6 +830,12 @@ class MatrixRank(Builtin):
     def apply(self, m, evaluation):
         'MatrixRank[m_]'
 
+        machine = to_machine_arrays(m)
+        if machine is not None:
+            rank = machine_matrix_rank(*machine)
+            if rank is not None:
+                return Integer(rank)
+
         matrix = to_sympy_matrix(m)
         if matrix is None:
             return evaluation.message('MatrixRank', 'matrix', m, 1)
@@ -678,6 +859,12 @@ class Eigenvalues(Builtin):
     >> Eigenvalues[{{7, 1}, {-4, 3}}]
      = {5, 5}
 
+    >> Eigenvalues[{{1., 1, 0}, {1, 0, 1}, {0, 1, 1}}]
+     = {2., -1., 1.}
+
+    #> Eigenvalues[{{0., 1}, {-1, 0}}]
+     = {0. - 1. I, 0. + 1. I}
+
     #> Eigenvalues[{{1, 0}, {0}}]
      : Argument {{1, 0}, {0}} at position 1 is not a non-empty rectangular matrix.
      = Eigenvalues[{{1, 0}, {0}}]
@@ -690,6 +877,12 @@ class Eigenvalues(Builtin):
     def apply(self, m, evaluation):
         'Eigenvalues[m_]'
 
+        machine = to_machine_arrays(m)
+        if machine is not None:
+            eigenvalues = machine_eigenvalues(*machine)
+            if eigenvalues is not None:
+                return from_machine(eigenvalues)
+
         matrix = to_sympy_matrix(m)
         if matrix is None:
             return evaluation.message('Eigenvalues', 'matrix', m, 1)
@@ -736,6 +929,12 @@ class MatrixPower(Builtin):
     >> MatrixPower[{{1, 2}, {2, 5}}, -3]
      = {{169, -70}, {-70, 29}}
 
+    #> MatrixPower[{{1., 2}, {2, 5}}, -3]
+     = {{169., -70.}, {-70., 29.}}
+    #> MatrixPower[{{1., 2}, {2, 4}}, -1]
+     : The matrix {{1., 2}, {2, 4}} is singular.
+     = MatrixPower[{{1., 2}, {2, 4}}, -1]
+
     #> MatrixPower[{{0, x}, {0, 0}}, n]
      = {{0 ^ n, n x 0 ^ (-1 + n)}, {0, 0 ^ n}}
 
@@ -746,11 +945,23 @@ class MatrixPower(Builtin):
 
     messages = {
         'matrixpowernotimplemented': ('Matrix power not implemented for matrix `1`.'),
+        'sing': "The matrix `1` is singular.",
         'matrix': "Argument `1` at position `2` is not a non-empty rectangular matrix.",
     }
 
     def apply(self, m, power, evaluation):
         'MatrixPower[m_, power_]'
+
+        machine = to_machine_arrays(m)
+        n = power.get_int_value()
+        if machine is not None and n is not None:
+            try:
+                res = machine_matrix_power(machine[0], n)
+            except LinAlgError:
+                return evaluation.message('MatrixPower', 'sing', m)
+            if res is not None:
+                return from_machine(res)
+
         sympy_m = to_sympy_matrix(m)
         if sympy_m is None:
             return evaluation.message('MatrixPower', 'matrix', m, 1)
@@ -779,6 +990,9 @@ class MatrixExp(Builtin):
     >> MatrixExp[{{1.5, 0.5}, {0.5, 2.0}}]
      = {{5.16266, 3.02952}, {3.02952, 8.19218}}
 
+    #> MatrixExp[{{0, 1.}, {-1, 0}}]
+     = {{0.540302, 0.841471}, {-0.841471, 0.540302}}
+
     #> MatrixExp[{{a, 0}, {0, b}}]
      = {{E ^ a, 0}, {0, E ^ b}}
 
@@ -796,6 +1010,13 @@ class MatrixExp(Builtin):
 
     def apply(self, m, evaluation):
         'MatrixExp[m_]'
+
+        machine = to_machine_arrays(m)
+        if machine is not None:
+            res = machine_matrix_exp(*machine)
+            if res is not None:
+                return from_machine(res)
+
         sympy_m = to_sympy_matrix(m)
         if sympy_m is None:
             return evaluation.message('MatrixExp', 'matrix', m, 1)
@@ -945,8 +1166,9 @@ class Eigenvectors(Builtin):
      = {{0, 1, 0}, {1, 0, 0}, {0, 0, 1}}
     >> Eigenvectors[{{2, 0, 0}, {0, -1, 0}, {0, 0, 0}}]
      = {{1, 0, 0}, {0, 1, 0}, {0, 0, 1}}
+    Numerical eigenvectors are normalized:
     >> Eigenvectors[{{0.1, 0.2}, {0.8, 0.5}}]
-     = {{0.309017, 1.}, {-0.809017, 1.}}
+     = {{-0.295242, -0.955423}, {-0.62896, 0.777438}}
 
     #> Eigenvectors[{{-2, 1, -1}, {-3, 2, 1}, {-1, 1, 0}}]
      = {{1 / 3, 7 / 3, 1}, {1, 1, 0}, {0, 0, 0}}
@@ -962,6 +1184,12 @@ class Eigenvectors(Builtin):
     def apply(self, m, evaluation):
         'Eigenvectors[m_]'
 
+        machine = to_machine_arrays(m)
+        if machine is not None:
+            eigenvectors = machine_eigenvectors(*machine)
+            if eigenvectors is not None:
+                return from_machine(eigenvectors)
+
         matrix = to_sympy_matrix(m)
         if matrix is None or matrix.cols != matrix.rows or matrix.cols == 0:
             return evaluation.message('Eigenvectors', 'matsq', m)
@@ -18,6 +18,7 @@ from mathics.builtin.base import (
 from mathics.builtin.scoping import dynamic_scoping
 from mathics.builtin.base import MessageException, NegativeIntegerException, CountableInteger
 from mathics.core.expression import Expression, String, Symbol, Integer, Number, Real, strip_context, from_python
+from mathics.core.expression import MachineReal, PackedArray, pack_leaves, from_packed
 from mathics.core.expression import min_prec, machine_precision
 from mathics.core.evaluation import BreakInterrupt, ContinueInterrupt, ReturnInterrupt
 from mathics.core.rules import Pattern
@@ -27,6 +28,7 @@ from mathics.algorithm.introselect import introselect
 from mathics.algorithm.clusters import optimize, agglomerate, kmeans, PrecomputedDistances, LazyDistances
 from mathics.algorithm.clusters import AutomaticSplitCriterion, AutomaticMergeCriterion
 from mathics.builtin.options import options_to_rules
+from mathics.builtin.numpy_utils import packed_shape, packed_part, packed_range, packed_constant, packed_total
 
 import sympy
 import heapq
@@ -148,6 +150,9 @@ class Length(Builtin):
 
         if expr.is_atom():
             return Integer(0)
+        packed = expr.get_packed()
+        if packed is not None:
+            return Integer(packed_shape(packed)[0])
         else:
             return Integer(len(expr.leaves))
 
@@ -267,6 +272,7 @@ def set_part(list, indices, new):
             except IndexError:
                 raise PartRangeError
             rec(part, rest[1:])
+            cur.clear_cache()
         elif len(rest) == 1:
             pos = rest[0]
             if cur.is_atom():
@@ -280,6 +286,7 @@ def set_part(list, indices, new):
                     cur.leaves[pos] = new
             except IndexError:
                 raise PartRangeError
+            cur.clear_cache()
 
     rec(list, indices)
 
@@ -711,6 +718,43 @@ def convert_seq(seq):
     return (start, stop, step)
 
 
+def _packed_parts(packed, indices):
+    # Part on a packed array for Integer and Span indices. returns None if
+    # walk_parts needs to take care of the indices, e.g. to issue a message.
+    shape = packed_shape(packed)
+    if len(indices) > len(shape):
+        return None
+    py_indices = []
+    for index, length in zip(indices, shape):
+        if isinstance(index, Integer):
+            value = index.value
+            if 1 <= value <= length:
+                py_indices.append(value - 1)
+            elif -length <= value <= -1:
+                py_indices.append(value)
+            else:
+                return None
+        elif index.has_form('Span', 2, 3):
+            leaves = index.leaves
+            start = leaves[0].get_int_value()
+            if leaves[1].get_name() == 'System`All':
+                stop = None
+            else:
+                stop = leaves[1].get_int_value()
+                if stop is None:
+                    return None
+            step = leaves[2].get_int_value() if len(leaves) == 3 else 1
+            if start is None or step is None or start == 0 or stop == 0:
+                return None
+            py_slice = python_seq(start, stop, step, length)
+            if py_slice is None:
+                return None
+            py_indices.append(py_slice)
+        else:
+            return None
+    return from_packed(packed_part(packed, py_indices))
+
+
 class Part(Builtin):
     """
     <dl>
@@ -793,6 +837,23 @@ class Part(Builtin):
     #> a = {2,3,4}; i = 1; a[[i]] = 0; a
      = {0, 3, 4}
 
+    #> a = {1, 1, 1}; a[[2]] = 5; a
+     = {1, 5, 1}
+
+    ## Assignments to packed arrays
+    #> a = ConstantArray[0, 3]; a[[1]] = 5; a
+     = {5, 0, 0}
+    #> a = ConstantArray[0, {2, 2}]; a[[1, 1]] = 5; a
+     = {{5, 0}, {0, 0}}
+    #> a = Range[3] - Range[3]; a[[1]] = 5; a
+     = {5, 0, 0}
+    #> a = N[ConstantArray[0, 3]]; a[[2]] = 1.5; a
+     = {0., 1.5, 0.}
+    #> a = ImportString["0,0\\n0,0", "CSV"]; a[[2, 1]] = 4; a
+     = {{0, 0}, {4, 0}}
+    #> a = ReadList[StringToStream["0 0 0"], Number]; a[[1]] = 4; a
+     = {4, 0, 0}
+
     ## Negative step
     #> {1,2,3,4,5}[[3;;1;;-1]]
      = {3, 2, 1}
@@ -836,6 +897,12 @@ class Part(Builtin):
 
         indices = i.get_sequence()
 
+        packed = list.get_packed()
+        if packed is not None:
+            result = _packed_parts(packed, indices)
+            if result is not None:
+                return result
+
         result = walk_parts([list], indices, evaluation)
         if result:
             return result
@@ -1709,6 +1776,13 @@ class Range(Builtin):
     def apply(self, imin, imax, di, evaluation):
         'Range[imin_?RealNumberQ, imax_?RealNumberQ, di_?RealNumberQ]'
 
+        if all(isinstance(x, Integer) for x in (imin, imax, di)) and di.value > 0:
+            start, stop, step = imin.value, imax.value, di.value
+            if start <= stop:
+                packed = packed_range(start, stop - (stop - start) % step, step)
+                if packed is not None:
+                    return PackedArray(packed)
+
         imin = imin.to_sympy()
         imax = imax.to_sympy()
         di = di.to_sympy()
@@ -1893,6 +1967,16 @@ class ConstantArray(Builtin):
         'ConstantArray[c_, n_Integer]': 'ConstantArray[c, {n}]',
     }
 
+    def apply_packed(self, c, dims, evaluation):
+        'ConstantArray[c:(_Integer|_Real), dims:{__Integer}]'
+
+        shape = [dim.value for dim in dims.leaves]
+        if isinstance(c, (Integer, MachineReal)) and all(n >= 0 for n in shape):
+            packed = packed_constant(c.value, shape)
+            if packed is not None:
+                return PackedArray(packed)
+        return Expression('Table', c, *[Expression('List', dim) for dim in dims.leaves])
+
 
 class Array(Builtin):
     """
@@ -2017,7 +2101,14 @@ class Table(_IterationFunction):
      = {-0.2, 0.8, 1.8, 2.8, 3.8}
     """
 
+    # tables of at least this many machine numbers are packed
+    packing_length = 250
+
     def get_result(self, items):
+        if len(items) >= self.packing_length:
+            packed = pack_leaves(items)
+            if packed is not None:
+                return packed
         return Expression('List', *items)
 
 
@@ -3044,12 +3135,28 @@ class Total(Builtin):
     Total over rows instead of columns
     >> Total[{{1, 2, 3}, {4, 5, 6}, {7, 8 ,9}}, {2}]
      = {6, 15, 24}
+
+    #> Total[Range[10] * 0.1]
+     = 5.5
+    #> Total[ConstantArray[2^62, {4}]]
+     = 18446744073709551616
+    #> Total[Table[{i, 2 i}, {i, 1000}]]
+     = {500500, 1001000}
     """
     rules = {
-        'Total[head_]': 'Apply[Plus, head]',
         'Total[head_, n_]': 'Apply[Plus, Flatten[head, n]]'
     }
 
+    def apply(self, head, evaluation):
+        'Total[head_]'
+
+        packed = head.get_packed()
+        if packed is not None:
+            total = packed_total(packed)
+            if total is not None:
+                return from_packed(total)
+        return Expression('Apply', Symbol('Plus'), head)
+
 
 class Reverse(Builtin):
     """
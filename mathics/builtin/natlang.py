@@ -44,7 +44,7 @@ Natural language functions
 from mathics.builtin.base import Builtin, MessageException
 from mathics.builtin.randomnumbers import RandomEnv
 from mathics.builtin.codetables import iso639_3
-from mathics.builtin.strings import to_regex, anchor_pattern
+from mathics.builtin.strings import compile_regex
 from mathics.core.expression import Expression, String, Integer, Real, Symbol, strip_context
 
 import os
@@ -1179,13 +1179,11 @@ class DictionaryLookup(_WordListBuiltin):
     """
 
     def compile(self, pattern, evaluation):
-        re_patt = to_regex(pattern, evaluation)
+        re_patt = compile_regex(pattern, evaluation, re.IGNORECASE, anchored=True)
         if re_patt is None:
             evaluation.message('StringExpression', 'invld', pattern, Expression('StringExpression', pattern))
             return
-        re_patt = anchor_pattern(re_patt)
-
-        return re.compile(re_patt, flags=re.IGNORECASE)
+        return re_patt
 
     def search(self, dictionary_words, pattern):
         for dictionary_word in dictionary_words:
@@ -16,7 +16,8 @@ from itertools import combinations
 
 from mathics.builtin.base import Builtin, Test
 from mathics.core.expression import (
-    Expression, Integer, Rational, Symbol, from_python)
+    Expression, Integer, Rational, Symbol, from_python, PackedArray)
+from mathics.builtin.numpy_utils import packed_mod
 
 
 class PowerMod(Builtin):
@@ -81,6 +82,12 @@ class Mod(Builtin):
     >> Mod[5, 0]
      : The argument 0 should be nonzero.
      = Mod[5, 0]
+
+    #> Mod[Range[5], -3]
+     = {-2, -1, 0, -2, -1}
+    #> Mod[{5, 6}, {0, 4}]
+     : The argument 0 should be nonzero.
+     = {Mod[5, 0], 2}
     """
 
     attributes = ('Listable', 'NumericFunction')
@@ -94,6 +101,18 @@ class Mod(Builtin):
             return
         return Integer(n % m)
 
+    def listable_kernel(self, leaves, evaluation):
+        if len(leaves) == 2:
+            operands = [leaf.get_packed() for leaf in leaves]
+            for i, leaf in enumerate(leaves):
+                if operands[i] is None:
+                    if not isinstance(leaf, Integer):
+                        return None
+                    operands[i] = leaf.value
+            result = packed_mod(*operands)
+            if result is not None:
+                return PackedArray(result)
+
 
 class EvenQ(Test):
     """
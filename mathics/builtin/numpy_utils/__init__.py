@@ -36,6 +36,46 @@ minimum = numpy_layer.minimum
 maximum = numpy_layer.maximum
 dot_t = numpy_layer.dot_t
 
+pack = numpy_layer.pack
+packed_kind = numpy_layer.packed_kind
+packed_shape = numpy_layer.packed_shape
+packed_tolist = numpy_layer.packed_tolist
+packed_item = numpy_layer.packed_item
+packed_part = numpy_layer.packed_part
+packed_stack = numpy_layer.packed_stack
+packed_equal = numpy_layer.packed_equal
+packed_range = numpy_layer.packed_range
+packed_constant = numpy_layer.packed_constant
+packed_add = numpy_layer.packed_add
+packed_multiply = numpy_layer.packed_multiply
+packed_abs = numpy_layer.packed_abs
+packed_floor = numpy_layer.packed_floor
+packed_mod = numpy_layer.packed_mod
+packed_map = numpy_layer.packed_map
+packed_total = numpy_layer.packed_total
+packed_dot = numpy_layer.packed_dot
+packed_from_bytes = numpy_layer.packed_from_bytes
+packed_to_bytes = numpy_layer.packed_to_bytes
+packed_buffer = numpy_layer.packed_buffer
+packed_from_buffer = numpy_layer.packed_from_buffer
+
+LinAlgError = numpy_layer.LinAlgError
+machine_array = numpy_layer.machine_array
+machine_det = numpy_layer.machine_det
+machine_inverse = numpy_layer.machine_inverse
+machine_solve = numpy_layer.machine_solve
+machine_ill_conditioned = numpy_layer.machine_ill_conditioned
+machine_least_squares = numpy_layer.machine_least_squares
+machine_pseudo_inverse = numpy_layer.machine_pseudo_inverse
+machine_null_space = numpy_layer.machine_null_space
+machine_matrix_rank = numpy_layer.machine_matrix_rank
+machine_eigenvalues = numpy_layer.machine_eigenvalues
+machine_eigenvectors = numpy_layer.machine_eigenvectors
+machine_matrix_power = numpy_layer.machine_matrix_power
+machine_matrix_exp = numpy_layer.machine_matrix_exp
+
+vectorized_function = numpy_layer.vectorized_function
+
 is_numpy_available = numpy_layer.is_numpy_available
 allclose = numpy_layer.allclose
 errstate = numpy_layer.errstate
@@ -7,9 +7,13 @@ A couple of helper functions for doing numpy-like stuff with numpy.
 
 from mathics.core.expression import Expression
 from functools import reduce
+from itertools import repeat
+from six.moves import zip
 import numpy
+import array as array_module
 import ast
 import inspect
+import math
 import sys
 
 
@@ -156,6 +160,626 @@ def instantiate_elements(a, new_element, d=1):
     return Expression('List', *leaves)
 
 
+#
+# PACKED ARRAYS
+#
+
+# packed arrays (see mathics.core.expression.PackedArray) keep their values in
+# an array of machine integers (kind 'i') or machine reals (kind 'f'). all the
+# functions below return None if the result cannot be represented as a packed
+# array, e.g. because of an integer overflow or because a real is not finite.
+# callers then need to fall back to the usual evaluation on leaves.
+
+_max_packed_int = 2 ** 63 - 1
+
+# largest integer magnitude that can be mixed with machine reals without
+# rounding the integer first.
+_max_exact_int = 2 ** 53
+
+
+def _packed_ints_fit(bound):
+    return bound <= _max_packed_int
+
+
+def _packed_result(a):
+    if a.dtype.kind == 'f':
+        if not numpy.all(numpy.isfinite(a)):
+            return None
+        # normalize -0. to 0., as Mathics' reals have no signed zero.
+        a += 0.
+    return a
+
+
+def _packed_max_abs(a):
+    if a.size == 0:
+        return 0
+    return max(abs(int(a.max())), abs(int(a.min())))
+
+
+def _packed_operands(a, b):
+    # checks whether a and b (packed arrays or python scalars) can be
+    # combined into one kind, and returns the bounds of the integer operands.
+    kinds = set()
+    bounds = []
+    for x in (a, b):
+        if isinstance(x, numpy.ndarray):
+            kind = x.dtype.kind
+            bound = _packed_max_abs(x) if kind == 'i' else None
+        elif isinstance(x, float):
+            kind = 'f'
+            bound = None
+        else:
+            kind = 'i'
+            bound = abs(x)
+        kinds.add(kind)
+        bounds.append(bound)
+    if 'f' in kinds and any(bound is not None and bound > _max_exact_int for bound in bounds):
+        return None
+    return bounds
+
+
+def pack(a, kind):
+    # a is a (nested) python list of numbers
+    try:
+        return numpy.array(a, dtype=numpy.int64 if kind == 'i' else numpy.float64)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def packed_kind(a):
+    return a.dtype.kind
+
+
+def packed_shape(a):
+    return a.shape
+
+
+def packed_tolist(a):
+    return a.tolist()
+
+
+def packed_item(a, i):
+    # returns a python scalar for vectors and a packed array for matrices
+    if len(a.shape) == 1:
+        return a[i].item()
+    else:
+        return a[i]
+
+
+def packed_part(a, indices):
+    # indices is a list of python integers and slices, one for each
+    # axis starting from the first.
+    part = a[tuple(indices)]
+    if isinstance(part, numpy.ndarray):
+        return part
+    return part.item()
+
+
+def packed_stack(arrays):
+    # arrays is a list of packed arrays of equal shape and kind
+    return numpy.array(arrays)
+
+
+def packed_equal(a, b):
+    return a.dtype.kind == b.dtype.kind and numpy.array_equal(a, b)
+
+
+def packed_range(start, stop, step):
+    # integers start, start + step, ... up to stop (inclusive)
+    if not _packed_ints_fit(max(abs(start), abs(stop) + abs(step))):
+        return None
+    return numpy.arange(start, stop + (1 if step > 0 else -1), step, dtype=numpy.int64)
+
+
+def packed_constant(value, shape):
+    if isinstance(value, float):
+        return numpy.full(shape, value, dtype=numpy.float64)
+    elif _packed_ints_fit(abs(value)):
+        return numpy.full(shape, value, dtype=numpy.int64)
+
+
+def _packed_shapes_match(a, b):
+    # Listable threads over the first dimension and does not broadcast like
+    # numpy does, so arrays need to have exactly the same shape.
+    return not (isinstance(a, numpy.ndarray) and isinstance(b, numpy.ndarray) and a.shape != b.shape)
+
+
+def packed_add(a, b):
+    if not _packed_shapes_match(a, b):
+        return None
+    bounds = _packed_operands(a, b)
+    if bounds is None:
+        return None
+    if None not in bounds and not _packed_ints_fit(sum(bounds)):
+        return None
+    # overflows give infinities, which _packed_result rejects
+    with numpy.errstate(over='ignore', invalid='ignore'):
+        result = numpy.add(a, b)
+    return _packed_result(result)
+
+
+def packed_multiply(a, b):
+    if not _packed_shapes_match(a, b):
+        return None
+    bounds = _packed_operands(a, b)
+    if bounds is None:
+        return None
+    if None not in bounds and not _packed_ints_fit(bounds[0] * bounds[1]):
+        return None
+    # overflows give infinities, which _packed_result rejects
+    with numpy.errstate(over='ignore', invalid='ignore'):
+        result = numpy.multiply(a, b)
+    return _packed_result(result)
+
+
+def packed_abs(a):
+    if a.dtype.kind == 'i' and not _packed_ints_fit(_packed_max_abs(a)):
+        return None
+    return _packed_result(numpy.abs(a))
+
+
+def packed_floor(a):
+    # gives a packed array of integers
+    if a.dtype.kind == 'i':
+        return a
+    if not _packed_ints_fit(_packed_max_abs(a) + 1):
+        return None
+    return numpy.floor(a).astype(numpy.int64)
+
+
+def packed_mod(a, b):
+    # like python's %, for integers only
+    if not _packed_shapes_match(a, b):
+        return None
+    for x in (a, b):
+        if isinstance(x, numpy.ndarray):
+            if x.dtype.kind != 'i':
+                return None
+        elif isinstance(x, float):
+            return None
+    if numpy.any(numpy.equal(b, 0)):
+        return None
+    return numpy.mod(a, b)
+
+
+def packed_map(f, *operands):
+    # applies f elementwise to packed arrays of equal shape and python scalars,
+    # all converted to python floats. f returns a float, or None if there is
+    # no machine real result, in which case packed_map gives None.
+    shapes = set(x.shape for x in operands if isinstance(x, numpy.ndarray))
+    if len(shapes) != 1:
+        return None
+    columns = []
+    for x in operands:
+        if isinstance(x, numpy.ndarray):
+            columns.append([float(value) for value in x.ravel().tolist()])
+        else:
+            columns.append(repeat(float(x)))
+    values = []
+    for args in zip(*columns):
+        value = f(*args)
+        if value is None:
+            return None
+        values.append(value)
+    return _packed_result(numpy.array(values, dtype=numpy.float64).reshape(shapes.pop()))
+
+
+def packed_total(a):
+    # sums over the first axis. like Plus, this rounds sums of reals only
+    # once, so that the result does not depend on the order of summation.
+    if len(a) == 0:
+        return None
+    if a.dtype.kind == 'i':
+        if not _packed_ints_fit(_packed_max_abs(a) * len(a)):
+            return None
+        total = numpy.sum(a, axis=0)
+    else:
+        columns = a.reshape((len(a), -1)).T
+        total = numpy.array([math.fsum(column) for column in columns], dtype=numpy.float64)
+        total = total.reshape(a.shape[1:])
+    if total.shape == ():
+        total = _packed_result(total.reshape((1,)))
+        return None if total is None else total[0].item()
+    return _packed_result(total)
+
+
+def packed_dot(a, b):
+    # vector . vector, matrix . vector, vector . matrix and matrix . matrix.
+    # like Inner[Times, a, b, Plus], reals are multiplied first, and the
+    # products are then summed with one rounding.
+    if a.shape[-1] != b.shape[0] or len(a.shape) > 2 or len(b.shape) > 2:
+        return None
+    bounds = _packed_operands(a, b)
+    if bounds is None:
+        return None
+    if None not in bounds:
+        if not _packed_ints_fit(bounds[0] * bounds[1] * max(1, b.shape[0])):
+            return None
+        result = numpy.dot(a, b)
+    else:
+        a2 = a.reshape((-1, a.shape[-1])).astype(numpy.float64)
+        b2 = b.reshape((b.shape[0], -1)).astype(numpy.float64)
+        result = numpy.array([
+            [math.fsum(numpy.multiply(row, column)) for column in b2.T]
+            for row in a2], dtype=numpy.float64)
+        result = result.reshape(a.shape[:-1] + b.shape[1:])
+    if result.shape == ():
+        result = _packed_result(result.reshape((1,)))
+        return None if result is None else result[0].item()
+    return _packed_result(result)
+
+
+def packed_from_bytes(buffer, code, byteorder, count, offset=0):
+    # decodes count values of the struct format code (e.g. 'd' or 'i') and
+    # byteorder ('<' or '>') starting at offset of the bytes-like buffer.
+    # the result does not refer to buffer.
+    a = numpy.frombuffer(buffer, dtype=numpy.dtype(byteorder + code), count=count, offset=offset)
+    if a.dtype.kind == 'f':
+        if not numpy.all(numpy.isfinite(a)):
+            return None
+        return a.astype(numpy.float64)
+    if a.dtype.kind == 'u' and a.size and not _packed_ints_fit(int(a.max())):
+        return None
+    return a.astype(numpy.int64)
+
+
+def packed_to_bytes(a, code, byteorder):
+    # the inverse of packed_from_bytes, for vectors of a matching kind whose
+    # values fit into the format.
+    dtype = numpy.dtype(byteorder + code)
+    if len(a.shape) != 1 or (a.dtype.kind == 'f') != (dtype.kind == 'f'):
+        return None
+    if a.size:
+        if dtype.kind == 'f':
+            if _packed_max_abs(a) > numpy.finfo(dtype).max:
+                return None
+        else:
+            limits = numpy.iinfo(dtype)
+            if int(a.min()) < limits.min or int(a.max()) > limits.max:
+                return None
+    return a.astype(dtype).tobytes()
+
+
+try:
+    _int_typecode = 'q'
+    array_module.array(_int_typecode)
+except ValueError:  # Python 2
+    _int_typecode = 'l'
+
+
+def packed_buffer(kind, values=()):
+    # a growable buffer for the values of a packed array of the given kind,
+    # e.g. while reading them row by row. raises OverflowError for integers
+    # that do not fit.
+    return array_module.array('d' if kind == 'f' else _int_typecode, values)
+
+
+def packed_from_buffer(buffer, shape):
+    # the packed array of the values in buffer (see packed_buffer), which
+    # it shares if possible.
+    a = numpy.frombuffer(buffer, dtype=numpy.dtype(buffer.typecode)) if buffer else numpy.zeros(0)
+    if buffer.typecode == 'd':
+        if not numpy.all(numpy.isfinite(a)):
+            return None
+        a = a.astype(numpy.float64, copy=False)
+    else:
+        a = a.astype(numpy.int64, copy=False)
+    return a.reshape(shape)
+
+
+#
+# MACHINE PRECISION LINEAR ALGEBRA
+#
+
+# the functions below work on float64 or complex128 arrays created by
+# machine_array and give arrays of the same kinds, python scalars, or None if
+# there is no machine precision result (e.g. because the shapes do not fit
+# or because a value is not finite). callers then need to fall back to sympy.
+# numerically singular matrices raise LinAlgError.
+
+LinAlgError = numpy.linalg.LinAlgError
+
+_machine_epsilon = numpy.finfo(numpy.float64).eps
+
+
+def machine_array(a, is_complex):
+    # a is a (nested) python list of numbers or a packed array
+    try:
+        return numpy.array(a, dtype=numpy.complex128 if is_complex else numpy.float64)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def _machine_result(a):
+    a = numpy.asarray(a) + 0.  # normalizes -0.
+    if not numpy.all(numpy.isfinite(a)):
+        return None
+    if a.shape == ():
+        return a.item()
+    return a
+
+
+def _is_matrix(a):
+    return len(a.shape) == 2 and a.size > 0
+
+
+def _is_square(a):
+    return _is_matrix(a) and a.shape[0] == a.shape[1]
+
+
+def _fits(a, b):
+    # b is a vector or matrix of right hand sides for a
+    return len(b.shape) in (1, 2) and b.shape[0] == a.shape[0]
+
+
+def _is_hermitian(a):
+    return numpy.array_equal(a, a.conj().T)
+
+
+def _eigen_order(values):
+    # like Eigenvalues, sort by decreasing absolute value and then by value
+    return numpy.lexsort((values.imag, values.real, -numpy.abs(values)))
+
+
+def _real_if_possible(a):
+    if a.dtype.kind == 'c' and not numpy.any(a.imag):
+        return a.real
+    return a
+
+
+def machine_det(a):
+    if not _is_square(a):
+        return None
+    return _machine_result(numpy.linalg.det(a))
+
+
+def machine_inverse(a):
+    # raises LinAlgError if a is singular
+    if not _is_square(a):
+        return None
+    return _machine_result(numpy.linalg.inv(a))
+
+
+def machine_solve(a, b):
+    # raises LinAlgError if there is no solution
+    if not _is_matrix(a) or not _fits(a, b):
+        return None
+    if a.shape[0] == a.shape[1]:
+        try:
+            return _machine_result(numpy.linalg.solve(a, b))
+        except LinAlgError:
+            pass
+    x = numpy.linalg.lstsq(a, b, rcond=None)[0]
+    scale = max(1., numpy.abs(a).max() * numpy.abs(x).max(), numpy.abs(b).max())
+    if not numpy.allclose(numpy.dot(a, x), b, rtol=0., atol=scale * a.shape[1] * 1e-12):
+        raise LinAlgError('No solution')
+    return _machine_result(x)
+
+
+def machine_ill_conditioned(a, x, b=None):
+    # whether x, the solution of a x = b or the inverse of a if b is None,
+    # may have no correct digits left. |a| |x| / |b| is a lower bound for
+    # the condition number of a, and equals it for the inverse.
+    norm_b = 1. if b is None else numpy.linalg.norm(b, 1)
+    if norm_b == 0:
+        return False
+    norm_ax = numpy.linalg.norm(a, 1) * numpy.linalg.norm(x, 1)
+    return norm_ax * _machine_epsilon > norm_b
+
+
+def machine_least_squares(a, b):
+    if not _is_matrix(a) or not _fits(a, b):
+        return None
+    return _machine_result(numpy.linalg.lstsq(a, b, rcond=None)[0])
+
+
+def machine_pseudo_inverse(a):
+    if not _is_matrix(a):
+        return None
+    return _machine_result(numpy.linalg.pinv(a))
+
+
+def machine_null_space(a):
+    # gives the basis vectors as the rows of a matrix
+    if not _is_matrix(a):
+        return None
+    s, vh = numpy.linalg.svd(a)[1:]
+    rank = int(numpy.sum(s > s.max() * max(a.shape) * _machine_epsilon))
+    return _machine_result(vh[rank:].conj())
+
+
+def machine_matrix_rank(a):
+    if not _is_matrix(a):
+        return None
+    return int(numpy.linalg.matrix_rank(a))
+
+
+def machine_eigenvalues(a):
+    if not _is_square(a):
+        return None
+    if _is_hermitian(a):
+        values = numpy.linalg.eigvalsh(a)
+    else:
+        values = _real_if_possible(numpy.linalg.eigvals(a))
+    return _machine_result(values[_eigen_order(values)])
+
+
+def machine_eigenvectors(a):
+    # gives normalized eigenvectors as the rows of a matrix, in the order of
+    # machine_eigenvalues
+    if not _is_square(a):
+        return None
+    if _is_hermitian(a):
+        values, vectors = numpy.linalg.eigh(a)
+    else:
+        values, vectors = numpy.linalg.eig(a)
+        values = _real_if_possible(values)
+        vectors = _real_if_possible(vectors)
+    return _machine_result(vectors.T[_eigen_order(values)])
+
+
+def machine_matrix_power(a, n):
+    # n is a python integer. negative powers raise LinAlgError for singular
+    # matrices.
+    if not _is_square(a):
+        return None
+    return _machine_result(numpy.linalg.matrix_power(a, n))
+
+
+def machine_matrix_exp(a):
+    # scaling and squaring with the diagonal Pade approximant of degree 6,
+    # see Golub and Van Loan, Matrix Computations, algorithm 11.3.1.
+    if not _is_square(a):
+        return None
+    norm = numpy.linalg.norm(a, numpy.inf)
+    if not numpy.isfinite(norm):
+        return None
+    j = max(0, math.frexp(norm)[1] + 1)
+    a = a / 2. ** j
+    q = 6
+    c = 1.
+    x = numpy.identity(a.shape[0], dtype=a.dtype)
+    n = x
+    d = x
+    for k in range(1, q + 1):
+        c = c * (q - k + 1) / (k * (2 * q - k + 1))
+        x = numpy.dot(a, x)
+        n = n + c * x
+        d = d + (-1) ** k * c * x
+    e = numpy.linalg.solve(d, n)
+    for _ in range(j):
+        e = numpy.dot(e, e)
+    return _machine_result(e)
+
+
+#
+# VECTORIZED MACHINE FUNCTIONS
+#
+
+# vectorized_function translates an expression into a function that computes
+# it at machine precision for whole arrays of values of its variables, e.g.
+# for all the sample points of a plot at once. the result is None for points
+# where it is not a finite real, just as for a (quiet) compiled function.
+
+_vectorized_constants = {
+    'System`Pi': math.pi,
+    'System`E': math.e,
+    'System`Degree': math.pi / 180,
+    'System`GoldenRatio': (1 + math.sqrt(5)) / 2,
+    'System`EulerGamma': 0.5772156649015329,
+}
+
+
+def _log(*a):
+    if len(a) == 2:
+        return numpy.log(a[1]) / numpy.log(a[0])
+    return numpy.log(*a)
+
+
+def _arctan(*a):
+    if len(a) == 2:
+        return numpy.arctan2(a[1], a[0])
+    return numpy.arctan(*a)
+
+
+# head -> (numpy function, allowed numbers of arguments or None for any)
+_vectorized_functions = {
+    'System`Plus': (lambda *a: reduce(numpy.add, a), None),
+    'System`Times': (lambda *a: reduce(numpy.multiply, a), None),
+    'System`Power': (numpy.power, (2,)),
+    'System`Sqrt': (numpy.sqrt, (1,)),
+    'System`Exp': (numpy.exp, (1,)),
+    'System`Log': (_log, (1, 2)),
+    'System`Sin': (numpy.sin, (1,)),
+    'System`Cos': (numpy.cos, (1,)),
+    'System`Tan': (numpy.tan, (1,)),
+    'System`Sec': (lambda a: 1 / numpy.cos(a), (1,)),
+    'System`Csc': (lambda a: 1 / numpy.sin(a), (1,)),
+    'System`Cot': (lambda a: 1 / numpy.tan(a), (1,)),
+    'System`ArcSin': (numpy.arcsin, (1,)),
+    'System`ArcCos': (numpy.arccos, (1,)),
+    'System`ArcTan': (_arctan, (1, 2)),
+    'System`Sinh': (numpy.sinh, (1,)),
+    'System`Cosh': (numpy.cosh, (1,)),
+    'System`Tanh': (numpy.tanh, (1,)),
+    'System`Sech': (lambda a: 1 / numpy.cosh(a), (1,)),
+    'System`Csch': (lambda a: 1 / numpy.sinh(a), (1,)),
+    'System`Coth': (lambda a: 1 / numpy.tanh(a), (1,)),
+    'System`ArcSinh': (numpy.arcsinh, (1,)),
+    'System`ArcCosh': (numpy.arccosh, (1,)),
+    'System`ArcTanh': (numpy.arctanh, (1,)),
+    'System`Abs': (numpy.abs, (1,)),
+    'System`Sign': (numpy.sign, (1,)),
+    'System`Floor': (numpy.floor, (1,)),
+    'System`Ceiling': (numpy.ceil, (1,)),
+    'System`Round': (numpy.round, (1,)),  # both round half to even
+    'System`Mod': (numpy.mod, (2,)),
+    'System`Min': (lambda *a: reduce(numpy.minimum, a), None),
+    'System`Max': (lambda *a: reduce(numpy.maximum, a), None),
+}
+
+
+def _vectorize(expr, arg_names):
+    # gives a function of the list of argument arrays, or None if expr
+    # cannot be vectorized.
+    if expr.is_atom():
+        name = expr.get_name()
+        if name in arg_names:
+            index = arg_names.index(name)
+            return lambda args: args[index]
+        if name:
+            value = _vectorized_constants.get(name)
+        elif expr.is_numeric():
+            value = expr.round_to_float()
+        else:
+            value = None
+        if value is None:
+            return None
+        return lambda args: value
+
+    entry = _vectorized_functions.get(expr.get_head_name())
+    if entry is None:
+        return None
+    f, counts = entry
+    if counts is not None and len(expr.leaves) not in counts:
+        return None
+    leaves = [_vectorize(leaf, arg_names) for leaf in expr.leaves]
+    if not leaves or None in leaves:
+        return None
+    return lambda args: f(*[leaf(args) for leaf in leaves])
+
+
+def vectorized_function(expr, arg_names, expect_list=False):
+    # gives a function that takes a list of values for each of the
+    # variables arg_names and gives the list of the values of expr, or None
+    # if expr cannot be vectorized. with expect_list, expr needs to be a list,
+    # whose values are given as lists.
+    if expect_list:
+        if not expr.has_form('List', None):
+            return None
+        parts = [_vectorize(leaf, arg_names) for leaf in expr.leaves]
+    else:
+        parts = [_vectorize(expr, arg_names)]
+    if None in parts:
+        return None
+
+    def vectorized(*args):
+        args = [numpy.asarray(arg, dtype=numpy.float64) for arg in args]
+        shape = numpy.broadcast(*args).shape if args else ()
+        with numpy.errstate(all='ignore'):
+            values = numpy.empty(shape + (len(parts),))
+            for i, part in enumerate(parts):
+                values[..., i] = part(args)
+        finite = numpy.all(numpy.isfinite(values), axis=-1).tolist()
+        if expect_list:
+            values = values.tolist()
+        else:
+            values = values[..., 0].tolist()
+        return [value if ok else None for value, ok in zip(values, finite)]
+
+    return vectorized
+
+
 #
 # CONDITIONALS AND PROGRAM FLOW
 #
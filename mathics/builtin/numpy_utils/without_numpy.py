@@ -6,11 +6,24 @@ A couple of helper functions for doing numpy-like stuff without numpy.
 """
 
 from mathics.core.expression import Expression
-from itertools import chain
+from itertools import chain, repeat
+from six.moves import zip
 from contextlib import contextmanager
+from functools import reduce
 from math import sin as sinf, cos as cosf, sqrt as sqrtf, atan2 as atan2f, floor as floorf
+from math import fsum
+import array as array_module
 import operator
 import inspect
+import struct
+
+try:
+    from math import isfinite
+except ImportError:  # Python 2
+    from math import isinf, isnan
+
+    def isfinite(x):
+        return not (isinf(x) or isnan(x))
 
 # If numpy is not available, we define the following fallbacks that are useful for implementing a similar
 # logic in pure python without numpy. They obviously work on regular python array though, not numpy arrays.
@@ -182,6 +195,333 @@ def instantiate_elements(a, new_element, d=1):
     return Expression('List', *leaves)
 
 
+#
+# PACKED ARRAYS
+#
+
+# without numpy, packed arrays keep their values in a flat array.array
+# together with their shape. see with_numpy.py for the semantics of the
+# functions below.
+
+try:
+    _int_typecode = 'q'
+    array_module.array(_int_typecode)
+except ValueError:  # Python 2
+    _int_typecode = 'l'
+
+_max_exact_int = 2 ** 53
+
+
+class _Packed(object):
+    def __init__(self, data, shape):
+        self.data = data
+        self.shape = shape
+
+    @property
+    def kind(self):
+        return 'f' if self.data.typecode == 'd' else 'i'
+
+    def __len__(self):
+        return self.shape[0]
+
+    def stride(self):
+        return reduce(operator.mul, self.shape[1:], 1)
+
+    def rows(self):
+        stride = self.stride()
+        for i in range(self.shape[0]):
+            yield _Packed(self.data[i * stride:(i + 1) * stride], self.shape[1:])
+
+    def tolist(self):
+        if len(self.shape) == 1:
+            return self.data.tolist()
+        return [row.tolist() for row in self.rows()]
+
+
+def _packed_array(kind, values, shape):
+    try:
+        return _Packed(array_module.array('d' if kind == 'f' else _int_typecode, values), tuple(shape))
+    except (OverflowError, TypeError):
+        return None
+
+
+def _packed_result(kind, values, shape):
+    if kind == 'f':
+        if not all(isfinite(x) for x in values):
+            return None
+        values = [x + 0. for x in values]  # no signed zeros
+    return _packed_array(kind, values, shape)
+
+
+def _flatten(a):
+    if isinstance(a, list) and a and isinstance(a[0], list):
+        return list(chain(*[_flatten(x) for x in a]))
+    return a
+
+
+def _shape(a):
+    shape = []
+    while isinstance(a, list):
+        shape.append(len(a))
+        a = a[0] if a else None
+    return shape
+
+
+def _packed_operand(x):
+    # returns kind, flat values, shape and bound of integer values
+    if isinstance(x, _Packed):
+        kind, values, shape = x.kind, x.data.tolist(), x.shape
+        bound = max([abs(v) for v in values] or [0])
+    else:
+        kind, values, shape = 'f' if isinstance(x, float) else 'i', None, None
+        bound = abs(x)
+    if kind == 'f':
+        bound = None
+    return kind, values, shape, bound
+
+
+def _packed_elementwise(f, a, b):
+    kind_a, values_a, shape_a, bound_a = _packed_operand(a)
+    kind_b, values_b, shape_b, bound_b = _packed_operand(b)
+    if 'f' in (kind_a, kind_b):
+        if any(bound is not None and bound > _max_exact_int for bound in (bound_a, bound_b)):
+            return None
+        kind = 'f'
+    else:
+        kind = 'i'
+    if values_a is None:
+        values = [f(a, y) for y in values_b]
+        shape = shape_b
+    elif values_b is None:
+        values = [f(x, b) for x in values_a]
+        shape = shape_a
+    else:
+        if shape_a != shape_b:
+            return None
+        values = [f(x, y) for x, y in zip(values_a, values_b)]
+        shape = shape_a
+    if kind == 'f':
+        values = [float(x) for x in values]
+    return _packed_result(kind, values, shape)
+
+
+def pack(a, kind):
+    return _packed_array(kind, _flatten(a), _shape(a))
+
+
+def packed_kind(a):
+    return a.kind
+
+
+def packed_shape(a):
+    return a.shape
+
+
+def packed_tolist(a):
+    return a.tolist()
+
+
+def packed_item(a, i):
+    if len(a.shape) == 1:
+        return a.data[i]
+    stride = a.stride()
+    if i < 0:
+        i += a.shape[0]
+    return _Packed(a.data[i * stride:(i + 1) * stride], a.shape[1:])
+
+
+def packed_part(a, indices):
+    def part(values, indices):
+        index = indices[0]
+        if isinstance(index, slice):
+            picked = values[index]
+            if len(indices) > 1:
+                picked = [part(x, indices[1:]) for x in picked]
+            return picked
+        elif len(indices) > 1:
+            return part(values[index], indices[1:])
+        else:
+            return values[index]
+
+    result = part(a.tolist(), indices)
+    if isinstance(result, list):
+        return pack(result, a.kind)
+    return result
+
+
+def packed_stack(arrays):
+    data = array_module.array(arrays[0].data.typecode)
+    for x in arrays:
+        data.extend(x.data)
+    return _Packed(data, (len(arrays),) + arrays[0].shape)
+
+
+def packed_equal(a, b):
+    return a.kind == b.kind and a.shape == b.shape and a.data == b.data
+
+
+def packed_range(start, stop, step):
+    values = list(range(start, stop + (1 if step > 0 else -1), step))
+    return _packed_array('i', values, [len(values)])
+
+
+def packed_constant(value, shape):
+    kind = 'f' if isinstance(value, float) else 'i'
+    return _packed_array(kind, [value] * reduce(operator.mul, shape, 1), shape)
+
+
+def packed_add(a, b):
+    return _packed_elementwise(operator.add, a, b)
+
+
+def packed_multiply(a, b):
+    return _packed_elementwise(operator.mul, a, b)
+
+
+def packed_abs(a):
+    return _packed_result(a.kind, [abs(x) for x in a.data], a.shape)
+
+
+def packed_floor(a):
+    if a.kind == 'i':
+        return a
+    return _packed_array('i', [int(floorf(x)) for x in a.data], a.shape)
+
+
+def packed_mod(a, b):
+    if any(isinstance(x, float) or (isinstance(x, _Packed) and x.kind != 'i') for x in (a, b)):
+        return None
+    if (b.data if isinstance(b, _Packed) else [b]).count(0):
+        return None
+    return _packed_elementwise(operator.mod, a, b)
+
+
+def packed_map(f, *operands):
+    shapes = set(x.shape for x in operands if isinstance(x, _Packed))
+    if len(shapes) != 1:
+        return None
+    columns = []
+    for x in operands:
+        if isinstance(x, _Packed):
+            columns.append([float(value) for value in x.data])
+        else:
+            columns.append(repeat(float(x)))
+    values = []
+    for args in zip(*columns):
+        value = f(*args)
+        if value is None:
+            return None
+        values.append(value)
+    return _packed_result('f', values, shapes.pop())
+
+
+def packed_total(a):
+    if len(a) == 0:
+        return None
+    rows = [row.data.tolist() for row in a.rows()] if len(a.shape) > 1 else [[x] for x in a.data]
+    if a.kind == 'f':
+        total = [fsum(column) for column in zip(*rows)]
+    else:
+        total = [sum(column) for column in zip(*rows)]
+    if len(a.shape) == 1:
+        total = _packed_result(a.kind, total, [1])
+        return None if total is None else total.data[0]
+    return _packed_result(a.kind, total, a.shape[1:])
+
+
+def packed_dot(a, b):
+    if a.shape[-1] != b.shape[0] or len(a.shape) > 2 or len(b.shape) > 2:
+        return None
+    kind = 'f' if 'f' in (a.kind, b.kind) else 'i'
+    if kind == 'f':
+        bounds = [max([abs(x) for x in y.data] or [0]) for y in (a, b) if y.kind == 'i']
+        if any(bound > _max_exact_int for bound in bounds):
+            return None
+        total = fsum
+    else:
+        total = sum
+    rows_a = a.tolist() if len(a.shape) == 2 else [a.tolist()]
+    rows_b = b.tolist() if len(b.shape) == 2 else [[x] for x in b.tolist()]
+    columns_b = list(zip(*rows_b))
+    result = [total(x * y for x, y in zip(row, column))
+              for row in rows_a for column in columns_b]
+    shape = a.shape[:-1] + b.shape[1:]
+    if not shape:
+        result = _packed_result(kind, result, [1])
+        return None if result is None else result.data[0]
+    return _packed_result(kind, result, shape)
+
+
+def packed_from_bytes(buffer, code, byteorder, count, offset=0):
+    values = struct.unpack_from('%s%d%s' % (byteorder, count, code), buffer, offset)
+    if code in 'fd':
+        if not all(isfinite(x) for x in values):
+            return None
+        return _packed_array('f', values, [count])
+    return _packed_array('i', values, [count])
+
+
+def packed_to_bytes(a, code, byteorder):
+    if len(a.shape) != 1 or (a.kind == 'f') != (code in 'fd'):
+        return None
+    try:
+        return struct.pack('%s%d%s' % (byteorder, len(a.data), code), *a.data)
+    except (struct.error, OverflowError):
+        return None
+
+
+def packed_buffer(kind, values=()):
+    return array_module.array('d' if kind == 'f' else _int_typecode, values)
+
+
+def packed_from_buffer(buffer, shape):
+    if buffer.typecode == 'd' and not all(isfinite(x) for x in buffer):
+        return None
+    return _Packed(buffer, tuple(shape))
+
+
+#
+# MACHINE PRECISION LINEAR ALGEBRA
+#
+
+# without numpy, there are no machine precision arrays, and all linear
+# algebra is done by sympy.
+
+
+class LinAlgError(Exception):
+    pass
+
+
+def machine_array(a, is_complex):
+    return None
+
+
+def _no_machine_array(*args):
+    raise NotImplementedError
+
+
+machine_det = _no_machine_array
+machine_inverse = _no_machine_array
+machine_solve = _no_machine_array
+machine_ill_conditioned = _no_machine_array
+machine_least_squares = _no_machine_array
+machine_pseudo_inverse = _no_machine_array
+machine_null_space = _no_machine_array
+machine_matrix_rank = _no_machine_array
+machine_eigenvalues = _no_machine_array
+machine_eigenvectors = _no_machine_array
+machine_matrix_power = _no_machine_array
+machine_matrix_exp = _no_machine_array
+
+
+#
+# VECTORIZED MACHINE FUNCTIONS
+#
+
+def vectorized_function(expr, arg_names, expect_list=False):
+    return None
+
+
 #
 # CONDITIONALS AND PROGRAM FLOW
 #
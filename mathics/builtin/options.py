@@ -12,7 +12,6 @@ import six
 
 from mathics.builtin.base import Builtin, Test
 from mathics.core.expression import Symbol, Expression, get_default_value, ensure_context
-from mathics.builtin.image import Image
 
 
 class Options(Builtin):
@@ -81,6 +80,8 @@ class Options(Builtin):
 
         name = f.get_name()
         if not name:
+            from mathics.builtin.image import Image
+
             if isinstance(f, Image):
                 # FIXME ColorSpace, MetaInformation
                 options = f.metadata
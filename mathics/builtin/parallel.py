@@ -0,0 +1,503 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parallel Computing
+
+The parallel functions evaluate independent parts of a computation in
+worker processes, the parallel kernels. Each kernel has its own builtin
+definitions, which are loaded once when it starts, and its own user
+definitions.
+
+Before a computation, the user definitions of the symbols it refers to
+are sent to the kernels, together with those given to
+'DistributeDefinitions' and those sent before, so that definitions
+changed or removed meanwhile are changed or removed on the kernels as
+well. Definitions made on the kernels themselves (e.g. with
+'ParallelEvaluate') stay there and are not seen by the main evaluation.
+The kernels are shared by all sessions, and all their user definitions
+are replaced when another session uses them.
+"""
+
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import multiprocessing
+import traceback
+import weakref
+
+import six
+from six.moves import range
+
+from mathics import settings
+from mathics.builtin.base import Builtin
+from mathics.core.expression import Expression, Symbol, Integer, String
+from mathics.core.evaluation import Evaluation, EvaluationInterrupt
+
+try:
+    from multiprocessing.connection import wait as _wait
+except ImportError:     # Python 2
+    def _wait(connections, timeout):
+        return [connection for connection in connections
+                if connection.poll(timeout / max(1, len(connections)))]
+
+
+class KernelError(Exception):
+    pass
+
+
+def _kernel_main(connection, builtin_definitions):
+    # the main loop of a parallel kernel. builtin_definitions are those of
+    # the main process if it forked this one, so their builtins need not
+    # be loaded again.
+    from mathics.core.definitions import Definitions
+
+    if builtin_definitions is None:
+        definitions = Definitions(add_builtin=True)
+    else:
+        definitions = builtin_definitions.overlay()
+
+    while True:
+        try:
+            command, payload = connection.recv()
+        except EOFError:
+            break
+        if command == 'close':
+            break
+        try:
+            if command == 'define':
+                _kernel_define(definitions, *payload)
+                reply = None
+            elif command == 'evaluate':
+                reply = [_kernel_evaluate(definitions, expr) for expr in payload]
+            else:
+                raise ValueError(command)
+        except Exception:
+            connection.send((False, traceback.format_exc()))
+        else:
+            connection.send((True, reply))
+    connection.close()
+
+
+def _kernel_define(definitions, user_definitions, removed):
+    # removed are the names whose definitions are gone. if it is None,
+    # user_definitions replace all user definitions instead.
+    if removed is None:
+        definitions.set_user_definitions(user_definitions)
+    else:
+        definitions.set_user_definitions(user_definitions, merge=True)
+        for name in removed:
+            if name in definitions.user:
+                definitions.reset_user_definition(name)
+
+
+def _kernel_evaluate(definitions, expr):
+    # returns the result together with the messages and prints
+    evaluation = Evaluation(definitions, catch_interrupt=False)
+    try:
+        result = expr.evaluate(evaluation)
+    except EvaluationInterrupt:
+        result = Symbol('$Aborted')
+    return result, evaluation.out
+
+
+class Kernel(object):
+    def __init__(self, definitions):
+        start_method = getattr(multiprocessing, 'get_start_method', lambda: 'fork')()
+        if start_method != 'fork':
+            # would have to pickle all builtin definitions
+            definitions = None
+
+        self.connection, child_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_kernel_main, args=(child_connection, definitions))
+        self.process.daemon = True
+        self.process.start()
+        child_connection.close()
+
+        self.owner = None       # (a weak reference to) the Definitions sending them
+        self.sent = set()       # the names whose definitions were sent
+        self.defined = None     # the user definitions sent last
+
+    def send(self, command, payload):
+        self.connection.send((command, payload))
+
+    def receive(self):
+        try:
+            success, reply = self.connection.recv()
+        except (EOFError, IOError):
+            raise KernelError('the kernel process terminated.')
+        if not success:
+            raise KernelError(reply)
+        return reply
+
+    def define(self, definitions, names):
+        # sends the user definitions of names and of the names sent before,
+        # removing those that do not exist anymore. if the kernel was used
+        # with other definitions before, replaces all its user definitions.
+        user = definitions.user
+        is_owner = self.owner is not None and self.owner() is definitions
+        if is_owner:
+            names = names | self.sent
+            removed = sorted(name for name in names if name not in user)
+        else:
+            removed = None
+        payload = (definitions.get_user_definitions(sorted(names)), removed)
+        if not is_owner or payload != self.defined:
+            self.send('define', payload)
+            self.receive()
+            self.owner = weakref.ref(definitions)
+            self.defined = payload
+        self.sent = set(name for name in names if name in user)
+
+    def close(self):
+        try:
+            self.send('close', None)
+        except (IOError, ValueError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+_kernels = []
+
+# the names of the symbols whose definitions are distributed, for each
+# Definitions (see DistributeDefinitions)
+_distributed = weakref.WeakKeyDictionary()
+
+
+def get_kernels(evaluation):
+    if not _kernels:
+        count = settings.PARALLEL_KERNELS or multiprocessing.cpu_count()
+        for _ in range(count):
+            _kernels.append(Kernel(evaluation.definitions))
+    return _kernels
+
+
+def close_kernel(kernel):
+    kernel.close()
+    if kernel in _kernels:
+        _kernels.remove(kernel)
+
+
+def _user_names(exprs, definitions):
+    # the names of the symbols with user definitions that the evaluation of
+    # exprs might use: those occuring in exprs and, recursively, in their
+    # definitions.
+    user = definitions.user
+    names = set()
+    todo = list(exprs)
+    while todo:
+        expr = todo.pop()
+        for atom in expr.get_atoms():
+            name = atom.get_name()
+            if name and name in user and name not in names:
+                names.add(name)
+                definition = user[name]
+                rules = (definition.ownvalues + definition.downvalues +
+                         definition.subvalues + definition.upvalues +
+                         definition.nvalues + definition.defaultvalues)
+                for rule in rules:
+                    todo.append(rule.pattern.expr)
+                    replace = getattr(rule, 'replace', None)
+                    if replace is not None:
+                        todo.append(replace)
+    return names
+
+
+def parallel_evaluate(exprs, evaluation, on_all_kernels=False):
+    """
+    Evaluates the given expressions in the parallel kernels and returns
+    their results. With on_all_kernels, evaluates exprs on each of them
+    instead and returns one list of results for each kernel.
+
+    Raises KernelError if a kernel fails.
+    """
+
+    definitions = evaluation.definitions
+    names = _user_names(exprs, definitions)
+    names.update(_distributed.get(definitions, ()))
+
+    kernels = get_kernels(evaluation)
+    if on_all_kernels:
+        chunks = [(index, exprs, kernel) for index, kernel in enumerate(kernels)]
+        results = [None] * len(kernels)
+    else:
+        # a few chunks for each kernel balance the load
+        size = max(1, -(-len(exprs) // (4 * len(kernels))))
+        chunks = [(start, exprs[start:start + size], None)
+                  for start in range(0, len(exprs), size)]
+        results = [None] * len(exprs)
+
+    busy = {}   # connection -> kernel, chunk
+    try:
+        for kernel in kernels:
+            kernel.define(definitions, names)
+
+        while chunks or busy:
+            idle = [kernel for kernel in kernels if kernel.connection not in busy]
+            for kernel in idle:
+                for index, chunk in enumerate(chunks):
+                    if chunk[2] is None or chunk[2] is kernel:
+                        del chunks[index]
+                        kernel.send('evaluate', chunk[1])
+                        busy[kernel.connection] = (kernel, chunk)
+                        break
+
+            for connection in _wait(list(busy.keys()), 0.1):
+                kernel, (start, chunk, assigned) = busy.pop(connection)
+                reply = kernel.receive()
+                for out in sum((outs for _, outs in reply), []):
+                    evaluation.out.append(out)
+                    evaluation.output.out(out)
+                if on_all_kernels:
+                    results[start] = [result for result, _ in reply]
+                else:
+                    results[start:start + len(chunk)] = [result for result, _ in reply]
+            evaluation.check_stopped()
+    except BaseException:
+        # the kernels that are still busy or failed are not usable anymore
+        for kernel, _ in busy.values():
+            close_kernel(kernel)
+        raise
+    return results
+
+
+class _ParallelBuiltin(Builtin):
+    messages = {
+        'kernel': 'A parallel kernel failed: `1`',
+    }
+
+    def evaluate_parallel(self, exprs, evaluation, on_all_kernels=False):
+        # the results, or None after a message if a kernel failed
+        try:
+            return parallel_evaluate(exprs, evaluation, on_all_kernels)
+        except KernelError as exc:
+            evaluation.message(self.get_name(), 'kernel', String(six.text_type(exc)))
+            return None
+
+
+class ParallelEvaluate(_ParallelBuiltin):
+    """
+    <dl>
+    <dt>'ParallelEvaluate[$expr$]'
+        <dd>evaluates $expr$ on each parallel kernel and returns the
+        list of the results.
+    </dl>
+
+    >> ParallelEvaluate[1 + 1] // Union
+     = {2}
+
+    Definitions made this way stay on the kernels:
+    >> ParallelEvaluate[kernelvalue = 42];
+    >> ParallelEvaluate[kernelvalue] // Union
+     = {42}
+    >> kernelvalue
+     = kernelvalue
+    """
+
+    attributes = ('HoldAll',)
+
+    def apply(self, expr, evaluation):
+        'ParallelEvaluate[expr_]'
+
+        results = self.evaluate_parallel([expr], evaluation, on_all_kernels=True)
+        if results is None:
+            return Symbol('$Failed')
+        return Expression('List', *[kernel_results[0] for kernel_results in results])
+
+
+class DistributeDefinitions(_ParallelBuiltin):
+    """
+    <dl>
+    <dt>'DistributeDefinitions[$s1$, $s2$, ...]'
+        <dd>sends the definitions of the symbols $si$ to the parallel
+        kernels, now and before each later parallel computation.
+    </dl>
+
+    The definitions of symbols that occur in a parallel computation are
+    distributed anyway. Other ones have to be distributed explicitly:
+    >> distributed[x_] := x ^ 2
+    >> DistributeDefinitions[distributed]
+     = {distributed}
+    >> ParallelMap[ToExpression["distributed"], {1, 2, 3}]
+     = {1, 4, 9}
+    """
+
+    attributes = ('HoldAll',)
+
+    messages = {
+        'sym': 'Argument `1` at position `2` is expected to be a symbol.',
+    }
+
+    def apply(self, symbols, evaluation):
+        'DistributeDefinitions[symbols___]'
+
+        symbols = symbols.get_sequence()
+        names = []
+        for index, symbol in enumerate(symbols):
+            if isinstance(symbol, String):
+                symbol = Symbol(evaluation.definitions.lookup_name(symbol.get_string_value()))
+            if not isinstance(symbol, Symbol):
+                evaluation.message(self.get_name(), 'sym', symbol, Integer(index + 1))
+                return
+            names.append(symbol.get_name())
+
+        distributed = _distributed.setdefault(evaluation.definitions, set())
+        distributed.update(names)
+        if self.evaluate_parallel([], evaluation) is None:
+            return Symbol('$Failed')
+        return Expression('List', *[Symbol(name) for name in names])
+
+
+class ParallelMap(_ParallelBuiltin):
+    """
+    <dl>
+    <dt>'ParallelMap[$f$, $expr$]'
+        <dd>applies $f$ to each element of $expr$, evaluating the
+        results in parallel.
+    </dl>
+
+    >> ParallelMap[#^2 &, {1, 2, 3, 4}]
+     = {1, 4, 9, 16}
+    >> square[x_] := x ^ 2
+    >> ParallelMap[square, f[a, b]]
+     = f[a ^ 2, b ^ 2]
+
+    #> ParallelMap[f, x]
+     = x
+    #> ParallelMap[Print, {1, 2}]
+     | 1
+     | 2
+     = {Null, Null}
+    """
+
+    def apply(self, f, expr, evaluation):
+        'ParallelMap[f_, expr_]'
+
+        if expr.is_atom():
+            return expr
+        results = self.evaluate_parallel(
+            [Expression(f, leaf) for leaf in expr.leaves], evaluation)
+        if results is None:
+            return Symbol('$Failed')
+        return Expression(expr.head, *results)
+
+
+class _ParallelIteration(_ParallelBuiltin):
+    # evaluates the sequential function for each value of the first
+    # iterator in parallel, and combines the results with
+    # combine_results.
+
+    attributes = ('HoldAll',)
+    sequential = None
+
+    def combine_results(self, results):
+        raise NotImplementedError
+
+    def get_tasks(self, expr, spec, rest, evaluation):
+        # the expressions evaluated for the values of the iterator spec, or
+        # None if they cannot be determined
+        if rest:
+            expr = Expression(self.sequential, expr, *rest)
+        if len(spec.leaves) == 1:
+            count = spec.leaves[0].evaluate(evaluation).get_int_value()
+            if count is None:
+                return None
+            return [expr] * count
+
+        i = spec.leaves[0]
+        values = Expression('Quiet', Expression('Table', i, spec)).evaluate(evaluation)
+        if not values.has_form('List', None):
+            return None
+        return [Expression('Block', Expression('List', Expression('Set', i, value)), expr)
+                for value in values.leaves]
+
+    def apply(self, expr, spec, rest, evaluation):
+        '%(name)s[expr_, spec:({_Symbol, __}|{_}), rest___]'
+
+        rest = rest.get_sequence()
+        tasks = self.get_tasks(expr, spec, rest, evaluation)
+        if tasks is None:
+            # e.g. symbolic bounds
+            return Expression(self.sequential, expr, spec, *rest)
+        results = self.evaluate_parallel(tasks, evaluation)
+        if results is None:
+            return Symbol('$Failed')
+        return self.combine_results(results)
+
+
+class ParallelTable(_ParallelIteration):
+    """
+    <dl>
+    <dt>'ParallelTable[$expr$, $iterators$]'
+        <dd>works like 'Table', but evaluates the parts for the
+        different values of the first iterator in parallel.
+    </dl>
+
+    >> ParallelTable[i ^ 2, {i, 5}]
+     = {1, 4, 9, 16, 25}
+    >> ParallelTable[i + j, {i, 2}, {j, 3}]
+     = {{2, 3, 4}, {3, 4, 5}}
+    >> ParallelTable[x, {3}]
+     = {x, x, x}
+
+    The definitions of the symbols involved are sent to the kernels:
+    >> g[x_] := x + 1
+    >> ParallelTable[g[i], {i, {a, b}}]
+     = {1 + a, 1 + b}
+
+    #> ParallelTable[i, {i, n}]
+     : Iterator does not have appropriate bounds.
+     = Table[i, {i, n}]
+    """
+
+    sequential = 'Table'
+
+    def combine_results(self, results):
+        return Expression('List', *results)
+
+
+class ParallelSum(_ParallelIteration):
+    """
+    <dl>
+    <dt>'ParallelSum[$expr$, $iterators$]'
+        <dd>works like 'Sum', but evaluates the summands for the
+        different values of the first iterator in parallel.
+    </dl>
+
+    >> ParallelSum[i ^ 2, {i, 10}]
+     = 385
+    >> ParallelSum[i j, {i, 3}, {j, 4}]
+     = 60
+
+    Sums that cannot be split into parts are computed as with 'Sum':
+    >> ParallelSum[k, {k, 1, n}]
+     = n (1 + n) / 2
+    """
+
+    sequential = 'Sum'
+
+    def combine_results(self, results):
+        return Expression('Plus', *results)
+
+
+class ParallelDo(_ParallelIteration):
+    """
+    <dl>
+    <dt>'ParallelDo[$expr$, $iterators$]'
+        <dd>works like 'Do', but evaluates $expr$ for the different
+        values of the first iterator in parallel.
+    </dl>
+
+    >> ParallelDo[Print[i], {i, 3}]
+     | 1
+     | 2
+     | 3
+    """
+
+    sequential = 'Do'
+
+    def combine_results(self, results):
+        return Symbol('Null')
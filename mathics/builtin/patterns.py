@@ -38,14 +38,15 @@ from __future__ import absolute_import
 
 from six.moves import range
 
-from mathics.builtin.base import Builtin, BinaryOperator, PostfixOperator
+from mathics.builtin.base import Builtin, BinaryOperator, PostfixOperator, BoxConstruct
 from mathics.builtin.base import PatternObject
 from mathics.builtin.lists import python_levelspec, InvalidLevelspecError
 
 from mathics.core.expression import (
-    Symbol, Expression, Number, Integer, Rational, Real)
+    Atom, Symbol, Expression, Number, Integer, Rational, Real)
+from mathics.core.definitions import DispatchIndex
 from mathics.core.rules import Rule
-from mathics.core.pattern import Pattern, StopGenerator
+from mathics.core.pattern import Pattern, ExpressionPattern, StopGenerator
 
 
 class Rule_(BinaryOperator):
@@ -98,6 +99,10 @@ class RuleDelayed(BinaryOperator):
 
 
 def create_rules(rules_expr, expr, name, evaluation, extra_args=[]):
+    if rules_expr.has_form('Dispatch', 2):
+        table = rules_expr.leaves[1]
+        if isinstance(table, DispatchTable):
+            return table.get_index(evaluation), False
     if rules_expr.has_form('List', None):
         rules = rules_expr.leaves
     else:
@@ -383,6 +388,8 @@ class ReplaceList(Builtin):
         if ret:
             return rules
 
+        if isinstance(rules, DispatchIndex):
+            rules = rules.get_matching_rules(expr)
         list = []
         for rule in rules:
             result = rule.apply(
@@ -392,6 +399,136 @@ class ReplaceList(Builtin):
         return Expression('List', *list)
 
 
+class DispatchTable(Atom):
+    def __init__(self, rules, **kwargs):
+        super(DispatchTable, self).__init__(**kwargs)
+        self.rules = rules
+        self.index = None
+
+    def get_index(self, evaluation):
+        # the index is built on first use, and again after unpickling
+        if self.index is None:
+            self.index = DispatchIndex(
+                [Rule(rule.leaves[0], rule.leaves[1]) for rule in self.rules.leaves],
+                evaluation.definitions)
+        return self.index
+
+    def __str__(self):
+        return '-DispatchTable-'
+
+    def do_copy(self):
+        result = DispatchTable(self.rules)
+        result.index = self.index
+        return result
+
+    def default_format(self, evaluation, form):
+        return str(self)
+
+    def get_sort_key(self, pattern_sort=False):
+        if pattern_sort:
+            return super(DispatchTable, self).get_sort_key(True)
+        else:
+            return hash(self)
+
+    def same(self, other):
+        return isinstance(other, DispatchTable) and self.rules.same(other.rules)
+
+    def to_python(self, *args, **kwargs):
+        return None
+
+    def __hash__(self):
+        return hash(('DispatchTable', self.rules))
+
+    def __getstate__(self):
+        state = super(DispatchTable, self).__getstate__()
+        state['index'] = None
+        return state
+
+    def atom_to_boxes(self, f, evaluation):
+        return Expression('DispatchTableBox')
+
+
+class DispatchTableBox(BoxConstruct):
+    def boxes_to_text(self, leaves, **options):
+        return '-DispatchTable-'
+
+    def boxes_to_xml(self, leaves, **options):
+        return '-DispatchTable-'
+
+    def boxes_to_tex(self, leaves, **options):
+        return '-DispatchTable-'
+
+
+class Dispatch(Builtin):
+    """
+    <dl>
+    <dt>'Dispatch[{$rule1$, $rule2$, ...}]'
+        <dd>gives a dispatch table for the rules, which can be used
+        instead of the list of rules in 'Replace', 'ReplaceAll',
+        'ReplaceRepeated' and 'ReplaceList'.
+    </dl>
+
+    A dispatch table indexes its rules by the expressions they can match,
+    so that applying a long list of rules does not need to try each rule
+    on each subexpression:
+    >> d = Dispatch[{a -> 1, b -> 2, f[x_] :> x ^ 2, _Integer -> n}]
+     = Dispatch[{a -> 1, b -> 2, f[x_] :> x ^ 2, _Integer -> n}, -DispatchTable-]
+    >> {a, b, c, f[3], 7} /. d
+     = {1, 2, c, 9, n}
+
+    The first matching rule wins, just like with lists of rules:
+    >> Replace[5, Dispatch[{_Integer -> int, 5 -> five}]]
+     = int
+    >> ReplaceList[f[5], Dispatch[{f[x_] :> x, f[5] -> five, g[x_] -> x}]]
+     = {5, five}
+    >> x + y //. Dispatch[{x -> y, y -> z}]
+     = 2 z
+
+    #> Dispatch[x]
+     : x is not a valid rule or list of rules.
+     = Dispatch[x]
+    #> Dispatch[{{a -> 1}}]
+     : {{a -> 1}} is not a valid rule or list of rules.
+     = Dispatch[{{a -> 1}}]
+    #> Dispatch[d] === d
+     = True
+    #> Dispatch[a -> 1]
+     = Dispatch[{a -> 1}, -DispatchTable-]
+    #> f[a, b] /. Dispatch[{f[b, a] -> ba, f[a, b] -> ab}]
+     = ab
+    #> (a + b + c) /. Dispatch[{a + b -> s, x_Symbol -> 0}]
+     = c + s
+    #> {y, f[x]} /. Dispatch[{f[x_] + y_. :> {x, y}}]
+     = {y, {x, 0}}
+    #> {a, 1.5, "s", 1/2} /. Dispatch[{1/2 -> half, "s" -> string, x_Real :> 2 x, HoldPattern[a] -> 0}]
+     = {0, 3., string, half}
+    #> Hold[f[1], f[2]] /. Dispatch[{f[1] -> one, f[x_] /; x > 1 -> more}]
+     = Hold[one, more]
+    #> SetAttributes[og, Orderless]; Hold[og[b, a]] /. Dispatch[{og[a, b] -> ab}]
+     = Hold[ab]
+    """
+
+    attributes = ('HoldAll', 'Protected')
+
+    messages = {
+        'invrl': "`1` is not a valid rule or list of rules.",
+    }
+
+    def apply(self, rules, evaluation):
+        'Dispatch[rules_]'
+        rules = rules.evaluate(evaluation)
+        if rules.has_form('Dispatch', 2) and isinstance(rules.leaves[1], DispatchTable):
+            return rules
+        if rules.has_form('List', None):
+            rules_list = rules
+        else:
+            rules_list = Expression('List', rules)
+        for rule in rules_list.leaves:
+            if not rule.has_form(('Rule', 'RuleDelayed'), 2):
+                return evaluation.message('Dispatch', 'invrl', rules)
+        return Expression('Dispatch', rules_list, DispatchTable(rules_list))
+
+
 class PatternTest(BinaryOperator, PatternObject):
     """
     <dl>
@@ -1217,6 +1354,18 @@ class Condition(BinaryOperator, PatternObject):
      = p[3]
     >> f[-3]
      = f[-3]
+
+    ## The test is tried as soon as its variables are bound
+    #> MatchQ[Sum[a[i], {i, 30}], x_ + y_ /; False]
+     = False
+    #> MatchQ[g[5, Sum[a[i], {i, 30}]], g[n_, x_ + y_ /; n < 3]]
+     = False
+    #> {5, 6, 7, 8} /. {a_, b__, c__} /; a > b :> {a, b}
+     = {5, 6, 7, 8}
+    #> {5, 1, 7, 8} /. {a_, b_, c__} /; a > b :> {a, b, {c}}
+     = {5, 1, {7, 8}}
+    #> h[3] + h[1] + g[2] /. h[i_] + h[j_] + r_ /; i < j :> s[i, j] + r
+     = g[2] + s[1, 3]
     """
 
     operator = '/;'
@@ -1231,16 +1380,66 @@ class Condition(BinaryOperator, PatternObject):
         super(Condition, self).init(expr)
         self.pattern = Pattern.create(expr.leaves[0])
         self.test = expr.leaves[1]
+        # the pattern variables the test depends on
+        self.test_vars = sorted(name for name in _pattern_names(expr.leaves[0])
+                                if self.test.has_symbol(name))
 
     def match(self, yield_func, expression, vars, evaluation, **kwargs):
+        test_vars = self.test_vars
+
+        def test(new_vars):
+            test_expr = self.test.replace_vars(new_vars)
+            test_result = test_expr.evaluate(evaluation)
+            return test_result.is_true()
+
+        if all(name in vars for name in test_vars):
+            # the result of the test is known before matching
+            if test(vars):
+                self.pattern.match(yield_func, expression, vars, evaluation)
+            return
+
+        # the test is tried as soon as its variables are bound (see
+        # ExpressionPattern.match_leaf), so that the rest of the pattern is
+        # not matched when it fails. passed holds the values for which it
+        # last succeeded, which do not need to be tested again.
+        passed = [None]
+
+        def guard(old_vars, new_vars):
+            if (all(name in old_vars for name in test_vars) or
+                    not all(name in new_vars for name in test_vars)):
+                return True
+            if test(new_vars):
+                passed[0] = [new_vars[name] for name in test_vars]
+                return True
+            return False
+
         # for new_vars, rest in self.pattern.match(expression, vars,
         # evaluation):
         def yield_match(new_vars, rest):
-            test_expr = self.test.replace_vars(new_vars)
-            test_result = test_expr.evaluate(evaluation)
-            if test_result.is_true():
+            if passed[0] is not None and all(
+                    new_vars[name] is value
+                    for name, value in zip(test_vars, passed[0])):
                 yield_func(new_vars, rest)
-        self.pattern.match(yield_match, expression, vars, evaluation)
+            elif test(new_vars):
+                yield_func(new_vars, rest)
+        if isinstance(self.pattern, ExpressionPattern):
+            self.pattern.match(yield_match, expression, vars, evaluation,
+                               guard=guard)
+        else:
+            self.pattern.match(yield_match, expression, vars, evaluation)
+
+
+def _pattern_names(expr):
+    # the names of the variables of the pattern expr
+    names = set()
+    if not expr.is_atom():
+        if expr.has_form('Pattern', 2):
+            name = expr.leaves[0].get_name()
+            if name:
+                names.add(name)
+        for leaf in expr.leaves:
+            names.update(_pattern_names(leaf))
+    return names
 
 
 class OptionsPattern(PatternObject):
@@ -22,10 +22,12 @@ from mathics.builtin.base import Builtin
 from mathics.builtin.scoping import dynamic_scoping
 from mathics.builtin.options import options_to_rules
 from mathics.builtin.numeric import chop
+from mathics.builtin.numpy_utils import vectorized_function
 
 
 try:
-    from mathics.builtin.compile import _compile, CompileArg, CompileError, real_type
+    from mathics.builtin.compile import (
+        _compile, CompileArg, CompileError, CompiledRuntimeError, real_type)
     has_compile = True
 except ImportError as e:
     has_compile = False
@@ -178,20 +180,35 @@ def compile_quiet_function(expr, arg_names, evaluation, expect_list):
     Given an expression return a quiet callable version.
     Compiles the expression where possible.
     '''
-    if has_compile and not expect_list:
+    if has_compile and (not expect_list or expr.has_form('List', None)):
+        args = [CompileArg(arg_name, real_type) for arg_name in arg_names]
         try:
-            cfunc = _compile(expr, [CompileArg(arg_name, real_type) for arg_name in arg_names])
+            if expect_list:
+                # compile each component of list-valued functions
+                cfuncs = [_compile(leaf, args) for leaf in expr.leaves]
+            else:
+                cfunc = _compile(expr, args)
         except CompileError:
             pass
         else:
-            def quiet_f(*args):
-                try:
-                    result = cfunc(*args)
-                    if not (isnan(result) or isinf(result)):
-                        return result
-                except:
-                    pass
-                return None
+            if expect_list:
+                def quiet_f(*args):
+                    try:
+                        result = [cfunc(*args) for cfunc in cfuncs]
+                        if not any(isnan(value) or isinf(value) for value in result):
+                            return result
+                    except (ArithmeticError, ValueError, TypeError, CompiledRuntimeError):
+                        pass
+                    return None
+            else:
+                def quiet_f(*args):
+                    try:
+                        result = cfunc(*args)
+                        if not (isnan(result) or isinf(result)):
+                            return result
+                    except (ArithmeticError, ValueError, TypeError, CompiledRuntimeError):
+                        pass
+                    return None
             return quiet_f
 
     expr = Expression('N', expr)
@@ -216,6 +233,63 @@ def compile_quiet_function(expr, arg_names, evaluation, expect_list):
     return quiet_f
 
 
+# the distance, as a fraction of the size of the plot, by which the lines of
+# Plot and friends may deviate from the function (about half a pixel)
+_refinement_tolerance = 0.001
+
+
+def _segment_distance(a, m, b, xscale, yscale):
+    # the distance of the point m from the line segment from a to b in the
+    # scaled coordinates of the plot.
+    ax, ay = a[0] * xscale, a[1] * yscale
+    dx, dy = b[0] * xscale - ax, b[1] * yscale - ay
+    mx, my = m[0] * xscale - ax, m[1] * yscale - ay
+    length = dx * dx + dy * dy
+    if length > 0:
+        t = min(max((mx * dx + my * dy) / length, 0.), 1.)
+        mx -= t * dx
+        my -= t * dy
+    return sqrt(mx * mx + my * my)
+
+
+# cos of the angle between successive line segments above which Plot and
+# friends consider an oscillation to be undersampled
+_refinement_bend = cos(10 * pi / 180)
+
+
+def _bend(a, m, b, xscale, yscale):
+    # if the line from a over m to b bends sharply at m, gives the length
+    # of its longer segment in the scaled coordinates of the plot. gives
+    # None if it does not, or if the segments are shorter than the tolerance
+    # anyway.
+    x1, y1 = (m[0] - a[0]) * xscale, (m[1] - a[1]) * yscale
+    x2, y2 = (b[0] - m[0]) * xscale, (b[1] - m[1]) * yscale
+    length1 = sqrt(x1 * x1 + y1 * y1)
+    length2 = sqrt(x2 * x2 + y2 * y2)
+    length = max(length1, length2)
+    if length <= _refinement_tolerance or length1 == 0 or length2 == 0:
+        return None
+    if (x1 * x2 + y1 * y2) / (length1 * length2) < _refinement_bend:
+        return length
+
+
+def compile_quiet_batch_function(expr, arg_names, evaluation, expect_list):
+    '''
+    Like compile_quiet_function, but the callable takes a list of values
+    for each argument and gives the list of results for all the points.
+    Computes them at once with numpy where possible.
+    '''
+    vfunc = vectorized_function(expr, arg_names, expect_list)
+    if vfunc is not None:
+        return vfunc
+
+    quiet_f = compile_quiet_function(expr, arg_names, evaluation, expect_list)
+
+    def quiet_batch_f(*args):
+        return [quiet_f(*point) for point in zip(*args)]
+    return quiet_batch_f
+
+
 def automatic_plot_range(values):
     """ Calculates mean and standard deviation, throwing away all points
     which are more than 'thresh' number of standard deviations away from
@@ -280,6 +354,7 @@ class _Plot(Builtin):
         'Mesh': 'None',
         'PlotRange': 'Automatic',
         'PlotPoints': 'None',
+        'MaxPlotPoints': 'Automatic',
         'Exclusions': 'Automatic',
     })
 
@@ -290,6 +365,8 @@ class _Plot(Builtin):
         'prng': ("Value of option PlotRange -> `1` is not All, Automatic or "
                  "an appropriate list of range specifications."),
         'ppts': "Value of option PlotPoints -> `1` is not an integer >= 2.",
+        'invmaxpp': ("Value of option MaxPlotPoints -> `1` is not a positive "
+                     "integer or Infinity."),
         'invexcl': ("Value of Exclusions -> `1` is not None, Automatic or an "
                     "appropriate list of constraints."),
     }
@@ -370,7 +447,7 @@ class _Plot(Builtin):
         maxrecursion = maxrecursion_option.to_python()
         try:
             if maxrecursion == 'System`Automatic':
-                maxrecursion = 3
+                maxrecursion = 6
             elif maxrecursion == float('inf'):
                 maxrecursion = max_recursion_limit
                 raise ValueError
@@ -389,6 +466,16 @@ class _Plot(Builtin):
                                max_recursion_limit)
         assert isinstance(maxrecursion, int)
 
+        # MaxPlotPoints Option
+        maxplotpoints_option = self.get_option(options, 'MaxPlotPoints', evaluation)
+        maxplotpoints = maxplotpoints_option.to_python()
+        if maxplotpoints == 'System`Automatic':
+            maxplotpoints = 5000
+        elif not (maxplotpoints == float('inf') or
+                  (isinstance(maxplotpoints, int) and maxplotpoints > 0)):
+            evaluation.message(self.get_name(), 'invmaxpp', maxplotpoints_option)
+            maxplotpoints = 5000
+
         # Exclusions Option
         # TODO: Make exclusions option work properly with ParametricPlot
         def check_exclusion(excl):
@@ -459,10 +546,10 @@ class _Plot(Builtin):
             tmp_mesh_points = []  # For this function only
             continuous = False
             d = (stop - start) / (plotpoints - 1)
-            cf = compile_quiet_function(f, [x_name], evaluation, self.expect_list)
-            for i in range(plotpoints):
-                x_value = start + i * d
-                point = self.eval_f(cf, x_value)
+            cf = compile_quiet_batch_function(f, [x_name], evaluation, self.expect_list)
+            x_values = [start + i * d for i in range(plotpoints)]
+            for x_value, value in zip(x_values, cf(x_values)):
+                point = self.get_point(x_value, value)
                 if point is not None:
                     if continuous:
                         points[-1].append(point)
@@ -513,53 +600,10 @@ class _Plot(Builtin):
                                 points[l] = points[l][:xi]
                         # assert(xvalues[l][-1] <= excl  <= xvalues[l+1][0])
 
-            # Adaptive Sampling - loop again and interpolate highly angled
-            # sections
-
-            # Cos of the maximum angle between successive line segments
-            ang_thresh = cos(pi / 180)
-
-            for line, line_xvalues in zip(points, xvalues):
-                recursion_count = 0
-                smooth = False
-                while not smooth and recursion_count < maxrecursion:
-                    recursion_count += 1
-                    smooth = True
-                    i = 2
-                    while i < len(line):
-                        vec1 = (xscale * (line[i - 1][0] - line[i - 2][0]),
-                                yscale * (line[i - 1][1] - line[i - 2][1]))
-                        vec2 = (xscale * (line[i][0] - line[i - 1][0]),
-                                yscale * (line[i][1] - line[i - 1][1]))
-                        try:
-                            angle = (vec1[0] * vec2[0] + vec1[1] * vec2[1]) \
-                                / sqrt((vec1[0] ** 2 + vec1[1] ** 2) *
-                                       (vec2[0] ** 2 + vec2[1] ** 2))
-                        except ZeroDivisionError:
-                            angle = 0.0
-                        if abs(angle) < ang_thresh:
-                            smooth = False
-                            incr = 0
-
-                            x_value = 0.5 * (line_xvalues[i - 1] +
-                                             line_xvalues[i])
-
-                            point = self.eval_f(cf, x_value)
-                            if point is not None:
-                                line.insert(i, point)
-                                line_xvalues.insert(i, x_value)
-                                incr += 1
-
-                            x_value = 0.5 * (line_xvalues[i - 2] +
-                                             line_xvalues[i - 1])
-                            point = self.eval_f(cf, x_value)
-                            if point is not None:
-                                line.insert(i - 1, point)
-                                line_xvalues.insert(i - 1, x_value)
-                                incr += 1
-
-                            i += incr
-                        i += 1
+            # Adaptive Sampling - subdivide where the lines deviate from
+            # the function
+            self.refine(cf, points, xvalues, xscale, yscale, maxrecursion,
+                        maxplotpoints - plotpoints)
 
             if exclusions == 'System`None':    # Join all the Lines
                 points = [[(xx, yy) for line in points for xx, yy in line]]
@@ -605,6 +649,64 @@ class _Plot(Builtin):
         return Expression('Graphics', Expression('List', *graphics),
                           *options_to_rules(options))
 
+    def refine(self, f, lines, xvalues, xscale, yscale, max_depth, budget):
+        '''
+        Refines the lines sampled from f in place, up to max_depth levels. On
+        each level, the segments that are not resolved yet are split at the
+        middle of their x values. A half needs to be split again if the new
+        point is further than _refinement_tolerance from the old segment, or
+        if the line bends sharply at one of its ends, as it does where
+        oscillations are undersampled. Each level evaluates f once for all
+        its points, at most budget points in total, taking the segments with
+        the largest errors first if there are too many.
+        '''
+        # the error of each segment that needs to be split, 0 for the others
+        errors = [[float('inf')] * (len(line) - 1) for line in lines]
+        for depth in range(max_depth):
+            pending = [(error, l, i) for l, line_errors in enumerate(errors)
+                       for i, error in enumerate(line_errors) if error > 0]
+            if not pending or budget < 1:
+                break
+            if len(pending) > budget:
+                pending.sort(reverse=True)
+                pending = pending[:int(budget)]
+            budget -= len(pending)
+
+            mid_xvalues = [0.5 * (xvalues[l][i] + xvalues[l][i + 1]) for _, l, i in pending]
+            mid_points = dict(
+                ((l, i), (x_value, self.get_point(x_value, value)))
+                for (_, l, i), x_value, value in zip(pending, mid_xvalues, f(mid_xvalues)))
+
+            for l, line in enumerate(lines):
+                line_xvalues = xvalues[l]
+                new_line = [line[0]]
+                new_xvalues = [line_xvalues[0]]
+                new_errors = []
+                for i, error in enumerate(errors[l]):
+                    x_value, point = mid_points.get((l, i), (None, None))
+                    if point is None:
+                        # not split, or undefined in the middle
+                        new_errors.append(error if x_value is None else 0)
+                    else:
+                        error = _segment_distance(line[i], point, line[i + 1], xscale, yscale)
+                        if error <= _refinement_tolerance:
+                            error = 0
+                        new_line.append(point)
+                        new_xvalues.append(x_value)
+                        new_errors.extend((error, error))
+                    new_line.append(line[i + 1])
+                    new_xvalues.append(line_xvalues[i + 1])
+
+                for i in range(1, len(new_line) - 1):
+                    bend = _bend(new_line[i - 1], new_line[i], new_line[i + 1], xscale, yscale)
+                    if bend is not None:
+                        new_errors[i - 1] = max(new_errors[i - 1], bend)
+                        new_errors[i] = max(new_errors[i], bend)
+
+                line[:] = new_line
+                line_xvalues[:] = new_xvalues
+                errors[l] = new_errors
+
 
 class _ListPlot(Builtin):
     messages = {
@@ -864,13 +966,13 @@ class _Plot3D(Builtin):
         for indx, f in enumerate(functions):
             stored = {}
 
-            cf = compile_quiet_function(f, [x.get_name(), y.get_name()], evaluation, False)
+            cf = compile_quiet_batch_function(f, [x.get_name(), y.get_name()], evaluation, False)
 
             def eval_f(x_value, y_value):
                 try:
                     return stored[(x_value, y_value)]
                 except KeyError:
-                    value = cf(x_value, y_value)
+                    value = cf([x_value], [y_value])[0]
                     if value is not None:
                         value = float(value)
                     stored[(x_value, y_value)] = value
@@ -912,6 +1014,13 @@ class _Plot3D(Builtin):
             # linear (grid) sampling
             numx = plotpoints[0] * 1.0
             numy = plotpoints[1] * 1.0
+
+            # evaluate f at all the grid points at once
+            grid_x = [xstart + (xi / numx) * (xstop - xstart) for xi in range(plotpoints[0] + 1)]
+            grid_y = [ystart + (yi / numy) * (ystop - ystart) for yi in range(plotpoints[1] + 1)]
+            grid = [(x_value, y_value) for x_value in grid_x for y_value in grid_y]
+            for point, value in zip(grid, cf(*zip(*grid))):
+                stored[point] = None if value is None else float(value)
             for xi in range(plotpoints[0]):
                 for yi in range(plotpoints[1]):
                     # Decide which way to break the square grid into triangles
@@ -1178,6 +1287,19 @@ class Plot(_Plot):
     >> Plot[3, {x, 0, 1}]
      = -Graphics-
 
+    'Plot' samples more points where the curve bends, up to 'MaxPlotPoints'
+    for each function:
+    >> Plot[Sin[100 x], {x, -3, 3}, MaxPlotPoints -> 500]
+     = -Graphics-
+
+    #> Plot[Sin[x], {x, 0, 1}, MaxPlotPoints -> -1]
+     : Value of option MaxPlotPoints -> -1 is not a positive integer or Infinity.
+     = -Graphics-
+    #> Length[Cases[Plot[Sin[100 x], {x, -3, 3}, MaxPlotPoints -> 500], Line[l_] :> Length[First[l]], Infinity]]
+     = 1
+    #> Cases[Plot[Sin[100 x], {x, -3, 3}, MaxPlotPoints -> 500], Line[l_] :> Length[First[l]], Infinity][[1]] <= 500
+     = True
+
     #> Plot[1 / x, {x, -1, 1}]
      = -Graphics-
     #> Plot[x, {y, 0, 2}]
@@ -1219,8 +1341,7 @@ class Plot(_Plot):
                 x_range = [start, stop]
         return x_range, y_range
 
-    def eval_f(self, f, x_value):
-        value = f(x_value)
+    def get_point(self, x_value, value):
         if value is not None:
             return (x_value, value)
 
@@ -1278,8 +1399,7 @@ class ParametricPlot(_Plot):
                 x_range, y_range = plotrange
         return x_range, y_range
 
-    def eval_f(self, f, x_value):
-        value = f(x_value)
+    def get_point(self, x_value, value):
         if value is not None and len(value) == 2:
             return value
 
@@ -1328,8 +1448,7 @@ class PolarPlot(_Plot):
                 x_range, y_range = plotrange
         return x_range, y_range
 
-    def eval_f(self, f, x_value):
-        value = f(x_value)
+    def get_point(self, x_value, value):
         if value is not None:
             return (value * cos(x_value), value * sin(x_value))
 
@@ -20,9 +20,9 @@ from operator import mul as operator_mul
 from functools import reduce
 
 from mathics.builtin.base import Builtin
-from mathics.builtin.numpy_utils import instantiate_elements, stack
+from mathics.builtin.numpy_utils import instantiate_elements, stack, pack, packed_shape
 from mathics.core.expression import (Integer, String, Symbol, Real, Expression,
-                                     Complex)
+                                     Complex, PackedArray)
 
 try:
     import numpy
@@ -87,6 +87,14 @@ def set_random_state(state):
         random_set_state(state)
 
 
+def _instantiate_packed(a, kind, new_element):
+    # like instantiate_elements, but gives a packed array if possible.
+    packed = pack(a, kind)
+    if packed is not None and packed_shape(packed):
+        return PackedArray(packed)
+    return instantiate_elements(a, new_element)
+
+
 class _RandomEnvBase:
     def __init__(self, evaluation):
         self.evaluation = evaluation
@@ -322,7 +330,7 @@ class RandomInteger(Builtin):
         result = ns.to_python()
 
         with RandomEnv(evaluation) as rand:
-            return instantiate_elements(rand.randint(rmin, rmax, result), Integer)
+            return _instantiate_packed(rand.randint(rmin, rmax, result), 'i', Integer)
 
 
 class RandomReal(Builtin):
@@ -405,7 +413,7 @@ class RandomReal(Builtin):
         assert all([isinstance(i, int) for i in result])
 
         with RandomEnv(evaluation) as rand:
-            return instantiate_elements(rand.randreal(min_value, max_value, result), Real)
+            return _instantiate_packed(rand.randreal(min_value, max_value, result), 'f', Real)
 
 
 class RandomComplex(Builtin):
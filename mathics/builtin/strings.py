@@ -13,12 +13,14 @@ from sys import version_info
 import re
 import unicodedata
 from binascii import hexlify, unhexlify
+from collections import OrderedDict
 from heapq import heappush, heappop
 
 import six
 from six.moves import range
 from six import unichr
 
+from mathics import settings
 from mathics.builtin.base import BinaryOperator, Builtin, Test, Predefined
 from mathics.core.expression import (Expression, Symbol, String, Integer,
                                      from_python)
@@ -49,7 +51,7 @@ def _evaluate_match(s, m, evaluation):
     return s.replace_vars(replace, in_scoping=False).evaluate(evaluation)
 
 
-def _parallel_match(text, rules, flags, limit):
+def _parallel_match(text, rules, limit):
     heap = []
 
     def push(i, iter, form):
@@ -62,7 +64,7 @@ def _parallel_match(text, rules, flags, limit):
             heappush(heap, (m.start(), i, m, form, iter))
 
     for i, (patt, form) in enumerate(rules):
-        push(i, re.finditer(patt, text, flags=flags), form)
+        push(i, patt.finditer(text), form)
 
     k = 0
     n = 0
@@ -212,6 +214,47 @@ def to_regex(expr, evaluation, q=_regex_longest, groups=None, abbreviated_patter
     return None
 
 
+# compiled regexes by the hash of their pattern and the options used to
+# compile them, least recently used first
+_regex_cache = OrderedDict()
+
+
+class _MessageLog(object):
+    # takes the place of the evaluation in to_regex, so that the messages
+    # of a conversion can be repeated when its regex comes from the cache
+    def __init__(self):
+        self.messages = []
+
+    def message(self, *args):
+        self.messages.append(args)
+
+
+def compile_regex(expr, evaluation, flags=0, anchored=False, abbreviated_patterns=False):
+    '''
+    converts the string pattern expr to a compiled regex, or returns None if
+    it is not a valid string pattern. the regexes are cached, so applying the
+    same pattern again does not convert and compile it again.
+    '''
+    key = (hash(expr), flags, anchored, abbreviated_patterns)
+    entry = _regex_cache.pop(key, None)
+    if entry is None or not entry[0].same(expr):
+        log = _MessageLog()
+        regex = to_regex(expr, log, abbreviated_patterns=abbreviated_patterns)
+        if regex is not None:
+            if anchored:
+                regex = anchor_pattern(regex)
+            regex = re.compile(regex, flags)
+        entry = (expr, regex, log.messages)
+        while len(_regex_cache) >= settings.REGEX_CACHE_SIZE:
+            _regex_cache.popitem(last=False)
+    _regex_cache[key] = entry
+
+    expr, regex, messages = entry
+    for message in messages:
+        evaluation.message(*message)
+    return regex
+
+
 def anchor_pattern(patt):
     '''
     anchors a regex in order to force matching against an entire string.
@@ -223,7 +266,7 @@ def anchor_pattern(patt):
     return patt
 
 
-def mathics_split(patt, string, flags):
+def mathics_split(patt, string):
     '''
     Python's re.split includes the text of groups if they are capturing.
 
@@ -235,7 +278,7 @@ def mathics_split(patt, string, flags):
     For these reasons we implement our own split.
     '''
     # (start, end) indices of splits
-    indices = list((m.start(), m.end()) for m in re.finditer(patt, string, flags))
+    indices = list((m.start(), m.end()) for m in patt.finditer(string))
 
     # (start, end) indices of stuff to keep
     indices = [(None, 0)] + indices + [(len(string), None)]
@@ -675,9 +718,21 @@ class StringMatchQ(Builtin):
      = False
     #> StringMatchQ["ae", "a@e"]
      = False
-    """
 
-    attributes = ('Listable',)
+    #> StringMatchQ[{"ab", "ba", x}, "a" ~~ ___]
+     : String or list of strings expected at position 1 in StringMatchQ[x, a ~~ ___].
+     = {True, False, StringMatchQ[x, a ~~ ___]}
+
+    ## Lists of patterns and nested lists are threaded over
+    #> StringMatchQ["ab", {"a" ~~ ___, "c"}]
+     = {True, False}
+    #> StringMatchQ[{{"a"}, {"b"}}, "a"]
+     = {{True}, {False}}
+    #> StringMatchQ[{"a", "b"}, {"a", "c"}]
+     = {True, False}
+    #> StringMatchQ[{{"A"}, {"b"}}, "a", IgnoreCase -> True]
+     = {{True}, {False}}
+    """
 
     options = {
         'IgnoreCase': 'False',
@@ -694,26 +749,43 @@ class StringMatchQ(Builtin):
 
     def apply(self, string, patt, evaluation, options):
         'StringMatchQ[string_, patt_, OptionsPattern[%(name)s]]'
-        py_string = string.get_string_value()
-        if py_string is None:
+        if string.has_form('List', None):
+            py_strings = [leaf.get_string_value() for leaf in string.leaves]
+        else:
+            py_strings = [string.get_string_value()]
+        if patt.has_form('List', None) or (
+                string.has_form('List', None) and None in py_strings):
+            # thread over lists of patterns and nested lists, as if
+            # StringMatchQ were Listable
+            defaults = evaluation.definitions.get_options(self.get_name())
+            rules = [Expression('Rule', Symbol(name), value)
+                     for name, value in sorted(options.items())
+                     if not value.same(defaults.get(name))]
+            expr = Expression('StringMatchQ', string, patt, *rules)
+            threaded, result = expr.thread(evaluation)
+            if threaded and result is not expr:
+                return result
+            return
+        if None in py_strings:
             return evaluation.message('StringMatchQ', 'strse', Integer(1),
                                       Expression('StringMatchQ', string, patt))
 
-        re_patt = to_regex(patt, evaluation, abbreviated_patterns=True)
-        if re_patt is None:
-            return evaluation.message('StringExpression', 'invld', patt,
-                                      Expression('StringExpression', patt))
-
-        re_patt = anchor_pattern(re_patt)
-
         flags = re.MULTILINE
         if options['System`IgnoreCase'] == Symbol('True'):
             flags = flags | re.IGNORECASE
 
-        if re.match(re_patt, py_string, flags=flags) is None:
-            return Symbol('False')
-        else:
-            return Symbol('True')
+        # the pattern is compiled once for all strings
+        re_patt = compile_regex(patt, evaluation, flags, anchored=True,
+                                abbreviated_patterns=True)
+        if re_patt is None:
+            return evaluation.message('StringExpression', 'invld', patt,
+                                      Expression('StringExpression', patt))
+
+        results = [Symbol('False') if re_patt.match(py_string) is None else Symbol('True')
+                   for py_string in py_strings]
+        if string.has_form('List', None):
+            return Expression('List', *results)
+        return results[0]
 
 
 class StringJoin(BinaryOperator):
@@ -829,20 +901,21 @@ class StringSplit(Builtin):
             patts = patt.get_leaves()
         else:
             patts = [patt]
+
+        flags = re.MULTILINE
+        if options['System`IgnoreCase'] == Symbol('True'):
+            flags = flags | re.IGNORECASE
+
         re_patts = []
         for p in patts:
-            py_p = to_regex(p, evaluation)
+            py_p = compile_regex(p, evaluation, flags)
             if py_p is None:
                 return evaluation.message('StringExpression', 'invld', p, patt)
             re_patts.append(py_p)
 
-        flags = re.MULTILINE
-        if options['System`IgnoreCase'] == Symbol('True'):
-            flags = flags | re.IGNORECASE
-
         result = [py_string]
         for re_patt in re_patts:
-            result = [t for s in result for t in mathics_split(re_patt, s, flags=flags)]
+            result = [t for s in result for t in mathics_split(re_patt, s)]
 
         return Expression('List', *[String(x) for x in result if x != ''])
 
@@ -952,13 +1025,12 @@ class StringPosition(Builtin):
             patts = patt.get_leaves()
         else:
             patts = [patt]
-        re_patts = []
+        compiled_patts = []
         for p in patts:
-            py_p = to_regex(p, evaluation)
+            py_p = compile_regex(p, evaluation)
             if py_p is None:
                 return evaluation.message('StringExpression', 'invld', p, patt)
-            re_patts.append(py_p)
-        compiled_patts = [re.compile(re_patt) for re_patt in re_patts]
+            compiled_patts.append(py_p)
 
         # string or list of strings
         if string.has_form('List', None):
@@ -1038,7 +1110,7 @@ class _StringFind(Builtin):
                  'position `1` in `2`.'),
     }
 
-    def _find(py_stri, py_rules, py_n, flags):
+    def _find(py_stri, py_rules, py_n, evaluation):
         raise NotImplementedError()
 
     def _apply(self, string, rule, n, evaluation, options, cases):
@@ -1060,17 +1132,22 @@ class _StringFind(Builtin):
                 return evaluation.message(
                     self.get_name(), 'strse', Integer(1), expr)
 
+        # flags
+        flags = re.MULTILINE
+        if options['System`IgnoreCase'] == Symbol('True'):
+            flags = flags | re.IGNORECASE
+
         # convert rule
         def convert_rule(r):
             if r.has_form('Rule', None) and len(r.leaves) == 2:
-                py_s = to_regex(r.leaves[0], evaluation)
+                py_s = compile_regex(r.leaves[0], evaluation, flags)
                 if py_s is None:
                     return evaluation.message(
                         'StringExpression', 'invld', r.leaves[0], r.leaves[0])
                 py_sp = r.leaves[1]
                 return py_s, py_sp
             elif cases:
-                py_s = to_regex(r, evaluation)
+                py_s = compile_regex(r, evaluation, flags)
                 if py_s is None:
                     return evaluation.message('StringExpression', 'invld', r, r)
                 return py_s, None
@@ -1094,16 +1171,11 @@ class _StringFind(Builtin):
             if py_n is None or py_n < 0:
                 return evaluation.message(self.get_name(), 'innf', Integer(3), expr)
 
-        # flags
-        flags = re.MULTILINE
-        if options['System`IgnoreCase'] == Symbol('True'):
-            flags = flags | re.IGNORECASE
-
         if isinstance(py_strings, list):
             return Expression(
-                'List', *[self._find(py_stri, py_rules, py_n, flags, evaluation) for py_stri in py_strings])
+                'List', *[self._find(py_stri, py_rules, py_n, evaluation) for py_stri in py_strings])
         else:
-            return self._find(py_strings, py_rules, py_n, flags, evaluation)
+            return self._find(py_strings, py_rules, py_n, evaluation)
 
 
 class StringReplace(_StringFind):
@@ -1201,10 +1273,10 @@ class StringReplace(_StringFind):
         'StringReplace[rule_][string_]': 'StringReplace[string, rule]',
     }
 
-    def _find(self, py_stri, py_rules, py_n, flags, evaluation):
+    def _find(self, py_stri, py_rules, py_n, evaluation):
         def cases():
             k = 0
-            for match, form in _parallel_match(py_stri, py_rules, flags, py_n):
+            for match, form in _parallel_match(py_stri, py_rules, py_n):
                 start, end = match.span()
                 if start > k:
                     yield String(py_stri[k:start])
@@ -1258,6 +1330,11 @@ class StringCases(_StringFind):
      : Ignored restriction given for x in x : LetterCharacter as it does not match previous occurences of x.
      = {abc}
 
+    ## the message is given again when the regex comes from the cache
+    #> StringCases["abc-abc xyz-uvw", Shortest[x : WordCharacter .. ~~ "-" ~~ x : LetterCharacter] -> x]
+     : Ignored restriction given for x in x : LetterCharacter as it does not match previous occurences of x.
+     = {abc}
+
     >> StringCases["abba", {"a" -> 10, "b" -> 20}, 2]
      = {10, 20}
 
@@ -1272,9 +1349,9 @@ class StringCases(_StringFind):
         'StringCases[rule_][string_]': 'StringCases[string, rule]',
     }
 
-    def _find(self, py_stri, py_rules, py_n, flags, evaluation):
+    def _find(self, py_stri, py_rules, py_n, evaluation):
         def cases():
-            for match, form in _parallel_match(py_stri, py_rules, flags, py_n):
+            for match, form in _parallel_match(py_stri, py_rules, py_n):
                 if form is None:
                     yield String(match.group(0))
                 else:
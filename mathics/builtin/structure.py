@@ -1283,6 +1283,9 @@ class ByteCount(Builtin):
     </dl>
 
     The results may heavily depend on the Python implementation in use.
+
+    #> ByteCount[Table[a[i], {i, 1000}]] < 1000000
+     = True
     """
 
     def apply(self, expression, evaluation):
@@ -10,10 +10,11 @@ from __future__ import absolute_import
 from six.moves import range
 
 from mathics.builtin.base import Builtin, BinaryOperator
-from mathics.core.expression import Expression, Symbol, Integer, String
+from mathics.core.expression import Expression, Symbol, Integer, String, from_packed
 from mathics.core.rules import Pattern
 
 from mathics.builtin.lists import get_part
+from mathics.builtin.numpy_utils import packed_shape, packed_dot
 
 
 class ArrayQ(Builtin):
@@ -126,6 +127,9 @@ def get_dimensions(expr, head=None):
     else:
         if head is not None and not expr.head.same(head):
             return []
+        packed = expr.get_packed()
+        if packed is not None:
+            return list(packed_shape(packed))
         sub_dim = None
         sub = []
         for leaf in expr.leaves:
@@ -213,15 +217,27 @@ class Dot(BinaryOperator):
      = {{a r + b t, a s + b u}, {c r + d t, c s + d u}}
     >> a . b
      = a . b
+
+    #> Range[3] . ConstantArray[1.5, {3, 2}]
+     = {9., 9.}
+    #> ConstantArray[2, {2, 3}] . {x, y, z}
+     = {2 x + 2 y + 2 z, 2 x + 2 y + 2 z}
     """
 
     operator = '.'
     precedence = 490
     attributes = ('Flat', 'OneIdentity')
 
-    rules = {
-        'Dot[a_List, b_List]': 'Inner[Times, a, b, Plus]',
-    }
+    def apply(self, a, b, evaluation):
+        'Dot[a_List, b_List]'
+
+        packed_a = a.get_packed()
+        packed_b = b.get_packed()
+        if packed_a is not None and packed_b is not None:
+            result = packed_dot(packed_a, packed_b)
+            if result is not None:
+                return from_packed(result)
+        return Expression('Inner', Symbol('Times'), a, b, Symbol('Plus'))
 
 
 class Inner(Builtin):
@@ -8,13 +8,19 @@ import six
 import six.moves.cPickle as pickle
 
 import os
+import sys
 import base64
 import re
 import bisect
+import hashlib
+import pkgutil
+import tempfile
 
 from collections import defaultdict
 
-from mathics.core.expression import Expression, Symbol, String, fully_qualified_symbol_name, strip_context
+from mathics.core.expression import (
+    Expression, Symbol, String, Integer, Rational, fully_qualified_symbol_name,
+    strip_context)
 from mathics.core.characters import letters, letterlikes
 
 
@@ -23,11 +29,94 @@ base_names_pattern = r'((?![0-9])([0-9${0}{1}{2}])+)'.format(letters, letterlike
 full_names_pattern = r'(`?{0}(`{0})*)'.format(base_names_pattern)
 
 
-def get_file_time(file):
+def get_builtin_snapshot_filename(cache_dir):
+    # one snapshot per installation and python version, so that these don't
+    # keep replacing each other's snapshots.
+    from mathics.settings import ROOT_DIR
+
+    installation = '%s:%d.%d' % ((ROOT_DIR,) + tuple(sys.version_info[:2]))
+    return os.path.join(cache_dir, 'definitions-%s.pickle' % (
+        hashlib.sha1(installation.encode('utf8')).hexdigest()[:16]))
+
+
+def _builtin_sources():
+    from mathics.settings import ROOT_DIR
+
+    for directory in ('builtin', 'core', 'autoload'):
+        for root, dirs, files in os.walk(os.path.join(ROOT_DIR, directory)):
+            dirs.sort()
+            for filename in sorted(files):
+                if filename.endswith(('.py', '.m')):
+                    yield os.path.join(root, filename)
+
+
+def get_builtin_snapshot_key():
+    # everything the builtin definitions depend on: the sources of the
+    # builtins and autoloaded files and the versions of python and the
+    # libraries. which of the packages required by some builtins are
+    # available is checked by get_required_packages when loading.
+    from mathics import version_info
+    from mathics.settings import ROOT_DIR
+
+    key = hashlib.sha1()
+    key.update(repr(sorted(version_info.items())).encode('utf8'))
+
+    for path in _builtin_sources():
+        key.update(os.path.relpath(path, ROOT_DIR).encode('utf8'))
+        with open(path, 'rb') as source:
+            key.update(source.read())
+    return key.hexdigest()
+
+
+def get_required_packages(packages=None):
+    # availability of the packages required by some builtins. this needs
+    # all builtins unless the packages are given, so when loading a snapshot
+    # the packages it was built with are checked again without importing
+    # the lazily loaded builtin modules.
+    if packages is None:
+        from mathics.builtin import builtins, load_lazy_modules
+
+        load_lazy_modules()
+        packages = set()
+        for builtin in builtins.values():
+            packages.update(getattr(builtin, 'requires', []))
+    return [(package, pkgutil.find_loader(package) is not None)
+            for package in sorted(packages)]
+
+
+def load_builtin_snapshot(filename, key):
+    try:
+        with open(filename, 'rb') as snapshot_file:
+            if pickle.load(snapshot_file) != key:
+                return None
+            return pickle.load(snapshot_file)
+    except Exception:
+        # missing, truncated or otherwise unusable snapshots just get
+        # rebuilt, whatever unpickling them raised.
+        return None
+
+
+def save_builtin_snapshot(filename, key, snapshot):
+    directory = os.path.dirname(filename)
+    temp_filename = None
     try:
-        return os.stat(file).st_mtime
-    except OSError:
-        return 0
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        # write to a temporary file first, so that concurrently starting
+        # processes never see half-written snapshots.
+        fd, temp_filename = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as snapshot_file:
+            pickle.dump(key, snapshot_file, -1)
+            pickle.dump(snapshot, snapshot_file, -1)
+        if os.name == 'nt' and os.path.exists(filename):
+            os.remove(filename)
+        os.rename(temp_filename, filename)
+        temp_filename = None
+    except (IOError, OSError, pickle.PicklingError):
+        pass
+    finally:
+        if temp_filename is not None and os.path.exists(temp_filename):
+            os.remove(temp_filename)
 
 
 def valuesname(name):
@@ -52,43 +141,76 @@ class Definitions(object):
         self.now = 0    # increments whenever something is updated
 
         if add_builtin:
-            from mathics.builtin import modules, contribute
-            from mathics.core.evaluation import Evaluation
-            from mathics.settings import ROOT_DIR
-
-            loaded = False
+            # the builtin definitions (including the autoloaded ones) are
+            # kept in a snapshot, which is rebuilt whenever any of the
+            # sources or libraries change. builtin_filename overrides the
+            # default location in settings.CACHE_DIR.
+            from mathics import settings
+            from mathics.builtin.importexport import IMPORTERS, EXPORTERS
+
+            if builtin_filename is None and settings.CACHE_DIR:
+                builtin_filename = get_builtin_snapshot_filename(
+                    settings.CACHE_DIR)
+
+            snapshot = None
             if builtin_filename is not None:
-                builtin_dates = [get_file_time(module.__file__)
-                                 for module in modules]
-                builtin_time = max(builtin_dates)
-                if get_file_time(builtin_filename) > builtin_time:
-                    builtin_file = open(builtin_filename, 'rb')
-                    self.builtin = pickle.load(builtin_file)
-                    loaded = True
-            if not loaded:
-                contribute(self)
+                key = get_builtin_snapshot_key()
+                snapshot = load_builtin_snapshot(builtin_filename, key)
+                if snapshot is not None and snapshot['requires'] != \
+                        get_required_packages(
+                            [package for package, _ in snapshot['requires']]):
+                    snapshot = None
+
+            if snapshot is not None:
+                self.builtin = snapshot['builtin']
+                self.now = snapshot['now']
+                # the autoloaded files also register the import and export
+                # formats.
+                IMPORTERS.update(snapshot['importers'])
+                EXPORTERS.update(snapshot['exporters'])
+            else:
+                self.add_builtin()
                 if builtin_filename is not None:
-                    builtin_file = open(builtin_filename, 'wb')
-                    pickle.dump(self.builtin, builtin_file, -1)
-
-            for root, dirs, files in os.walk(os.path.join(ROOT_DIR, 'autoload')):
-                for path in [os.path.join(root, f) for f in files if f.endswith('.m')]:
-                    Expression('Get', String(path)).evaluate(Evaluation(self))
-
-            # Move any user definitions created by autoloaded files to
-            # builtins, and clear out the user definitions list. This
-            # means that any autoloaded definitions become shared
-            # between users and no longer disappear after a Quit[].
-            #
-            # Autoloads that accidentally define a name in Global`
-            # could cause confusion, so check for this.
-            #
-            for name in self.user:
-                if name.startswith('Global`'):
-                    raise ValueError("autoload defined %s." % name)
-            self.builtin.update(self.user)
-            self.user = {}
-            self.clear_cache()
+                    save_builtin_snapshot(builtin_filename, key, {
+                        'builtin': self.builtin, 'now': self.now,
+                        'requires': get_required_packages(),
+                        'importers': IMPORTERS, 'exporters': EXPORTERS})
+
+    def overlay(self):
+        # new definitions with their own user definitions and caches on top
+        # of the builtin definitions of these ones, which they share. the
+        # builtin definitions are never changed, user code only ever
+        # changes user definitions.
+        definitions = Definitions()
+        definitions.builtin = self.builtin
+        definitions.now = self.now
+        return definitions
+
+    def add_builtin(self):
+        from mathics.builtin import contribute
+        from mathics.core.evaluation import Evaluation
+        from mathics.settings import ROOT_DIR
+
+        contribute(self)
+
+        for root, dirs, files in os.walk(os.path.join(ROOT_DIR, 'autoload')):
+            for path in [os.path.join(root, f) for f in files if f.endswith('.m')]:
+                Expression('Get', String(path)).evaluate(Evaluation(self))
+
+        # Move any user definitions created by autoloaded files to
+        # builtins, and clear out the user definitions list. This
+        # means that any autoloaded definitions become shared
+        # between users and no longer disappear after a Quit[].
+        #
+        # Autoloads that accidentally define a name in Global`
+        # could cause confusion, so check for this.
+        #
+        for name in self.user:
+            if name.startswith('Global`'):
+                raise ValueError("autoload defined %s." % name)
+        self.builtin.update(self.user)
+        self.user = {}
+        self.clear_cache()
 
     def clear_cache(self, name=None):
         # the definitions cache (self.definitions_cache) caches (incomplete and complete) names -> Definition(),
@@ -126,24 +248,23 @@ class Definitions(object):
 
     def last_changed(self, expr):
         # timestamp for the most recently changed part of a given expression.
-        if isinstance(expr, Symbol):
-            symb = self.get_definition(expr.get_name(), only_if_exists=True)
+        # expressions cache the names of the symbols they depend on, so this
+        # is proportional to the number of distinct symbols, not the size
+        # of the expression.
+        result = 0
+        for name in expr.get_dependencies():
+            symb = self.get_definition(name, only_if_exists=True)
             if symb is None:
                 # symbol doesn't exist so it was never changed
-                return 0
+                continue
             try:
-                return symb.changed
+                changed = symb.changed
             except AttributeError:
                 # must be system symbol
                 symb.changed = 0
-                return 0
-        result = 0
-        head = expr.get_head()
-        head_changed = self.last_changed(head)
-        result = max(result, head_changed)
-        for leaf in expr.get_leaves():
-            leaf_changed = self.last_changed(leaf)
-            result = max(result, leaf_changed)
+                continue
+            if changed > result:
+                result = changed
         return result
 
     def get_current_context(self):
@@ -325,7 +446,8 @@ class Definitions(object):
             formatvalues = builtin.formatvalues.copy()
             for form, rules in six.iteritems(user.formatvalues):
                 if form in formatvalues:
-                    formatvalues[form].extend(rules)
+                    # don't extend the builtin list, it is shared
+                    formatvalues[form] = formatvalues[form] + rules
                 else:
                     formatvalues[form] = rules
 
@@ -358,14 +480,22 @@ class Definitions(object):
     def get_ownvalues(self, name):
         return self.get_definition(name).ownvalues
 
-    def get_downvalues(self, name):
-        return self.get_definition(name).downvalues
+    def get_downvalues(self, name, expr=None):
+        # if expr is given, only return the rules that might match expr
+        # (see Definition.get_matching_rules)
+        definition = self.get_definition(name)
+        if expr is None:
+            return definition.downvalues
+        return definition.get_matching_rules('down', expr)
 
     def get_subvalues(self, name):
         return self.get_definition(name).subvalues
 
-    def get_upvalues(self, name):
-        return self.get_definition(name).upvalues
+    def get_upvalues(self, name, expr=None):
+        definition = self.get_definition(name)
+        if expr is None:
+            return definition.upvalues
+        return definition.get_matching_rules('up', expr)
 
     def get_formats(self, name, format=''):
         formats = self.get_definition(name).formatvalues
@@ -499,20 +629,32 @@ class Definitions(object):
         self.clear_cache()
         # TODO changed
 
-    def get_user_definitions(self):
+    def get_user_definitions(self, names=None):
+        # names restricts the result to the user definitions of these names
+        user = self.user
+        if names is not None:
+            user = dict((name, user[name]) for name in names if name in user)
         if six.PY2:
-            return base64.encodestring(pickle.dumps(self.user, protocol=2)).decode('ascii')
+            return base64.encodestring(pickle.dumps(user, protocol=2)).decode('ascii')
         else:
-            return base64.encodebytes(pickle.dumps(self.user, protocol=2)).decode('ascii')
+            return base64.encodebytes(pickle.dumps(user, protocol=2)).decode('ascii')
 
-    def set_user_definitions(self, definitions):
+    def set_user_definitions(self, definitions, merge=False):
+        # with merge, the given user definitions replace only those of the
+        # same names and the others are kept
         if definitions:
             if six.PY2:
-                self.user = pickle.loads(base64.decodestring(definitions.encode('ascii')))
+                user = pickle.loads(base64.decodestring(definitions.encode('ascii')))
             else:
-                self.user = pickle.loads(base64.decodebytes(definitions.encode('ascii')))
+                user = pickle.loads(base64.decodebytes(definitions.encode('ascii')))
         else:
-            self.user = {}
+            user = {}
+        if merge:
+            self.user.update(user)
+            for definition in user.values():
+                self.mark_changed(definition)
+        else:
+            self.user = user
         self.clear_cache()
 
     def get_ownvalue(self, name):
@@ -558,7 +700,6 @@ class Definitions(object):
             return default
 
     def set_config_value(self, name, new_value):
-        from mathics.core.expression import Integer
         self.set_ownvalue(name, Integer(new_value))
 
     def set_line_no(self, line_no):
@@ -594,6 +735,210 @@ def get_tag_position(pattern, name):
         return None
 
 
+def get_literal_key(expr):
+    """
+    Returns a hashable key for expr if expr is a literal expression, i.e. a
+    normal expression with a symbol head whose leaves are Integers, Rationals,
+    Strings, Symbols or Lists thereof. Two literal expressions are same() if
+    and only if their keys are equal. Returns None for all other expressions.
+    """
+
+    if expr.is_atom() or not expr.head.is_symbol():
+        return None
+    leaves = _get_literal_leaves_key(expr.leaves)
+    if leaves is None:
+        return None
+    return (expr.head.get_name(), leaves)
+
+
+def _get_literal_leaves_key(leaves):
+    key = []
+    for leaf in leaves:
+        if isinstance(leaf, Symbol):
+            key.append(leaf.name)
+        elif isinstance(leaf, Integer):
+            key.append(('Integer', leaf.value))
+        elif isinstance(leaf, String):
+            key.append(('String', leaf.value))
+        elif isinstance(leaf, Rational):
+            key.append(('Rational', leaf.value))
+        elif leaf.get_head_name() == 'System`List':
+            sub_key = _get_literal_leaves_key(leaf.leaves)
+            if sub_key is None:
+                return None
+            key.append(('List', sub_key))
+        else:
+            return None
+    return tuple(key)
+
+
+class RuleIndex(object):
+    """
+    Index over an ordered list of rules. Rules whose left-hand side is a
+    literal expression (see get_literal_key) are put into a hash table, so
+    that finding the rules that might match a given expression does not need
+    to look at all the literal rules. The order of precedence given by the
+    list of rules is preserved.
+    """
+
+    def __init__(self, rules):
+        from mathics.core.pattern import ExpressionPattern
+
+        self.rules = rules
+        self.literal_rules = {}
+        self.pattern_rules = []
+        self.pattern_positions = []
+        for index, rule in enumerate(rules):
+            key = None
+            if type(rule.pattern) is ExpressionPattern:
+                key = get_literal_key(rule.pattern.expr)
+            if key is None:
+                self.pattern_rules.append(rule)
+                self.pattern_positions.append(index)
+            else:
+                self.literal_rules.setdefault(key, []).append((index, rule))
+
+    def get_matching_rules(self, expr):
+        if not self.literal_rules:
+            return self.rules
+        key = get_literal_key(expr)
+        hits = None if key is None else self.literal_rules.get(key)
+        if not hits:
+            return self.pattern_rules
+        if len(hits) == 1:
+            index, rule = hits[0]
+            # a literal rule can still fail (e.g. through a Condition on its
+            # right-hand side), so keep the pattern rules after it.
+            count = bisect.bisect_left(self.pattern_positions, index)
+            return self.pattern_rules[:count] + [rule] + self.pattern_rules[count:]
+        candidates = hits + list(zip(self.pattern_positions, self.pattern_rules))
+        candidates.sort(key=lambda candidate: candidate[0])
+        return [rule for index, rule in candidates]
+
+
+# pattern constructs that a left-hand side might be wrapped in without
+# changing the head of the expressions it matches, with the position of the
+# wrapped pattern.
+_pattern_wrappers = {
+    'System`HoldPattern': 0,
+    'System`Pattern': 1,
+    'System`Condition': 0,
+    'System`PatternTest': 0,
+}
+
+# pattern constructs that might match expressions with any head.
+_pattern_heads = set([
+    'System`Alternatives', 'System`BlankSequence', 'System`BlankNullSequence',
+    'System`Except', 'System`Optional', 'System`OptionsPattern',
+    'System`PatternSequence', 'System`Repeated', 'System`RepeatedNull',
+    'System`Verbatim', 'System`Longest', 'System`Shortest'])
+
+
+def _get_dispatch_literal_key(expr):
+    if expr.is_atom():
+        return _get_literal_leaves_key([expr])
+    return get_literal_key(expr)
+
+
+def _get_dispatch_head(pattern, definitions):
+    # returns the head name that all expressions matched by pattern have
+    # (see get_head_name), or None if pattern might match any expression.
+    while not pattern.is_atom():
+        position = _pattern_wrappers.get(pattern.get_head_name())
+        if position is None or len(pattern.leaves) <= position:
+            break
+        pattern = pattern.leaves[position]
+
+    if pattern.is_atom():
+        return pattern.get_head_name()
+    head = pattern.head
+    if not head.is_symbol():
+        return None
+    name = head.get_name()
+    if name == 'System`Blank':
+        if len(pattern.leaves) == 1 and pattern.leaves[0].is_symbol():
+            return pattern.leaves[0].get_name()
+        return None
+    if name in _pattern_heads:
+        return None
+    if ('System`OneIdentity' in definitions.get_attributes(name) and
+            pattern.has_symbol('System`Optional')):
+        # f[x_, y_:0] matches x itself if f is OneIdentity
+        return None
+    return name
+
+
+class DispatchIndex(object):
+    """
+    Index over the rules of a Dispatch table, which are applied to all kinds
+    of expressions, not just to ones with a given head. Like RuleIndex,
+    literal rules are put into a hash table, here including rules for single
+    Symbols, Integers, Rationals and Strings. The other rules are grouped by
+    the head of the expressions they can match, so that finding the rules
+    that might match an expression only needs to look at the rules for its
+    head and the rules without a known head. The order of precedence given
+    by the list of rules is preserved.
+    """
+
+    def __init__(self, rules, definitions):
+        from mathics.core.pattern import AtomPattern, ExpressionPattern
+
+        self.rules = rules
+        self.literal_rules = {}
+        self.literal_heads = set()
+        heads = {}
+        generic = []
+        for index, rule in enumerate(rules):
+            pattern = rule.pattern.expr
+            key = None
+            if type(rule.pattern) in (AtomPattern, ExpressionPattern):
+                key = _get_dispatch_literal_key(pattern)
+            if key is not None and not pattern.is_atom():
+                attributes = definitions.get_attributes(pattern.get_head_name())
+                if 'System`Flat' in attributes or 'System`Orderless' in attributes:
+                    # f[a, b] also matches f[b, a] or f[a, b, c]
+                    key = None
+            if key is not None:
+                self.literal_rules.setdefault(key, []).append((index, rule))
+                self.literal_heads.add(pattern.get_head_name())
+                continue
+            head = _get_dispatch_head(pattern, definitions)
+            if head is None:
+                generic.append((index, rule))
+            else:
+                heads.setdefault(head, []).append((index, rule))
+
+        # the rules for each head, merged with the ones for any head
+        self.generic_rules = self._split(generic)
+        self.head_rules = dict(
+            (head, self._split(sorted(candidates + generic, key=lambda candidate: candidate[0])))
+            for head, candidates in six.iteritems(heads))
+
+    @staticmethod
+    def _split(candidates):
+        return [index for index, rule in candidates], [rule for index, rule in candidates]
+
+    def __len__(self):
+        return len(self.rules)
+
+    def get_matching_rules(self, expr):
+        head = expr.get_head_name()
+        positions, rules = self.head_rules.get(head, self.generic_rules)
+        if head not in self.literal_heads:
+            return rules
+        key = _get_dispatch_literal_key(expr)
+        hits = None if key is None else self.literal_rules.get(key)
+        if not hits:
+            return rules
+        if len(hits) == 1:
+            index, rule = hits[0]
+            count = bisect.bisect_left(positions, index)
+            return rules[:count] + [rule] + rules[count:]
+        candidates = hits + list(zip(positions, rules))
+        candidates.sort(key=lambda candidate: candidate[0])
+        return [rule for index, rule in candidates]
+
+
 def insert_rule(values, rule):
     for index, existing in enumerate(values):
         if existing.pattern.same(rule.pattern):
@@ -638,6 +983,7 @@ class Definition(object):
         self.downvalues = downvalues
         self.subvalues = subvalues
         self.upvalues = upvalues
+        self.rule_indices = {}
         for rule in rules:
             self.add_rule(rule)
         self.formatvalues = dict((name, list)
@@ -651,6 +997,16 @@ class Definition(object):
         self.defaultvalues = defaultvalues
         self.builtin = builtin
 
+    def __getstate__(self):
+        # the rule indices are a cache, and are rebuilt when needed.
+        state = self.__dict__.copy()
+        state['rule_indices'] = {}
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('rule_indices', {})
+        self.__dict__.update(state)
+
     def get_values_list(self, pos):
         assert pos.isalpha()
         if pos == 'messages':
@@ -665,9 +1021,27 @@ class Definition(object):
         else:
             setattr(self, '%svalues' % pos, rules)
 
+    def get_matching_rules(self, pos, expr):
+        """
+        Returns the rules at position pos that might match expr, in the order
+        they should be tried. Literal rules whose left-hand side is not
+        same() as expr are skipped.
+
+        Only valid if the head of expr is neither Flat nor Orderless, as
+        literal rules might then match expressions that are not same().
+        """
+
+        values = self.get_values_list(pos)
+        index = self.rule_indices.get(pos)
+        if index is None or index.rules is not values:
+            index = RuleIndex(values)
+            self.rule_indices[pos] = index
+        return index.get_matching_rules(expr)
+
     def add_rule_at(self, rule, position):
         values = self.get_values_list(position)
         insert_rule(values, rule)
+        self.rule_indices.pop(position, None)
         return True
 
     def add_rule(self, rule):
@@ -683,6 +1057,7 @@ class Definition(object):
             for index, existing in enumerate(values):
                 if existing.pattern.expr.same(lhs):
                     del values[index]
+                    self.rule_indices.pop(position, None)
                     return True
         return False
 
@@ -209,6 +209,7 @@ class Evaluation(object):
         self.listeners = {}
         self.options = None
         self.predetermined_out = None
+        self.profiler = None    # see mathics.core.profiler
 
         self.quiet_all = False
         self.format = format
@@ -270,7 +271,7 @@ class Evaluation(object):
                 self.definitions.add_rule('Out', Rule(
                     Expression('Out', line_no), stored_result))
             if result != Symbol('Null'):
-                return self.format_output(result, self.format)
+                return self.format_result(result)
             else:
                 return None
         try:
@@ -310,7 +311,7 @@ class Evaluation(object):
             if exc_result is not None:
                 self.recursion_depth = 0
                 if exc_result != Symbol('Null'):
-                    result = self.format_output(exc_result, self.format)
+                    result = self.format_result(exc_result)
 
             result = Result(self.out, result, line_no)
             self.out = []
@@ -350,6 +351,13 @@ class Evaluation(object):
     def stop(self):
         self.stopped = True
 
+    def format_result(self, expr):
+        # formats the result of evaluate(), which a profiler reports apart
+        # from the evaluation itself.
+        if self.profiler is None:
+            return self.format_output(expr, self.format)
+        return self.profiler.format_output(expr, self)
+
     def format_output(self, expr, format=None):
         if format is None:
             format = self.format
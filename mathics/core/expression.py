@@ -10,6 +10,7 @@ import math
 import re
 from itertools import chain
 
+from mathics import settings
 from mathics.core.numbers import get_type, dps, prec, min_prec, machine_precision
 from mathics.core.convert import sympy_symbol_prefix, SympyExpression
 
@@ -80,6 +81,7 @@ class ExpressionPointer(object):
             self.parent.head = new
         else:
             self.parent.leaves[self.position - 1] = new
+        self.parent.clear_cache()
 
     def __str__(self):
         return '%s[[%s]]' % (self.parent, self.position)
@@ -112,6 +114,8 @@ def from_python(arg):
 
 
 class KeyComparable(object):
+    __slots__ = ()
+
     def get_sort_key(self):
         raise NotImplemented
 
@@ -134,15 +138,92 @@ class KeyComparable(object):
         return self.get_sort_key() != other.get_sort_key()
 
 
+def _slot_names(cls):
+    names = _class_slot_names.get(cls)
+    if names is None:
+        names = []
+        for base in cls.__mro__:
+            slots = base.__dict__.get('__slots__', ())
+            if isinstance(slots, six.string_types):
+                slots = (slots,)
+            names.extend(name for name in slots if name != '__dict__')
+        # slots that a subclass replaced by a property (e.g. the leaves of a
+        # PackedArray) are not state of their own.
+        names = tuple(name for name in names
+                      if not isinstance(getattr(cls, name, None), property))
+        _class_slot_names[cls] = names
+    return names
+
+
+_class_slot_names = {}
+
+
+def _with_unformatted(expr, unformatted):
+    if expr.is_atom() and expr is not unformatted:
+        # atoms might be shared (e.g. small integers), don't change them
+        expr = expr.copy()
+    expr.unformatted = unformatted
+    return expr
+
+
 class BaseExpression(KeyComparable):
+    # expressions are created in huge numbers, so they keep their state in
+    # slots instead of a per-instance __dict__. fields that are usually left
+    # at their default share a single value (None, False) instead of being
+    # stored separately; 'original', 'position' and 'unevaluated' are only
+    # set (and read) in specific places and stay unset otherwise.
+    __slots__ = (
+        'options', 'pattern_sequence', '_unformatted', 'last_evaluated',
+        'unevaluated', 'original', 'position')
+
     def __new__(cls, *args, **kwargs):
         self = object.__new__(cls)
         self.options = None
         self.pattern_sequence = False
-        self.unformatted = self
+        self._unformatted = None
         self.last_evaluated = None
         return self
 
+    @property
+    def unformatted(self):
+        # None stands for the expression itself, which saves us a reference
+        # cycle for each expression.
+        unformatted = self._unformatted
+        if unformatted is None:
+            return self
+        return unformatted
+
+    @unformatted.setter
+    def unformatted(self, unformatted):
+        if unformatted is self:
+            unformatted = None
+        self._unformatted = unformatted
+
+    def __getstate__(self):
+        state = {}
+        for name in _slot_names(self.__class__):
+            try:
+                state[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        instance_dict = getattr(self, '__dict__', None)
+        if instance_dict:
+            state.update(instance_dict)
+        # evaluation times only mean something to the definitions they were
+        # taken from, so unpickled expressions count as not evaluated yet.
+        state['last_evaluated'] = None
+        return state
+
+    def __setstate__(self, state):
+        if not hasattr(self, 'last_evaluated'):
+            # pickle protocols < 2 don't call __new__
+            self.options = None
+            self.pattern_sequence = False
+            self._unformatted = None
+            self.last_evaluated = None
+        for name, value in six.iteritems(state):
+            setattr(self, name, value)
+
     def sequences(self):
         return None
 
@@ -190,6 +271,9 @@ class BaseExpression(KeyComparable):
     def get_leaves(self):
         return []
 
+    def get_packed(self):
+        return None
+
     def get_int_value(self):
         return None
 
@@ -246,6 +330,9 @@ class BaseExpression(KeyComparable):
             elif l2 is not None and level > l2:
                 return self, False
 
+        if not isinstance(rules, list):
+            # a DispatchIndex
+            rules = rules.get_matching_rules(self)
         for rule in rules:
             result = rule.apply(self, evaluation, fully=False)
             if result is not None:
@@ -288,7 +375,7 @@ class BaseExpression(KeyComparable):
                     result = formatted.do_format(evaluation, form)
                     if include_form:
                         result = Expression(form, result)
-                    result.unformatted = unformatted
+                    result = _with_unformatted(result, unformatted)
                     return result
 
                 head = expr.get_head_name()
@@ -303,7 +390,7 @@ class BaseExpression(KeyComparable):
 
             if include_form:
                 expr = Expression(form, expr)
-            expr.unformatted = unformatted
+            expr = _with_unformatted(expr, unformatted)
             return expr
         finally:
             evaluation.dec_recursion_depth()
@@ -503,7 +590,24 @@ def _sequences(leaves):
             yield i
 
 
+_interned_dependencies = {}
+
+
+def _intern_dependencies(dependencies):
+    # most expressions in a big list depend on the same few symbols, so we
+    # share these sets. the number of shared sets is bounded, we don't want
+    # this to grow indefinitely with expressions containing fresh symbols.
+    interned = _interned_dependencies.get(dependencies)
+    if interned is not None:
+        return interned
+    if len(_interned_dependencies) < 4096:
+        _interned_dependencies[dependencies] = dependencies
+    return dependencies
+
+
 class Expression(BaseExpression):
+    __slots__ = ('head', 'leaves', '_sequences', '_dependencies', '_hash')
+
     def __new__(cls, head, *leaves):
         self = super(Expression, cls).__new__(cls)
         if isinstance(head, six.string_types):
@@ -511,12 +615,20 @@ class Expression(BaseExpression):
         self.head = head
         self.leaves = [from_python(leaf) for leaf in leaves]
         self._sequences = None
+        self._dependencies = None
+        self._hash = None
         return self
 
+    def clear_cache(self):
+        # needs to be called after changing the head or the leaves in place.
+        self._sequences = None
+        self._dependencies = None
+        self._hash = None
+
     def sequences(self):
         seq = self._sequences
         if seq is None:
-            seq = list(_sequences(self.leaves))
+            seq = tuple(_sequences(self.leaves))
             self._sequences = seq
         return seq
 
@@ -592,6 +704,20 @@ class Expression(BaseExpression):
     def get_leaves(self):
         return self.leaves
 
+    def get_dependencies(self):
+        # names of all the symbols whose definitions might affect evaluating
+        # this expression, i.e. all symbols in it and the heads of its atoms.
+        # these are needed each time an evaluated expression gets evaluated
+        # again, so we compute them only once.
+        dependencies = self._dependencies
+        if dependencies is None:
+            dependencies = set(self.head.get_dependencies())
+            for leaf in self.leaves:
+                dependencies.update(leaf.get_dependencies())
+            dependencies = _intern_dependencies(frozenset(dependencies))
+            self._dependencies = dependencies
+        return dependencies
+
     def get_lookup_name(self):
         return self.head.get_lookup_name()
 
@@ -790,6 +916,12 @@ class Expression(BaseExpression):
             return True
         if self.get_head_name() != other.get_head_name():
             return False
+        # same() expressions have the same hash (see _FastEquivalence), so
+        # hashes computed before tell different expressions apart right away.
+        if self._hash is not None:
+            other_hash = getattr(other, '_hash', None)
+            if other_hash is not None and other_hash != self._hash:
+                return False
         if not self.head.same(other.get_head()):
             return False
         if len(self.leaves) != len(other.get_leaves()):
@@ -813,9 +945,10 @@ class Expression(BaseExpression):
             for leaf in self.leaves:
                 if leaf.get_head().same(head) and (not pattern_only or leaf.pattern_sequence):
                     new_leaf = leaf.flatten(head, pattern_only, callback, level=sub_level)
+                    flattened = new_leaf.leaves
                     if callback is not None:
-                        callback(new_leaf.leaves, leaf)
-                    new_leaves.extend(new_leaf.leaves)
+                        flattened = callback(flattened, leaf)
+                    new_leaves.extend(flattened)
                 else:
                     new_leaves.append(leaf)
             return Expression(self.head, *new_leaves)
@@ -838,7 +971,10 @@ class Expression(BaseExpression):
         try:
             while reevaluate:
                 # changed before last evaluated?
-                if expr.last_evaluated is not None and definitions.last_changed(expr) <= expr.last_evaluated:
+                last_evaluated = expr.last_evaluated
+                if last_evaluated is not None and (
+                        last_evaluated == definitions.now or
+                        definitions.last_changed(expr) <= last_evaluated):
                     break
 
                 names.add(expr.get_lookup_name())
@@ -846,7 +982,10 @@ class Expression(BaseExpression):
                 if hasattr(expr, 'options') and expr.options:
                     evaluation.options = expr.options
 
-                expr, reevaluate = expr.evaluate_next(evaluation)
+                if evaluation.profiler is None:
+                    expr, reevaluate = expr.evaluate_next(evaluation)
+                else:
+                    expr, reevaluate = evaluation.profiler.evaluate_next(expr, evaluation)
                 if not reevaluate:
                     break
 
@@ -922,16 +1061,30 @@ class Expression(BaseExpression):
 
             for index, leaf in enumerate(leaves):
                 if leaf.has_form('Unevaluated', 1):
-                    leaves[index] = leaf.leaves[0]
-                    leaves[index].unevaluated = True
+                    leaf = leaf.leaves[0]
+                    if leaf.is_atom():
+                        # atoms might be shared (e.g. small integers), so
+                        # we need our own object to mark
+                        leaf = leaf.copy()
+                    leaf.unevaluated = True
+                    leaves[index] = leaf
                     dirty_new = True
 
             if dirty_new:
                 new = Expression(head, *leaves)
 
+        if 'System`Listable' in attributes:
+            result = new.apply_listable_kernel(evaluation)
+            if result is not None:
+                return result, False
+
         def flatten_callback(new_leaves, old):
+            if old.unevaluated:
+                new_leaves = [leaf.copy() if leaf.is_atom() else leaf
+                              for leaf in new_leaves]
             for leaf in new_leaves:
                 leaf.unevaluated = old.unevaluated
+            return new_leaves
 
         if 'System`Flat' in attributes:
             new = new.flatten(new.head, callback=flatten_callback)
@@ -949,6 +1102,13 @@ class Expression(BaseExpression):
                 else:
                     return threaded, True
 
+        # literal rules can only be looked up by value if matching does not
+        # depend on the ordering or grouping of the leaves.
+        if 'System`Flat' in attributes or 'System`Orderless' in attributes:
+            lookup_expr = None
+        else:
+            lookup_expr = new
+
         def rules():
             rules_names = set()
             if 'System`HoldAllComplete' not in attributes:
@@ -957,11 +1117,11 @@ class Expression(BaseExpression):
                     if len(name) > 0:  # only lookup rules if this is a symbol
                         if name not in rules_names:
                             rules_names.add(name)
-                            for rule in evaluation.definitions.get_upvalues(name):
+                            for rule in evaluation.definitions.get_upvalues(name, lookup_expr):
                                 yield rule
             lookup_name = new.get_lookup_name()
             if lookup_name == new.get_head_name():
-                for rule in evaluation.definitions.get_downvalues(lookup_name):
+                for rule in evaluation.definitions.get_downvalues(lookup_name, lookup_expr):
                     yield rule
             else:
                 for rule in evaluation.definitions.get_subvalues(lookup_name):
@@ -980,6 +1140,7 @@ class Expression(BaseExpression):
         for index, leaf in enumerate(new.leaves):
             if leaf.unevaluated:
                 new.leaves[index] = Expression('Unevaluated', leaf)
+                new.clear_cache()
 
         new.unformatted = self.unformatted
         new.last_evaluated = evaluation.definitions.now
@@ -1189,6 +1350,7 @@ class Expression(BaseExpression):
             self.leaves.sort(key=lambda e: e.get_sort_key(pattern_sort=True))
         else:
             self.leaves.sort()
+        self._hash = None
 
     def filter_leaves(self, head_name):
         # TODO: should use sorting
@@ -1307,6 +1469,34 @@ class Expression(BaseExpression):
                           *[leaf.replace_slots(slots, evaluation)
                             for leaf in self.leaves])
 
+    def apply_listable_kernel(self, evaluation):
+        # Listable builtins may provide a listable_kernel that computes whole
+        # lists of machine numbers at once, instead of threading over them
+        # one leaf at a time. the kernel gets these lists as packed arrays.
+        # users can override this with their own definitions.
+        if all(leaf.get_head_name() != 'System`List' for leaf in self.leaves):
+            return None
+        from mathics.builtin import listable_kernels
+        name = self.get_head_name()
+        kernel = listable_kernels.get(name)
+        if kernel is None:
+            return None
+        user = evaluation.definitions.user
+        if name in user or 'System`List' in user:
+            return None
+        leaves = []
+        packed = False
+        for leaf in self.leaves:
+            if leaf.get_head_name() == 'System`List':
+                if leaf.get_packed() is None:
+                    leaf = pack_leaves(leaf.leaves)
+                    if leaf is None:
+                        return None
+                packed = True
+            leaves.append(leaf)
+        if packed:
+            return kernel(leaves, evaluation)
+
     def thread(self, evaluation, head=None):
         if head is None:
             head = Symbol('List')
@@ -1377,7 +1567,19 @@ class Expression(BaseExpression):
         return atoms
 
     def __hash__(self):
-        return hash(('Expression', self.head) + tuple(self.leaves))
+        # the hash is computed once, which makes hashing a tree linear in its
+        # size, as the hashes of its subexpressions are kept too.
+        h = self._hash
+        if h is None:
+            h = hash(('Expression', self.head) + tuple(self.leaves))
+            self._hash = h
+        return h
+
+    def __getstate__(self):
+        state = super(Expression, self).__getstate__()
+        # hashes of strings differ between python processes
+        state['_hash'] = None
+        return state
 
     def user_hash(self, update):
         update(("%s>%d>" % (self.get_head_name(), len(self.leaves))).encode('utf8'))
@@ -1385,10 +1587,255 @@ class Expression(BaseExpression):
             leaf.user_hash(update)
 
     def __getnewargs__(self):
-        return (self.head, self.leaves)
+        # the leaves are restored by __setstate__
+        return (self.head,)
+
+
+class PackedArray(Expression):
+    """
+    A List of machine integers or of machine reals (or a rectangular array
+    of such Lists) that keeps its values in one packed array (see the
+    packed array functions in mathics.builtin.numpy_utils) instead of one
+    atom for each value.
+
+    Builtins that know about packed arrays work on get_packed() directly.
+    Everything else sees the usual leaves, which are created the first
+    time they are accessed. From then on, the leaves are authoritative
+    (they might get changed in place, e.g. by part assignments), and the
+    PackedArray behaves just like any other List.
+    """
+
+    __slots__ = ('_packed', '_leaves')
+
+    def __new__(cls, packed):
+        self = BaseExpression.__new__(cls)
+        self.head = Symbol('List')
+        self._packed = packed
+        self._leaves = None
+        self._sequences = None
+        self._dependencies = None
+        self._hash = None
+        return self
+
+    @property
+    def leaves(self):
+        leaves = self._leaves
+        if leaves is None:
+            leaves = self.unpack()
+            self._leaves = leaves
+            self._packed = None
+        return leaves
+
+    @leaves.setter
+    def leaves(self, leaves):
+        self._leaves = leaves
+        self._packed = None
+        self._dependencies = None
+        self._hash = None
+
+    def unpack(self):
+        from mathics.builtin.numpy_utils import packed_kind, packed_shape, packed_item, packed_tolist
+
+        packed = self._packed
+        shape = packed_shape(packed)
+        if len(shape) > 1:
+            return [PackedArray(packed_item(packed, i)) for i in range(shape[0])]
+        elif packed_kind(packed) == 'i':
+            return [Integer(value) for value in packed_tolist(packed)]
+        else:
+            return [MachineReal(value) for value in packed_tolist(packed)]
+
+    def get_packed(self):
+        return self._packed
+
+    def get_dependencies(self):
+        if self._packed is None:
+            return super(PackedArray, self).get_dependencies()
+        from mathics.builtin.numpy_utils import packed_kind
+        leaf = Integer(0) if packed_kind(self._packed) == 'i' else MachineReal(0.)
+        return self.head.get_dependencies() | leaf.get_dependencies()
+
+    def get_sort_key(self, pattern_sort=False):
+        if self._packed is None or pattern_sort:
+            return super(PackedArray, self).get_sort_key(pattern_sort)
+        return [2, 3, self.head, self.unpack(), 1]
+
+    def __eq__(self, other):
+        # compares without unpacking where the sort keys cannot be equal or
+        # both sides are packed alike, e.g. in comparisons with Null
+        if self._packed is not None:
+            if other.is_atom():
+                return False
+            packed = other.get_packed()
+            if packed is not None:
+                from mathics.builtin.numpy_utils import packed_kind, packed_equal
+                if packed_kind(packed) == packed_kind(self._packed):
+                    return packed_equal(self._packed, packed)
+        return super(PackedArray, self).__eq__(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def sequences(self):
+        if self._packed is None:
+            return super(PackedArray, self).sequences()
+        return []
+
+    def evaluate(self, evaluation):
+        if self._packed is None:
+            return super(PackedArray, self).evaluate(evaluation)
+        evaluation.check_stopped()
+        return self
+
+    def evaluate_next(self, evaluation):
+        if self._packed is None:
+            return super(PackedArray, self).evaluate_next(evaluation)
+        return self, False
+
+    def evaluate_leaves(self, evaluation):
+        if self._packed is None:
+            return super(PackedArray, self).evaluate_leaves(evaluation)
+        return self
+
+    def copy(self):
+        if self._packed is None:
+            return super(PackedArray, self).copy()
+        result = PackedArray(self._packed)
+        result.options = self.options
+        result.original = self
+        # the packed values are shared, and so is their hash
+        result._hash = self._hash
+        return result
+
+    def shallow_copy(self):
+        if self._packed is None:
+            return super(PackedArray, self).shallow_copy()
+        result = PackedArray(self._packed)
+        result.options = self.options
+        result.last_evaluated = self.last_evaluated
+        result._hash = self._hash
+        return result
+
+    def set_positions(self, position=None):
+        if self._packed is not None:
+            # unpack() returns interned atoms, but positions are tracked on
+            # the leaves themselves (see walk_parts), so they must be
+            # distinct objects.
+            self.leaves = [
+                leaf if isinstance(leaf, PackedArray) else leaf.do_copy()
+                for leaf in self.unpack()]
+        super(PackedArray, self).set_positions(position)
+
+    def has_symbol(self, symbol_name):
+        if self._packed is None:
+            return super(PackedArray, self).has_symbol(symbol_name)
+        return self.head.has_symbol(symbol_name)
+
+    def to_python(self, *args, **kwargs):
+        if self._packed is None:
+            return super(PackedArray, self).to_python(*args, **kwargs)
+        from mathics.builtin.numpy_utils import packed_tolist
+        return packed_tolist(self._packed)
+
+    def same(self, other):
+        if self._packed is not None and other.get_packed() is not None:
+            from mathics.builtin.numpy_utils import packed_equal
+            return packed_equal(self._packed, other.get_packed())
+        return super(PackedArray, self).same(other)
+
+    def replace_vars(self, vars, options=None,
+                     in_scoping=True, in_function=True):
+        if self._packed is None:
+            return super(PackedArray, self).replace_vars(vars, options, in_scoping, in_function)
+        return self.shallow_copy()
+
+    def replace_slots(self, slots, evaluation):
+        if self._packed is None:
+            return super(PackedArray, self).replace_slots(slots, evaluation)
+        return self
+
+    def get_atoms(self, include_heads=True):
+        if self._packed is None:
+            return super(PackedArray, self).get_atoms(include_heads)
+        atoms = self.head.get_atoms() if include_heads else []
+        for leaf in self.unpack():
+            atoms.extend(leaf.get_atoms())
+        return atoms
+
+    def __str__(self):
+        if self._packed is None:
+            return super(PackedArray, self).__str__()
+        return '%s[%s]' % (
+            self.head, ', '.join([six.text_type(leaf) for leaf in self.unpack()]))
+
+    def __hash__(self):
+        if self._packed is None:
+            return super(PackedArray, self).__hash__()
+        h = self._hash
+        if h is None:
+            h = hash(('Expression', self.head) + tuple(self.unpack()))
+            self._hash = h
+        return h
+
+    def __getnewargs__(self):
+        return (self._packed,)
+
+
+def pack_leaves(leaves):
+    """
+    Returns a PackedArray for the given leaves if they are all machine
+    integers, all machine reals or all Lists that can be packed into arrays
+    of the same kind and shape, and None otherwise.
+    """
+    from mathics.builtin.numpy_utils import pack, packed_kind, packed_shape, packed_stack
+
+    if not leaves:
+        return None
+    first = leaves[0]
+    if isinstance(first, (Integer, MachineReal)):
+        cls = type(first)
+        if not all(type(leaf) is cls for leaf in leaves):
+            return None
+        packed = pack([leaf.value for leaf in leaves], 'i' if cls is Integer else 'f')
+    else:
+        rows = []
+        for leaf in leaves:
+            row = leaf.get_packed()
+            if row is None and leaf.has_form('List', 1, None):
+                row = pack_leaves(leaf.leaves)
+                if row is not None:
+                    row = row.get_packed()
+            if row is None:
+                return None
+            rows.append(row)
+        kind = packed_kind(rows[0])
+        shape = packed_shape(rows[0])
+        if any(packed_kind(row) != kind or packed_shape(row) != shape for row in rows):
+            return None
+        packed = packed_stack(rows)
+    if packed is not None:
+        return PackedArray(packed)
+
+
+def from_packed(value):
+    """
+    Converts a result of the packed array functions in
+    mathics.builtin.numpy_utils, i.e. a packed array or a python int or
+    float, into an expression.
+    """
+    if isinstance(value, float):
+        return MachineReal(value)
+    elif isinstance(value, six.integer_types):
+        return Integer(value)
+    else:
+        return PackedArray(value)
+
+
+_atom_dependencies = {}
 
 
 class Atom(BaseExpression):
+    __slots__ = ()
 
     def is_atom(self):
         return True
@@ -1411,9 +1858,25 @@ class Atom(BaseExpression):
     def get_atom_name(self):
         return self.__class__.__name__
 
+    def get_dependencies(self):
+        name = self.get_atom_name()
+        dependencies = _atom_dependencies.get(name)
+        if dependencies is None:
+            dependencies = frozenset([ensure_context(name)])
+            _atom_dependencies[name] = dependencies
+        return dependencies
+
     def __repr__(self):
         return '<%s: %s>' % (self.get_atom_name(), self)
 
+    def __getstate__(self):
+        # unpickling might give us a shared atom (see __getnewargs__), so
+        # only keep what defines the value, not the evaluation bookkeeping.
+        state = super(Atom, self).__getstate__()
+        for name in BaseExpression.__slots__:
+            state.pop(name, None)
+        return state
+
     def replace_vars(self, vars, options=None, in_scoping=True):
         return self
 
@@ -1444,18 +1907,44 @@ class Atom(BaseExpression):
         raise NotImplementedError
 
 
+_symbols = {}
+
+# fresh symbols (e.g. from Module) are not interned anymore once this many
+# symbols are known, so that the table does not grow indefinitely.
+_max_interned_symbols = 1 << 16
+
+
 class Symbol(Atom):
+    __slots__ = ('name', 'sympy_dummy')
+
     def __new__(cls, name, sympy_dummy=None):
+        # symbols are interned by name, both in the given and the fully
+        # qualified form, so Symbol('List') is Symbol('System`List').
+        if sympy_dummy is None:
+            self = _symbols.get(name)
+            if self is not None:
+                return self
         self = super(Symbol, cls).__new__(cls)
         self.name = ensure_context(name)
         self.sympy_dummy = sympy_dummy
+        if sympy_dummy is None and len(_symbols) < _max_interned_symbols:
+            self = _symbols.setdefault(self.name, self)
+            _symbols[name] = self
         return self
 
     def __str__(self):
         return self.name
 
     def do_copy(self):
-        return Symbol(self.name)
+        # copies need to be distinct objects, as their positions are
+        # tracked (see walk_parts).
+        result = Atom.__new__(Symbol)
+        result.name = self.name
+        result.sympy_dummy = None
+        return result
+
+    def get_dependencies(self):
+        return frozenset([self.name])
 
     def boxes_to_text(self, **options):
         return str(self.name)
@@ -1511,7 +2000,8 @@ class Symbol(Atom):
                     2, Monomial({self.name: 1}), 0, self.name, 1]
 
     def same(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name)
 
     def replace_vars(self, vars, options={}, in_scoping=True):
         assert all(fully_qualified_symbol_name(v) for v in vars)
@@ -1551,6 +2041,8 @@ class Symbol(Atom):
 
 
 class Number(Atom):
+    __slots__ = ()
+
     def __str__(self):
         return str(self.value)
 
@@ -1606,8 +2098,12 @@ _number_form_options = {
 }
 
 class Integer(Number):
+    __slots__ = ('value',)
+
     def __new__(cls, value):
         n = int(value)
+        if _small_integers_low <= n < _small_integers_high:
+            return _small_integers[n - _small_integers_low]
         self = super(Integer, cls).__new__(cls)
         self.value = n
         return self
@@ -1649,7 +2145,8 @@ class Integer(Number):
         return self.value
 
     def same(self, other):
-        return isinstance(other, Integer) and self.value == other.value
+        return self is other or (
+            isinstance(other, Integer) and self.value == other.value)
 
     def evaluate(self, evaluation):
         evaluation.check_stopped()
@@ -1662,7 +2159,9 @@ class Integer(Number):
             return [0, 0, self.value, 0, 1]
 
     def do_copy(self):
-        return Integer(self.value)
+        result = Number.__new__(Integer)
+        result.value = self.value
+        return result
 
     def __hash__(self):
         return hash(('Integer', self.value))
@@ -1681,7 +2180,23 @@ class Integer(Number):
         return self.value == 0
 
 
+def _make_small_integers(low, high):
+    integers = []
+    for n in range(low, high):
+        integer = Number.__new__(Integer)
+        integer.value = n
+        integers.append(integer)
+    return integers
+
+
+_small_integers_low, _small_integers_high = settings.INTEGER_CACHE_RANGE
+_small_integers = _make_small_integers(
+    _small_integers_low, _small_integers_high)
+
+
 class Rational(Number):
+    __slots__ = ('value',)
+
     def __new__(cls, numerator, denominator=None):
         self = super(Rational, cls).__new__(cls)
         self.value = sympy.Rational(numerator, denominator)
@@ -1766,6 +2281,8 @@ class Rational(Number):
 
 
 class Real(Number):
+    __slots__ = ('value',)
+
     def __new__(cls, value, p=None):
         if isinstance(value, six.string_types):
             value = str(value)
@@ -1849,10 +2366,18 @@ class MachineReal(Real):
 
     Stored internally as a python float.
     '''
+
+    __slots__ = ()
+
     def __new__(cls, value):
+        value = float(value)
+        self = _machine_reals.get(value)
+        # -0. == 0., so make sure the sign matches too
+        if self is not None and math.copysign(1., value) == math.copysign(1., self.value):
+            return self
         self = Number.__new__(cls)
-        self.value = float(value)
-        if math.isinf(self.value) or math.isnan(self.value):
+        self.value = value
+        if math.isinf(value) or math.isnan(value):
             raise OverflowError
         return self
 
@@ -1897,7 +2422,9 @@ class MachineReal(Real):
         return (self.value,)
 
     def do_copy(self):
-        return MachineReal(self.value)
+        result = Number.__new__(MachineReal)
+        result.value = self.value
+        return result
 
     def __neg__(self):
         return MachineReal(-self.value)
@@ -1907,12 +2434,27 @@ class MachineReal(Real):
         return self.value == 0.0
 
 
+def _make_machine_reals(values):
+    reals = {}
+    for value in values:
+        real = Number.__new__(MachineReal)
+        real.value = value
+        reals[value] = real
+    return reals
+
+
+_machine_reals = _make_machine_reals((0., 1., -1.))
+
+
 class PrecisionReal(Real):
     '''
     Arbitrary precision real number.
 
     Stored internally as a sympy.Float.
     '''
+
+    __slots__ = ()
+
     def __new__(cls, value):
         self = Number.__new__(cls)
         self.value = sympy.Float(value)
@@ -1967,6 +2509,9 @@ class Complex(Number):
     '''
     Complex wraps two real-valued Numbers.
     '''
+
+    __slots__ = ('real', 'imag')
+
     def __new__(cls, real, imag):
         self = super(Complex, cls).__new__(cls)
         if isinstance(real, Complex) or not isinstance(real, Number):
@@ -2140,6 +2685,8 @@ extra_operators = set((',', '(', ')', '[', ']', '{', '}',
 
 
 class String(Atom):
+    __slots__ = ('value',)
+
     def __new__(cls, value):
         self = super(String, cls).__new__(cls)
         self.value = six.text_type(value)
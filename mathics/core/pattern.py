@@ -149,7 +149,12 @@ class ExpressionPattern(Pattern):
     # match = pattern_nocython.match
 
     def match(self, yield_func, expression, vars, evaluation, head=None,
-              leaf_index=None, leaf_count=None, fully=True, wrap_oneid=True):
+              leaf_index=None, leaf_count=None, fully=True, wrap_oneid=True,
+              guard=None):
+        # guard(vars, new_vars) is called after a leaf that is not the last
+        # one has been matched. it returns False if no match is possible
+        # with the variables new_vars bound so far, e.g. because the test
+        # of an enclosing Condition fails.
         evaluation.check_stopped()
 
         attributes = self.head.get_attributes(evaluation.definitions)
@@ -183,7 +188,7 @@ class ExpressionPattern(Pattern):
                     yield_func, next_leaf, next_leaves,
                     ([], expression.leaves), pre_vars, expression, attributes,
                     evaluation, first=True, fully=fully,
-                    leaf_count=len(self.leaves),
+                    leaf_count=len(self.leaves), guard=guard,
                     wrap_oneid=expression.get_head_name() != 'System`MakeBoxes')
 
             # for head_vars, _ in self.head.match(expression.get_head(), vars,
@@ -231,7 +236,7 @@ class ExpressionPattern(Pattern):
                 yield_func, self.leaves[0], self.leaves[1:],
                 ([], [expression]), vars, new_expression, attributes,
                 evaluation, first=True, fully=fully,
-                leaf_count=len(self.leaves), wrap_oneid=True)
+                leaf_count=len(self.leaves), wrap_oneid=True, guard=guard)
 
     def get_pre_choices(self, yield_func, expression, attributes, vars):
         if 'System`Orderless' in attributes:
@@ -357,7 +362,7 @@ class ExpressionPattern(Pattern):
     def match_leaf(self, yield_func, leaf, rest_leaves, rest_expression, vars,
                    expression, attributes, evaluation, leaf_index=1,
                    leaf_count=None, first=False, fully=True, depth=1,
-                   wrap_oneid=True):
+                   wrap_oneid=True, guard=None):
 
         if rest_expression is None:
             rest_expression = ([], [])
@@ -374,8 +379,6 @@ class ExpressionPattern(Pattern):
 
         candidates = rest_expression[1]
 
-        leaf_candidates = set(leaf_candidates)  # for fast lookup
-
         # "Artificially" only use more leaves than specified for some kind
         # of pattern.
         # TODO: This could be further optimized!
@@ -399,6 +402,9 @@ class ExpressionPattern(Pattern):
         less_first = len(rest_leaves) > 0
 
         if 'System`Orderless' in attributes:
+            # for fast lookup. only needed here, as hashing big leaves
+            # (e.g. long lists of reals) is expensive.
+            leaf_candidates = set(leaf_candidates)
             sets = None
             if leaf.get_head_name() == 'System`Pattern':
                 varname = leaf.leaves[0].get_name()
@@ -459,11 +465,14 @@ class ExpressionPattern(Pattern):
 
             def match_yield(new_vars, _):
                 if rest_leaves:
+                    if guard is not None and not guard(vars, new_vars):
+                        return
                     self.match_leaf(
                         leaf_yield, next_leaf, next_rest_leaves, items_rest,
                         new_vars, expression, attributes, evaluation,
                         fully=fully, depth=next_depth, leaf_index=next_index,
-                        leaf_count=leaf_count, wrap_oneid=wrap_oneid)
+                        leaf_count=leaf_count, wrap_oneid=wrap_oneid,
+                        guard=guard)
                 else:
                     if not fully or (not items_rest[0] and not items_rest[1]):
                         yield_func(new_vars, items_rest)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import sys
+from timeit import default_timer
+
+from mathics.core.expression import (
+    Expression, Integer, Real, String, Symbol, strip_context)
+
+# the number of memory blocks currently allocated by the interpreter. it is
+# cheap enough to be called around every evaluation step, unlike tracemalloc.
+# not available on Python 2, where no allocations are reported.
+_allocated_blocks = getattr(sys, 'getallocatedblocks', lambda: 0)
+
+
+class ProfileStats(object):
+    __slots__ = ('calls', 'time', 'self_time', 'attempts', 'matches', 'allocations')
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0.
+        self.self_time = 0.
+        self.attempts = 0
+        self.matches = 0
+        self.allocations = 0
+
+
+class EvaluationProfiler(object):
+    """
+    Collects statistics about an evaluation, per head symbol and per rule.
+    An Evaluation whose profiler attribute is set reports each evaluation
+    step (Expression.evaluate_next) and each attempt to apply a rule
+    (BaseRule.apply) to it.
+
+    For each head, calls, time and self_time refer to evaluation steps of
+    expressions with that head. As in cProfile, time counts recursive steps
+    only once, and self_time excludes the time spent in nested evaluation
+    steps. attempts and matches count the rules applied to such
+    expressions and how many of them matched. allocations is the net number
+    of memory blocks allocated during the evaluation steps.
+
+    For each rule, calls counts the attempts to apply it, matches the
+    successful ones; time and allocations include building the replacement
+    (i.e. running the Python code of builtin rules).
+
+    format_time is the time spent formatting the results of
+    Evaluation.evaluate, which is not profiled.
+    """
+
+    def __init__(self):
+        self.format_time = 0.
+        self.heads = {}
+        self.rules = {}     # id(rule) -> (rule, stats)
+        self.nested = []    # time spent in nested evaluation steps, per level
+        self.active = {}    # head names and rule ids -> recursion depth
+
+    def _head_stats(self, name):
+        stats = self.heads.get(name)
+        if stats is None:
+            stats = ProfileStats()
+            self.heads[name] = stats
+        return stats
+
+    def _enter(self, key):
+        # like cProfile, count the time of recursive calls only once
+        depth = self.active.get(key, 0)
+        self.active[key] = depth + 1
+        return depth == 0
+
+    def _leave(self, key):
+        depth = self.active[key] - 1
+        if depth:
+            self.active[key] = depth
+        else:
+            del self.active[key]
+
+    def evaluate_next(self, expr, evaluation):
+        if expr.is_atom():
+            return expr.evaluate_next(evaluation)
+
+        name = expr.get_lookup_name()
+        stats = self._head_stats(name)
+        outermost = self._enter(name)
+        nested = self.nested
+        nested.append(0.)
+        blocks = _allocated_blocks()
+        start = default_timer()
+        try:
+            return expr.evaluate_next(evaluation)
+        finally:
+            elapsed = default_timer() - start
+            self._leave(name)
+            stats.calls += 1
+            if outermost:
+                stats.time += elapsed
+                stats.allocations += _allocated_blocks() - blocks
+            stats.self_time += elapsed - nested.pop()
+            if nested:
+                nested[-1] += elapsed
+
+    def format_output(self, expr, evaluation):
+        # the evaluation steps of MakeBoxes would otherwise dominate the
+        # statistics of the actual evaluation.
+        evaluation.profiler = None
+        start = default_timer()
+        try:
+            return evaluation.format_output(expr, evaluation.format)
+        finally:
+            self.format_time += default_timer() - start
+            evaluation.profiler = self
+
+    def apply_rule(self, rule, expression, evaluation, **kwargs):
+        key = id(rule)
+        entry = self.rules.get(key)
+        if entry is None:
+            entry = (rule, ProfileStats())
+            self.rules[key] = entry
+        stats = entry[1]
+        head_stats = self._head_stats(expression.get_lookup_name())
+        outermost = self._enter(key)
+
+        blocks = _allocated_blocks()
+        start = default_timer()
+        result = None
+        try:
+            result = rule.do_apply(expression, evaluation, **kwargs)
+            return result
+        finally:
+            elapsed = default_timer() - start
+            self._leave(key)
+            stats.calls += 1
+            if outermost:
+                stats.time += elapsed
+                stats.allocations += _allocated_blocks() - blocks
+            head_stats.attempts += 1
+            if result is not None and not (kwargs.get('return_list') and not result):
+                stats.matches += 1
+                head_stats.matches += 1
+
+    def get_heads(self):
+        # most expensive first
+        return sorted(self.heads.items(), key=lambda item: -item[1].time)
+
+    def get_rules(self):
+        return sorted(self.rules.values(), key=lambda item: -item[1].time)
+
+    def to_expression(self):
+        def head_entry(name, stats):
+            return Expression(
+                'Rule', Expression('HoldForm', Symbol(name) if name else String('')),
+                Expression('List',
+                           Expression('Rule', String('Calls'), Integer(stats.calls)),
+                           Expression('Rule', String('Time'), Real(stats.time)),
+                           Expression('Rule', String('SelfTime'), Real(stats.self_time)),
+                           Expression('Rule', String('Attempts'), Integer(stats.attempts)),
+                           Expression('Rule', String('Matches'), Integer(stats.matches)),
+                           Expression('Rule', String('Allocations'), Integer(stats.allocations))))
+
+        def rule_entry(rule, stats):
+            return Expression(
+                'Rule', Expression('HoldPattern', rule.pattern.expr),
+                Expression('List',
+                           Expression('Rule', String('Attempts'), Integer(stats.calls)),
+                           Expression('Rule', String('Matches'), Integer(stats.matches)),
+                           Expression('Rule', String('Time'), Real(stats.time)),
+                           Expression('Rule', String('Allocations'), Integer(stats.allocations))))
+
+        return Expression(
+            'List',
+            Expression('Rule', String('Heads'), Expression(
+                'List', *[head_entry(name, stats) for name, stats in self.get_heads()])),
+            Expression('Rule', String('Rules'), Expression(
+                'List', *[rule_entry(rule, stats) for rule, stats in self.get_rules()])))
+
+    def format_report(self, evaluation, limit=20):
+        # evaluation is only used to format the patterns of the rules
+        lines = ['formatting the output took %.4f s' % self.format_time, '']
+        lines.append('%-24s %8s %10s %10s %9s %9s %12s' % (
+            'head', 'calls', 'time', 'self', 'attempts', 'matches', 'allocations'))
+        for name, stats in self.get_heads()[:limit]:
+            lines.append('%-24s %8d %10.4f %10.4f %9d %9d %12d' % (
+                strip_context(name), stats.calls, stats.time, stats.self_time,
+                stats.attempts, stats.matches, stats.allocations))
+        lines.append('')
+        lines.append('%-24s %-36s %9s %9s %10s %12s' % (
+            'rule head', 'pattern', 'attempts', 'matches', 'time', 'allocations'))
+        for rule, stats in self.get_rules()[:limit]:
+            pattern = Expression('InputForm', rule.pattern.expr).format(
+                evaluation, 'System`OutputForm').boxes_to_text(evaluation=evaluation)
+            if len(pattern) > 36:
+                pattern = pattern[:33] + '...'
+            lines.append('%-24s %-36s %9d %9d %10.4f %12d' % (
+                strip_context(rule.pattern.get_lookup_name()), pattern,
+                stats.calls, stats.matches, stats.time, stats.allocations))
+        return '\n'.join(lines)
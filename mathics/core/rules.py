@@ -21,6 +21,14 @@ class BaseRule(KeyComparable):
 
     def apply(self, expression, evaluation, fully=True, return_list=False,
               max_list=None):
+        if evaluation.profiler is not None:
+            return evaluation.profiler.apply_rule(
+                self, expression, evaluation, fully=fully,
+                return_list=return_list, max_list=max_list)
+        return self.do_apply(expression, evaluation, fully, return_list, max_list)
+
+    def do_apply(self, expression, evaluation, fully=True, return_list=False,
+                 max_list=None):
         result_list = []
         # count = 0
 
@@ -113,6 +121,9 @@ class BuiltinRule(BaseRule):
         self.pass_expression = 'expression' in function_arguments(function)
 
     def do_replace(self, expression, vars, options, evaluation):
+        if self.function is None:
+            self._load_function()
+
         # The Python function implementing this builtin expects
         # argument names corresponding to the symbol names without
         # context marks.
@@ -131,14 +142,29 @@ class BuiltinRule(BaseRule):
     def __getstate__(self):
         odict = self.__dict__.copy()
         del odict['function']
-        odict['function_'] = (
-            self.function.__self__.get_name(), self.function.__name__)
+        if self.function is not None:
+            builtin = self.function.__self__
+            odict['function_'] = (
+                builtin.get_name(), self.function.__name__,
+                builtin.__class__.__module__)
         return odict
 
     def __setstate__(self, dict):
         from mathics.builtin import builtins
 
         self.__dict__.update(dict)   # update attributes
-        cls, name = dict['function_']
+        cls, name = dict['function_'][:2]
+
+        # rules of builtins from lazily loaded modules only load their
+        # module once they are applied.
+        if cls in builtins:
+            self.function = getattr(builtins[cls], name)
+        else:
+            self.function = None
+
+    def _load_function(self):
+        from mathics.builtin import builtins, load_module
 
+        cls, name, module_name = self.function_
+        load_module(module_name)
         self.function = getattr(builtins[cls], name)
@@ -593,6 +593,8 @@ class Documentation(DocElement):
                     part.is_appendix = True
                     appendix.append(part)
 
+        builtin.load_lazy_modules()
+
         for title, modules, builtins_by_module, start in [(
             "Reference of built-in symbols", builtin.modules,
             builtin.builtins_by_module, True)]:     # nopep8
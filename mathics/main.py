@@ -14,6 +14,7 @@ import locale
 from mathics.core.definitions import Definitions
 from mathics.core.expression import strip_context
 from mathics.core.evaluation import Evaluation, Output
+from mathics.core.profiler import EvaluationProfiler
 from mathics.core.parser import LineFeeder, FileLineFeeder
 from mathics import version_string, license_string, __version__
 from mathics import settings
@@ -231,12 +232,24 @@ def main():
         '--no-readline', help="disable line editing (implies --no-completion)",
         action='store_true')
 
+    argparser.add_argument(
+        '--no-cache', help="don't use the cached snapshot of the builtin "
+        "definitions", action='store_true')
+
+    argparser.add_argument(
+        '--profile', help="print statistics about the evaluated heads and "
+        "rules after each evaluation (see EvaluationProfile)",
+        action='store_true')
+
     argparser.add_argument(
         '--version', '-v', action='version',
         version='%(prog)s ' + __version__)
 
     args, script_args = argparser.parse_known_args()
 
+    if args.no_cache:
+        settings.CACHE_DIR = None
+
     quit_command = 'CTRL-BREAK' if sys.platform == 'win32' else 'CONTROL-D'
 
     definitions = Definitions(add_builtin=True)
@@ -246,12 +259,26 @@ def main():
         definitions, args.colors, want_readline=not(args.no_readline),
         want_completion=not(args.no_completion))
 
+    def new_evaluation(**kwargs):
+        evaluation = Evaluation(
+            shell.definitions, output=TerminalOutput(shell), **kwargs)
+        if args.profile:
+            evaluation.profiler = EvaluationProfiler()
+        return evaluation
+
+    def print_profile(evaluation):
+        profiler = evaluation.profiler
+        if profiler is not None and profiler.heads:
+            print(profiler.format_report(Evaluation(shell.definitions)))
+            print()
+
     if args.execute:
         for expr in args.execute:
             print(shell.get_in_prompt() + expr)
-            evaluation = Evaluation(shell.definitions, output=TerminalOutput(shell))
+            evaluation = new_evaluation()
             result = evaluation.parse_evaluate(expr, timeout=settings.TIMEOUT)
             shell.print_result(result)
+            print_profile(evaluation)
 
         if not args.persist:
             return
@@ -260,12 +287,12 @@ def main():
         feeder = FileLineFeeder(args.FILE)
         try:
             while not feeder.empty():
-                evaluation = Evaluation(
-                    shell.definitions, output=TerminalOutput(shell), catch_interrupt=False)
+                evaluation = new_evaluation(catch_interrupt=False)
                 query = evaluation.parse_feeder(feeder)
                 if query is None:
                     continue
                 evaluation.evaluate(query, timeout=settings.TIMEOUT)
+                print_profile(evaluation)
         except (KeyboardInterrupt):
             print('\nKeyboardInterrupt')
 
@@ -282,13 +309,14 @@ def main():
 
     while True:
         try:
-            evaluation = Evaluation(shell.definitions, output=TerminalOutput(shell))
+            evaluation = new_evaluation()
             query = evaluation.parse_feeder(shell)
             if query is None:
                 continue
             result = evaluation.evaluate(query, timeout=settings.TIMEOUT)
             if result is not None:
                 shell.print_result(result)
+            print_profile(evaluation)
         except (KeyboardInterrupt):
             print('\nKeyboardInterrupt')
         except (SystemExit, EOFError):
@@ -63,6 +63,9 @@ def parse_args():
     argparser.add_argument(
         "--external", "-e", dest="external", action="store_true",
         help="allow external access to server")
+    argparser.add_argument(
+        "--no-cache", dest="no_cache", action="store_true",
+        help="don't use the cached snapshot of the builtin definitions")
 
     return argparser.parse_args()
 
@@ -71,6 +74,9 @@ def launch_app(args):
     quit_command = 'CTRL-BREAK' if sys.platform == 'win32' else 'CONTROL-C'
     port = args.port
 
+    if args.no_cache:
+        mathics_settings.CACHE_DIR = None
+
     if not args.quiet:
         print()
         print(server_version_string)
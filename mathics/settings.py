@@ -29,6 +29,26 @@ TIMEOUT = None
 # without setting a custom thread stack size.
 DEFAULT_MAX_RECURSION_DEPTH = 512
 
+# integers in the range [low, high) are shared instead of being allocated
+# each time they are created
+INTEGER_CACHE_RANGE = (-128, 1024)
+
+# the definitions of this many web sessions are kept in memory. after each
+# query, the definitions it changed are stored in SESSION_DEFINITIONS_DIR if
+# that is set, or else in the session itself, from where other server
+# processes and restarts pick them up. stored definitions that are older
+# than SESSION_COOKIE_AGE belong to expired sessions and get removed.
+MAX_SESSION_DEFINITIONS = 64
+SESSION_DEFINITIONS_DIR = None
+
+# the number of worker processes (parallel kernels) used by ParallelMap,
+# ParallelTable and friends. None starts one for each CPU.
+PARALLEL_KERNELS = None
+
+# the number of compiled regular expressions of string patterns that are
+# kept for StringMatchQ, StringCases and friends
+REGEX_CACHE_SIZE = 1024
+
 # max pickle.dumps() size for storing results in DB
 # historically 10000 was used on public mathics servers
 MAX_STORED_SIZE = 10000
@@ -46,6 +66,22 @@ else:
 # if not path.exists(DATA_DIR):
 #    os.makedirs(DATA_DIR)
 
+# snapshots of the builtin definitions are cached here to speed up startup.
+# MATHICS_CACHE_DIR overrides this, an empty value disables the cache.
+if 'MATHICS_CACHE_DIR' in os.environ:
+    CACHE_DIR = os.environ['MATHICS_CACHE_DIR'] or None
+elif sys.platform.startswith('win'):
+    CACHE_DIR = os.environ.get('LOCALAPPDATA', os.environ['APPDATA']).replace(
+        os.sep, '/') + '/Python/Mathics/cache/'
+else:
+    CACHE_DIR = path.join(
+        os.environ.get('XDG_CACHE_HOME') or path.expanduser('~/.cache'),
+        'mathics')
+
+# mathics/benchmark.py --save-baseline stores its results here by default,
+# --compare reads them.
+BENCHMARK_BASELINE = DATA_DIR + 'benchmark-baseline.json'
+
 DOC_DIR = ROOT_DIR + 'doc/documentation/'
 DOC_TEX_DATA = ROOT_DIR + 'doc/tex/data'
 DOC_XML_DATA = ROOT_DIR + 'doc/xml/data'
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import io
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import weakref
+
+from collections import OrderedDict
+
+import six
+
+
+class _Persisted(object):
+    # what the persisted records of a session's definitions amount to
+
+    def __init__(self, definitions, version, count):
+        self.now = definitions.now
+        self.names = set(definitions.user)
+        self.version = version      # tells whether another process wrote
+        self.count = count          # the number of records
+
+
+class DefinitionsStore(object):
+    """
+    Keeps the live definitions of the most recently used web sessions in
+    memory. All of them are overlays (see Definitions.overlay) sharing the
+    builtin definitions, so a query neither unpickles nor pickles the user
+    definitions of its session, and the caches of the definitions survive
+    between queries.
+
+    After each query, persist() records the user definitions that changed
+    and the names of those that were removed, into the spill directory if
+    there is one, otherwise via save(session_key, record, replace), which
+    puts the records into the session. Every max_records records, the
+    whole user definitions are written instead. get() restores the
+    definitions from the records when a session is not in memory, or when
+    another process has written them meanwhile, so several processes may
+    serve the same session.
+
+    Spill files that are not written for max_age seconds belong to expired
+    sessions and are removed by remove_expired(), which also runs every
+    cleanup_interval seconds.
+    """
+
+    cleanup_interval = 3600
+    max_records = 32
+
+    def __init__(self, definitions, max_sessions, spill_dir=None, save=None,
+                 max_age=None):
+        self.definitions = definitions
+        self.max_sessions = max_sessions
+        self.spill_dir = spill_dir
+        self.save = save
+        self.max_age = max_age
+
+        self.sessions = OrderedDict()   # least recently used first
+        self.persisted = weakref.WeakKeyDictionary()
+        self.lock = threading.Lock()
+        self.next_cleanup = 0
+
+    def get(self, session_key, records=None):
+        # records are those saved into the session, if any
+        with self.lock:
+            version = self._version(session_key, records)
+            definitions = self.sessions.pop(session_key, None)
+            if (definitions is None or
+                    self.persisted[definitions].version != version):
+                definitions = self._load(session_key, records, version)
+            self.sessions[session_key] = definitions
+
+            # all sessions are persisted after their queries, so evicted
+            # ones are simply dropped
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+            return definitions
+
+    def persist(self, session_key, definitions):
+        # records the changes since definitions were last persisted
+        with self.lock:
+            persisted = self.persisted[definitions]
+            user = definitions.user
+            names = set(user)
+            changed = sorted(
+                name for name in names if name not in persisted.names or
+                getattr(user[name], 'changed', 0) > persisted.now)
+            removed = sorted(persisted.names - names)
+            if not changed and not removed:
+                return
+            replace = persisted.count >= self.max_records
+            if replace:
+                record = [uuid.uuid4().hex, None,
+                          definitions.get_user_definitions()]
+            else:
+                record = [uuid.uuid4().hex, removed,
+                          definitions.get_user_definitions(changed)]
+            version = self._write(session_key, record, replace)
+            self.persisted[definitions] = _Persisted(
+                definitions, version, 1 if replace else persisted.count + 1)
+
+    def rename(self, old_session_key, new_session_key):
+        # logging in and out gives the session a new key. definitions that
+        # were saved into the session move along with it, but spilled ones
+        # need to be moved here.
+        with self.lock:
+            definitions = self.sessions.pop(old_session_key, None)
+            if definitions is not None:
+                self.sessions[new_session_key] = definitions
+            old_filename = self._spill_filename(old_session_key)
+            new_filename = self._spill_filename(new_session_key)
+            if old_filename is not None and os.path.exists(old_filename):
+                if new_filename is not None:
+                    if os.path.exists(new_filename):
+                        os.remove(new_filename)
+                    os.rename(old_filename, new_filename)
+                else:
+                    os.remove(old_filename)
+
+    def remove_expired(self):
+        with self.lock:
+            self._remove_expired()
+
+    def flush(self):
+        # persists the sessions in memory that have unpersisted changes
+        for session_key, definitions in list(self.sessions.items()):
+            self.persist(session_key, definitions)
+
+    def _spill_filename(self, session_key):
+        if self.spill_dir is None or not re.match(r'^\w+$', session_key):
+            return None
+        return os.path.join(self.spill_dir, session_key + '.definitions')
+
+    def _version(self, session_key, records):
+        filename = self._spill_filename(session_key)
+        if filename is not None:
+            # a new record makes the file grow, and replacing the records
+            # rewrites it
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                return None
+            return (stat.st_ino, stat.st_size, stat.st_mtime)
+        records = self._parse_records(records)
+        if not records:
+            return None
+        return records[-1][0]
+
+    def _parse_records(self, records):
+        # user definitions that were saved by earlier versions of the store
+        # are a single serialized string
+        if not records:
+            return []
+        if isinstance(records, six.string_types):
+            return [[None, None, records]]
+        return records
+
+    def _load(self, session_key, records, version):
+        definitions = self.definitions.overlay()
+        filename = self._spill_filename(session_key)
+        count = None
+        if filename is not None and os.path.exists(filename):
+            with io.open(filename, 'r', encoding='ascii') as spill_file:
+                records = [json.loads(line) for line in spill_file if line.strip()]
+        else:
+            legacy = isinstance(records, six.string_types)
+            records = self._parse_records(records)
+            if records and (legacy or filename is not None):
+                # the next record has to hold all the user definitions
+                count = self.max_records
+        for _, removed, serialized in records:
+            if removed is None:
+                definitions.set_user_definitions(serialized)
+            else:
+                definitions.set_user_definitions(serialized, merge=True)
+                for name in removed:
+                    if name in definitions.user:
+                        definitions.reset_user_definition(name)
+        # the definitions were changed at the times of the process that
+        # persisted them, and later changes must come after those.
+        definitions.now = max(
+            [definitions.now] + [getattr(definition, 'changed', 0)
+                                 for definition in definitions.user.values()])
+        self.persisted[definitions] = _Persisted(
+            definitions, version, len(records) if count is None else count)
+        return definitions
+
+    def _write(self, session_key, record, replace):
+        # gives the new version
+        filename = self._spill_filename(session_key)
+        if filename is not None:
+            if not os.path.isdir(self.spill_dir):
+                os.makedirs(self.spill_dir)
+            with io.open(filename, 'w' if replace else 'a',
+                         encoding='ascii') as spill_file:
+                spill_file.write(six.text_type(json.dumps(record)) + '\n')
+            if time.time() >= self.next_cleanup:
+                self._remove_expired()
+            return self._version(session_key, None)
+        elif self.save is not None:
+            self.save(session_key, record, replace)
+            return record[0]
+
+    def _remove_expired(self):
+        self.next_cleanup = time.time() + self.cleanup_interval
+        if self.spill_dir is None or self.max_age is None or not os.path.isdir(self.spill_dir):
+            return
+        # a spill file is written after each query that changes the
+        # definitions of its session, so sessions that were only read from
+        # since are kept while they are in memory.
+        deadline = time.time() - self.max_age
+        for name in os.listdir(self.spill_dir):
+            if not name.endswith('.definitions'):
+                continue
+            if name[:-len('.definitions')] in self.sessions:
+                continue
+            filename = os.path.join(self.spill_dir, name)
+            try:
+                if os.path.getmtime(filename) < deadline:
+                    os.remove(filename)
+            except OSError:
+                pass
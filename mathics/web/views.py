@@ -5,8 +5,10 @@ from __future__ import unicode_literals
 from __future__ import print_function
 from __future__ import absolute_import
 
+import atexit
 import sys
 import traceback
+from importlib import import_module
 
 from django.shortcuts import render_to_response
 from django.template import RequestContext, loader
@@ -23,6 +25,7 @@ from mathics.core.definitions import Definitions
 from mathics.core.evaluation import Evaluation, Message, Result, Output
 
 from mathics.web.models import Query, Worksheet
+from mathics.web.sessions import DefinitionsStore
 from mathics.web.forms import LoginForm, SaveForm
 from mathics.doc import documentation
 from mathics.doc.doc import DocPart, DocChapter, DocSection
@@ -61,6 +64,29 @@ def require_ajax_login(func):
 definitions = Definitions(add_builtin=True)
 
 
+def save_session_definitions(session_key, record, replace):
+    session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    records = [] if replace else list(session.get('definitions', []))
+    records.append(record)
+    session['definitions'] = records
+    session.save()
+
+
+session_definitions = DefinitionsStore(
+    definitions, settings.MAX_SESSION_DEFINITIONS,
+    spill_dir=settings.SESSION_DEFINITIONS_DIR, save=save_session_definitions,
+    max_age=settings.SESSION_COOKIE_AGE)
+session_definitions.remove_expired()
+atexit.register(session_definitions.flush)
+
+
+def get_session_definitions(request):
+    if request.session.session_key is None:
+        request.session.save()
+    return session_definitions.get(
+        request.session.session_key, request.session.get('definitions'))
+
+
 def require_ajax_login(f):
     return f
 
@@ -107,8 +133,7 @@ def query(request):
                           )
         query_log.save()
 
-    user_definitions = request.session.get('definitions')
-    definitions.set_user_definitions(user_definitions)
+    definitions = get_session_definitions(request)
     evaluation = Evaluation(definitions, format='xml', output=WebOutput())
     feeder = MultiLineFeeder(input, '<notebook>')
     results = []
@@ -130,11 +155,11 @@ def query(request):
             results.append(Result([Message('System', 'exception', msg)], None, None))
         else:
             raise
+    finally:
+        session_definitions.persist(request.session.session_key, definitions)
     result = {
         'results': [result.get_data() for result in results],
     }
-    request.session['definitions'] = definitions.get_user_definitions()
-
     if settings.LOG_QUERIES:
         query_log.timeout = evaluation.timeout
         query_log.result = six.text_type(result)  # evaluation.results
@@ -207,7 +232,11 @@ def login(request):
                 general_errors = ["Invalid username and/or password."]
             else:
                 result = 'ok'
+                session_key = request.session.session_key
                 auth.login(request, user)
+                if session_key is not None:
+                    session_definitions.rename(
+                        session_key, request.session.session_key)
         else:
             password = nicepass()
             try:
@@ -235,9 +264,13 @@ Your password is: %s\n\nYours,\nThe Mathics team""" % password)
 
 def logout(request):
     # Remember user definitions
+    session_key = request.session.session_key
     user_definitions = request.session.get('definitions', {})
     auth.logout(request)
     request.session['definitions'] = user_definitions
+    if session_key is not None:
+        request.session.save()
+        session_definitions.rename(session_key, request.session.session_key)
     return JsonResponse()
 
 
@@ -12,6 +12,8 @@ from mathics.builtin.compile import has_llvmlite
 
 if has_llvmlite:
     from mathics.builtin.compile import _compile, CompileArg, int_type, real_type, bool_type, CompileError
+    from mathics.builtin.compile import (
+        int_vector_type, real_vector_type, int_matrix_type, real_matrix_type, CompiledRuntimeError)
 
 
 class CompileTest(unittest.TestCase):
@@ -446,3 +448,111 @@ class BitwiseTest(CompileTest):
     def test_bitnot(self):
         self._test_bitwise('BitNot', [0], -1)
         self._test_bitwise('BitNot', [13413], -13414)
+
+
+class LoopTest(CompileTest):
+    def test_while(self):
+        # GCD
+        expr = Expression('CompoundExpression', Expression(
+            'While', Expression('Unequal', Symbol('b'), Integer(0)),
+            Expression('Set', Expression('List', Symbol('a'), Symbol('b')),
+                       Expression('List', Symbol('b'), Expression('Mod', Symbol('a'), Symbol('b'))))),
+            Symbol('a'))
+        args = [CompileArg('System`a', int_type), CompileArg('System`b', int_type)]
+        cfunc = _compile(expr, args)
+        self.assertTypeEqual(cfunc(24, 42), 6)
+        self.assertTypeEqual(cfunc(7, 0), 7)
+
+    def test_do(self):
+        # s becomes a real on the way
+        loop = Expression(
+            'Do', Expression('AddTo', Symbol('s'), Expression('Power', Symbol('i'), Integer(-1))),
+            Expression('List', Symbol('i'), Symbol('n')))
+        expr = Expression('Module', Expression('List', Expression('Set', Symbol('s'), Integer(0))),
+                          Expression('CompoundExpression', loop, Symbol('s')))
+        args = [CompileArg('System`n', int_type)]
+        cfunc = _compile(expr, args)
+        self.assertNumEqual(cfunc(3), 1. + 1. / 2 + 1. / 3)
+        self.assertTypeEqual(cfunc(0), 0.)
+
+    def test_do_step(self):
+        loop = Expression(
+            'Do', Expression('AddTo', Symbol('s'), Symbol('i')),
+            Expression('List', Symbol('i'), Symbol('n'), Integer(1), Integer(-2)))
+        expr = Expression('Module', Expression('List', Expression('Set', Symbol('s'), Integer(0))),
+                          Expression('CompoundExpression', loop, Symbol('s')))
+        args = [CompileArg('System`n', int_type)]
+        cfunc = _compile(expr, args)
+        self.assertTypeEqual(cfunc(5), 9)
+        self.assertTypeEqual(cfunc(-5), 0)
+
+    def test_for_break_continue(self):
+        body = Expression(
+            'CompoundExpression',
+            Expression('If', Expression('Equal', Symbol('i'), Integer(2)), Expression('Continue')),
+            Expression('If', Expression('Greater', Symbol('i'), Integer(4)), Expression('Break')),
+            Expression('AddTo', Symbol('s'), Symbol('i')))
+        loop = Expression(
+            'For', Expression('Set', Symbol('i'), Integer(1)), Expression('Less', Symbol('i'), Symbol('n')),
+            Expression('Increment', Symbol('i')), body)
+        expr = Expression('Module', Expression('List', Expression('Set', Symbol('s'), Integer(0)), Symbol('i')),
+                          Expression('CompoundExpression', loop, Symbol('s')))
+        args = [CompileArg('System`n', int_type)]
+        cfunc = _compile(expr, args)
+        self.assertTypeEqual(cfunc(100), 8)
+
+    def test_assign_undeclared(self):
+        expr = Expression('Set', Symbol('y'), Symbol('x'))
+        args = [CompileArg('System`x', int_type)]
+        with self.assertRaises(CompileError):
+            _compile(expr, args)
+
+
+class TensorTest(CompileTest):
+    def test_part(self):
+        expr = Expression('Part', Symbol('m'), Symbol('i'), Integer(-1))
+        args = [CompileArg('System`m', int_matrix_type), CompileArg('System`i', int_type)]
+        cfunc = _compile(expr, args)
+        self.assertTypeEqual(cfunc([[1, 2], [3, 4]], 2), 4)
+        self.assertTypeEqual(cfunc([[1, 2], [3, 4]], -2), 2)
+        with self.assertRaises(CompiledRuntimeError):
+            cfunc([[1, 2], [3, 4]], 3)
+        with self.assertRaises(CompiledRuntimeError):
+            cfunc([[1, 2], [3, 4]], 0)
+
+    def test_total(self):
+        expr = Expression('Total', Symbol('v'))
+        cfunc = _compile(expr, [CompileArg('System`v', real_vector_type)])
+        self.assertTypeEqual(cfunc([1., 2, 3.5]), 6.5)
+        self.assertTypeEqual(cfunc([]), 0.)
+
+    def test_table(self):
+        expr = Expression('Table', Expression('Times', Symbol('i'), Symbol('j')),
+                          Expression('List', Symbol('i'), Symbol('n')), Expression('List', Symbol('j'), Integer(3)))
+        cfunc = _compile(expr, [CompileArg('System`n', int_type)])
+        self.assertEqual(cfunc(2), [[1, 2, 3], [2, 4, 6]])
+        self.assertEqual(cfunc(0), [])
+
+    def test_value_semantics(self):
+        # w is a copy of v
+        body = Expression(
+            'CompoundExpression',
+            Expression('Set', Expression('Part', Symbol('w'), Integer(1)), Integer(5)),
+            Expression('List', Expression('Part', Symbol('v'), Integer(1)),
+                       Expression('Part', Symbol('w'), Integer(1))))
+        expr = Expression('Module', Expression('List', Expression('Set', Symbol('w'), Symbol('v'))), body)
+        cfunc = _compile(expr, [CompileArg('System`v', real_vector_type)])
+        self.assertEqual(cfunc([1., 2.]), [1., 5.])
+
+    def test_matrix_rows(self):
+        expr = Expression('List', Expression('Part', Symbol('m'), Integer(2)), Symbol('v'))
+        args = [CompileArg('System`m', real_matrix_type), CompileArg('System`v', int_vector_type)]
+        cfunc = _compile(expr, args)
+        self.assertEqual(cfunc([[1., 2.], [3., 4.]], [5, 6]), [[3., 4.], [5., 6.]])
+        with self.assertRaises(CompiledRuntimeError):
+            cfunc([[1., 2.], [3., 4.]], [5])
+
+    def test_invalid_argument(self):
+        cfunc = _compile(Expression('Total', Symbol('v')), [CompileArg('System`v', int_vector_type)])
+        with self.assertRaises(TypeError):
+            cfunc([1, 2.5])
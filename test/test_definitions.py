@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from mathics.core.definitions import Definitions
+from mathics.core.evaluation import Evaluation
+from mathics.core.parser import parse, SingleLineFeeder
+
+
+class BuiltinSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'definitions.pickle')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def evaluate(self, definitions, query):
+        evaluation = Evaluation(definitions, catch_interrupt=False)
+        expr = parse(definitions, SingleLineFeeder(query))
+        return evaluation.evaluate(expr).result
+
+    def check_definitions(self, definitions):
+        self.assertEqual(self.evaluate(definitions, 'Integrate[x^2, x]'), 'x ^ 3 / 3')
+        # autoloaded import formats
+        self.assertEqual(self.evaluate(definitions, 'MemberQ[$ImportFormats, "CSV"]'), 'True')
+
+    def testSnapshot(self):
+        built = Definitions(add_builtin=True, builtin_filename=self.filename)
+        self.assertTrue(os.path.exists(self.filename))
+
+        loaded = Definitions(add_builtin=True, builtin_filename=self.filename)
+        self.assertEqual(sorted(built.builtin.keys()), sorted(loaded.builtin.keys()))
+        self.assertEqual(built.now, loaded.now)
+        self.check_definitions(loaded)
+
+    def testBrokenSnapshot(self):
+        with open(self.filename, 'wb') as snapshot:
+            snapshot.write(b'not a snapshot')
+
+        definitions = Definitions(add_builtin=True, builtin_filename=self.filename)
+        self.check_definitions(definitions)
+
+        # the broken snapshot got replaced
+        loaded = Definitions(add_builtin=True, builtin_filename=self.filename)
+        self.check_definitions(loaded)
+
+    def testLazyModules(self):
+        # a loaded snapshot only imports a lazily loaded builtin module once
+        # one of its rules is applied. run in a fresh interpreter, since this
+        # one already imported all of them.
+        Definitions(add_builtin=True, builtin_filename=self.filename)
+        script = """if True:
+            import sys
+            from mathics.core.definitions import Definitions
+            from mathics.core.evaluation import Evaluation
+            from mathics.core.parser import parse, SingleLineFeeder
+
+            definitions = Definitions(add_builtin=True, builtin_filename=%r)
+            assert 'mathics.builtin.plot' not in sys.modules
+            expr = parse(definitions, SingleLineFeeder('Head[Plot[x, {x, 0, 1}]]'))
+            result = Evaluation(definitions, catch_interrupt=False).evaluate(expr)
+            assert result.result == 'Graphics', result.result
+            assert 'mathics.builtin.plot' in sys.modules
+            assert 'mathics.builtin.natlang' not in sys.modules
+        """ % self.filename
+        subprocess.check_call([sys.executable, '-c', script])
+
+
+class UserDefinitionsTest(unittest.TestCase):
+    def evaluate(self, definitions, query):
+        evaluation = Evaluation(definitions, catch_interrupt=False)
+        expr = parse(definitions, SingleLineFeeder(query))
+        return evaluation.evaluate(expr).result
+
+    def testSubset(self):
+        builtin = Definitions(add_builtin=True)
+        source = builtin.overlay()
+        self.evaluate(source, 'f[x_] := x + 1; g = 2; h = 3')
+
+        target = builtin.overlay()
+        self.evaluate(target, 'g = 5; k = 7')
+        target.set_user_definitions(
+            source.get_user_definitions(['Global`f', 'Global`g']), merge=True)
+        self.assertEqual(self.evaluate(target, '{f[g], h, k}'), '{3, h, 7}')
+
+        target.set_user_definitions(source.get_user_definitions(['Global`h']))
+        self.assertEqual(self.evaluate(target, '{f[1], h, k}'), '{f[1], 3, k}')
+
+
+if __name__ == "__main__":
+    unittest.main()
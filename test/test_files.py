@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import unittest
+
+from mathics.builtin.files import _TokenReader
+
+separators = [' ', '\t', '\r\n', '\n', '\r']
+number_chars = '+-.0123456789'
+
+
+class TokenReaderTest(unittest.TestCase):
+    def read(self, text, chunk_size, n=None, **kwargs):
+        stream = io.StringIO(text)
+        reader = _TokenReader(stream, **kwargs)
+        reader.chunk_size = chunk_size
+        tokens = reader.read(n)
+        reader.close()
+        return tokens, stream.read()
+
+    def check(self, text, n=None, **kwargs):
+        expected = self.read(text, 1 << 16, n, **kwargs)
+        for chunk_size in range(1, 8):
+            self.assertEqual(self.read(text, chunk_size, n, **kwargs), expected)
+        return expected
+
+    def testNumbers(self):
+        text = '12 -3.5\r\n7,8\t\t90\n\n'
+        kwargs = dict(separators=separators, accepted=number_chars)
+        self.assertEqual(self.check(text, **kwargs),
+                         (['12', '-3.5', '7', '8', '90'], ''))
+        self.assertEqual(self.check(text, 3, **kwargs),
+                         (['12', '-3.5', '7'], '8\t\t90\n\n'))
+        self.assertEqual(self.check('1 2xy 3', **kwargs), (['1', '2', ''], ' 3'))
+
+    def testRecords(self):
+        text = 'a b\r\n\r\nc\rd'
+        self.assertEqual(self.check(text, separators=['\r\n', '\n', '\r']),
+                         (['a b', 'c', 'd'], ''))
+        self.assertEqual(self.check(text, separators=['\r\n']),
+                         (['a b', 'c\rd'], ''))
+        self.assertEqual(self.check(text, 1, separators=['\r\n']),
+                         (['a b'], '\r\n\r\nc\rd'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -80,6 +80,35 @@ class HashAndSameQ(unittest.TestCase):
                              (lambda: Integer(5), lambda: Rational(5, 2), lambda: MachineReal(5.12345678),
                               lambda: Complex(Integer(5), Integer(2)), lambda: String('xy'), lambda: Symbol('xy')))))
 
+    def testExpression(self):
+        _test_group(Expression('f', Integer(1), Symbol('x')), Expression('f', Integer(1), Symbol('x')),
+                    Expression('f', Integer(1), Symbol('y')), Expression('List', Integer(1), Symbol('x')))
+
+
+class CachedHash(unittest.TestCase):
+    def testMutation(self):
+        # the structural hash is cached on the expression and must be reset
+        # by in-place mutations
+        expr = Expression('f', Symbol('b'), Symbol('a'))
+        sorted_expr = Expression('f', Symbol('a'), Symbol('b'))
+        self.assertNotEqual(hash(expr), hash(sorted_expr))
+        expr.sort()
+        self.assertTrue(expr.same(sorted_expr))
+        self.assertEqual(hash(expr), hash(sorted_expr))
+
+    def testSetPart(self):
+        evaluation = Evaluation(definitions, catch_interrupt=False)
+        inner = Expression('List', Integer(1), Integer(2))
+        outer = Expression('List', inner, Integer(3))
+        hash(outer)
+        Expression('Set', Symbol('Global`cachedhash'), outer).evaluate(evaluation)
+        Expression('Set', Expression('Part', Symbol('Global`cachedhash'), Integer(1), Integer(2)),
+                   Integer(5)).evaluate(evaluation)
+        result = Symbol('Global`cachedhash').evaluate(evaluation)
+        expected = Expression('List', Expression('List', Integer(1), Integer(5)), Integer(3))
+        self.assertTrue(result.same(expected))
+        self.assertEqual(hash(result), hash(expected))
+
 
 if __name__ == '__main__':
     unittest.main()
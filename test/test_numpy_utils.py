@@ -4,10 +4,22 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import math
+import struct
 import unittest
+import warnings
 
 from mathics.builtin.numpy_utils import stack, unstack, concat, vectorize, conditional, clip, array, choose
 from mathics.builtin.numpy_utils import minimum, maximum, dot_t, mod, floor, sqrt, allclose
+from mathics.builtin.numpy_utils import pack, packed_tolist, packed_part, packed_range, packed_add
+from mathics.builtin.numpy_utils import packed_multiply, packed_total, packed_dot
+from mathics.builtin.numpy_utils import packed_abs, packed_floor, packed_mod, packed_map
+from mathics.builtin.numpy_utils import packed_from_bytes, packed_to_bytes, packed_buffer, packed_from_buffer
+from mathics.builtin.numpy_utils import is_numpy_available, LinAlgError, machine_array, machine_det
+from mathics.builtin.numpy_utils import machine_inverse, machine_solve, machine_eigenvalues, machine_matrix_exp
+from mathics.builtin.numpy_utils import machine_ill_conditioned
+from mathics.builtin.numpy_utils import vectorized_function
+from mathics.core.expression import Expression, Integer, Rational, Symbol
 
 
 @conditional
@@ -166,6 +178,123 @@ class Numpy(unittest.TestCase):
         a = vectorize(a, 0, _test_complex_conditional)
         self.assertEqualArrays(a, [[[-1, -1], [40, 50]], [[70, 80], [100, 111]]])
 
+    def testPackedArithmetic(self):
+        a = pack([[1, 2], [3, 4]], 'i')
+        self.assertEqual(packed_tolist(packed_add(a, a)), [[2, 4], [6, 8]])
+        self.assertEqual(packed_tolist(packed_multiply(a, 0.5)), [[0.5, 1.], [1.5, 2.]])
+        self.assertEqual(packed_tolist(packed_multiply(pack([0., 1.], 'f'), -1)), [0., -1.])
+
+        # no broadcasting, no overflows and no rounding of large integers.
+        self.assertIsNone(packed_add(a, pack([1, 2], 'i')))
+        self.assertIsNone(packed_multiply(pack([2 ** 62], 'i'), 2))
+        self.assertIsNone(packed_add(pack([2 ** 60], 'i'), 0.5))
+        self.assertIsNone(packed_multiply(pack([1e300], 'f'), 1e300))
+
+        # overflows are silent
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            self.assertIsNone(packed_multiply(pack([1e300], 'f'), pack([1e300], 'f')))
+            self.assertIsNone(packed_add(pack([1e308], 'f'), pack([1e308], 'f')))
+
+    def testPackedBytes(self):
+        data = struct.pack('<3d', 1.5, -2., 1e300)
+        self.assertEqual(packed_tolist(packed_from_bytes(data, 'd', '<', 3)), [1.5, -2., 1e300])
+        self.assertEqual(packed_tolist(packed_from_bytes(data, 'd', '<', 2, 8)), [-2., 1e300])
+        self.assertEqual(packed_to_bytes(packed_from_bytes(data, 'd', '<', 3), 'd', '<'), data)
+        self.assertEqual(packed_tolist(packed_from_bytes(b'\x01\x00\x00\x02', 'h', '>', 2)), [256, 2])
+        self.assertEqual(packed_to_bytes(pack([256, 2], 'i'), 'h', '>'), b'\x01\x00\x00\x02')
+
+        # no infinities, no overflows and no conversions between reals and integers.
+        self.assertIsNone(packed_from_bytes(struct.pack('<d', float('inf')), 'd', '<', 1))
+        self.assertIsNone(packed_from_bytes(struct.pack('<Q', 2 ** 64 - 1), 'Q', '<', 1))
+        self.assertIsNone(packed_to_bytes(pack([-1], 'i'), 'B', '<'))
+        self.assertIsNone(packed_to_bytes(pack([1e300], 'f'), 'f', '<'))
+        self.assertIsNone(packed_to_bytes(pack([1.], 'f'), 'i', '<'))
+        self.assertIsNone(packed_to_bytes(pack([1], 'i'), 'd', '<'))
+
+    def testPackedBuffer(self):
+        buffer = packed_buffer('i', [1, 2])
+        buffer.extend(packed_buffer('i', [3, 4]))
+        self.assertEqual(packed_tolist(packed_from_buffer(buffer, (2, 2))), [[1, 2], [3, 4]])
+        buffer = packed_buffer('f', [1.5])
+        self.assertEqual(packed_tolist(packed_from_buffer(buffer, (1,))), [1.5])
+
+        self.assertRaises(OverflowError, packed_buffer, 'i', [2 ** 64])
+        self.assertIsNone(packed_from_buffer(packed_buffer('f', [float('nan')]), (1,)))
+
+    def testPackedElementwise(self):
+        self.assertEqual(packed_tolist(packed_abs(pack([-1.5, 0., 2.], 'f'))), [1.5, 0., 2.])
+        self.assertIsNone(packed_abs(pack([-2 ** 63], 'i')))
+        self.assertEqual(packed_tolist(packed_floor(pack([-0.5, 2.5], 'f'))), [-1, 2])
+        self.assertIsNone(packed_floor(pack([1e30], 'f')))
+        self.assertEqual(packed_tolist(packed_mod(pack([5, -5, 7], 'i'), 3)), [2, 1, 1])
+        self.assertIsNone(packed_mod(pack([5, 6], 'i'), pack([0, 4], 'i')))
+        self.assertIsNone(packed_mod(pack([5.5], 'f'), 4))
+
+        a = pack([[1, 2], [3, 4]], 'i')
+        self.assertEqual(packed_tolist(packed_map(lambda x, y: x - y, a, 0.5)), [[0.5, 1.5], [2.5, 3.5]])
+        self.assertIsNone(packed_map(lambda x: None if x > 3 else x, a))
+        self.assertIsNone(packed_map(lambda x, y: x, a, pack([1, 2], 'i')))
+
+    def testPackedReductions(self):
+        self.assertEqual(packed_tolist(packed_range(1, 9, 2)), [1, 3, 5, 7, 9])
+        self.assertEqual(packed_total(packed_range(1, 100, 1)), 5050)
+        self.assertEqual(packed_total(pack([0.1] * 10, 'f')), 1.)
+        self.assertEqual(packed_tolist(packed_total(pack([[1, 2], [3, 4]], 'i'))), [4, 6])
+
+        a = pack([[1, 2], [3, 4]], 'i')
+        self.assertEqual(packed_dot(pack([1, 1], 'i'), pack([2, 3], 'i')), 5)
+        self.assertEqual(packed_tolist(packed_dot(a, a)), [[7, 10], [15, 22]])
+        self.assertEqual(packed_tolist(packed_dot(a, pack([1., 0.5], 'f'))), [2., 5.])
+        self.assertIsNone(packed_dot(a, pack([1, 2, 3], 'i')))
+
+        self.assertEqual(packed_part(a, [1, 0]), 3)
+        self.assertEqual(packed_tolist(packed_part(a, [slice(None, None, -1), 1])), [4, 2])
+
+    @unittest.skipUnless(is_numpy_available(), 'requires numpy')
+    def testMachineLinearAlgebra(self):
+        a = machine_array([[1, 2], [3, 4]], False)
+        self.assertAlmostEqual(machine_det(a), -2.)
+        self.assertEqualArrays(machine_inverse(a), [[-2., 1.], [1.5, -0.5]])
+        self.assertEqualArrays(machine_solve(a, machine_array([5, 11], False)), [1., 2.])
+        self.assertEqualArrays(machine_eigenvalues(machine_array([[2, 0], [0, -3]], False)), [-3., 2.])
+        self.assertEqualArrays(machine_matrix_exp(machine_array([[0, 0], [0, 1]], False)), [[1., 0.], [0., 2.718281828459045]])
+
+        singular = machine_array([[1, 2], [2, 4]], False)
+        self.assertRaises(LinAlgError, machine_inverse, singular)
+        self.assertRaises(LinAlgError, machine_solve, singular, machine_array([1, 0], False))
+        self.assertIsNone(machine_det(machine_array([[1, 2]], False)))
+        self.assertIsNone(machine_matrix_exp(machine_array([[1000.]], False)))
+        self.assertIsNone(machine_array([[1, 2], [3]], False))
+
+        hilbert = machine_array([[1. / (i + j + 1) for j in range(12)] for i in range(12)], False)
+        inverse = machine_inverse(hilbert)
+        self.assertEqual(inverse.shape, (12, 12))
+        self.assertTrue(machine_ill_conditioned(hilbert, inverse))
+        self.assertFalse(machine_ill_conditioned(a, machine_inverse(a)))
+        b = machine_array([1, 0], False)
+        self.assertFalse(machine_ill_conditioned(a, machine_solve(a, b), b))
+
+    @unittest.skipUnless(is_numpy_available(), 'requires numpy')
+    def testVectorizedFunction(self):
+        x, y = Symbol('Global`x'), Symbol('Global`y')
+        f = vectorized_function(Expression('Plus', Expression('Times', Rational(1, 2), x), Expression('Sqrt', y)),
+                                ['Global`x', 'Global`y'])
+        self.assertEqual(f([2., 4., 1.], [9., 1., -1.]), [4., 3., None])
+
+        f = vectorized_function(Expression('List', Expression('Cos', x), Expression('Power', x, Integer(-1))),
+                                ['Global`x'], expect_list=True)
+        result = f([0., 1.])
+        self.assertIsNone(result[0])
+        self.assertEqual(len(result[1]), 2)
+        for value, expected in zip(result[1], [math.cos(1.), 1.]):
+            self.assertAlmostEqual(value, expected)
+
+        # unknown functions and symbols
+        self.assertIsNone(vectorized_function(Expression('Global`g', x), ['Global`x']))
+        self.assertIsNone(vectorized_function(Expression('Plus', x, y), ['Global`x']))
+        self.assertIsNone(vectorized_function(Expression('Sin', x), ['Global`x'], expect_list=True))
+
     def assertEqualArrays(self, a, b):
         self.assertEqual(allclose(a, b), True)
 
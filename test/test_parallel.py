@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from mathics.core.definitions import Definitions
+from mathics.core.evaluation import Evaluation
+from mathics.core.parser import parse, SingleLineFeeder
+
+definitions = Definitions(add_builtin=True)
+
+
+class ParallelDefinitionsTest(unittest.TestCase):
+    def evaluate(self, definitions, query):
+        evaluation = Evaluation(definitions, catch_interrupt=False)
+        expr = parse(definitions, SingleLineFeeder(query))
+        return evaluation.evaluate(expr).result
+
+    def testRemoved(self):
+        session = definitions.overlay()
+        self.assertEqual(self.evaluate(session, 'h[1] = 10; ParallelMap[h, {1, 2}]'), '{10, h[2]}')
+        self.assertEqual(self.evaluate(session, 'h[1] =.; ParallelMap[h, {1, 2}]'), '{h[1], h[2]}')
+
+        self.assertEqual(self.evaluate(session, 'h[2] = 5; ParallelMap[h, {1, 2}]'), '{h[1], 5}')
+        session.reset_user_definition('Global`h')
+        self.assertEqual(self.evaluate(session, 'ParallelMap[h, {1, 2}]'), '{h[1], h[2]}')
+
+    def testSessions(self):
+        a, b = definitions.overlay(), definitions.overlay()
+        self.evaluate(a, 'secret[x_] := x + 1; ParallelMap[secret, {1}]')
+        self.evaluate(a, 'ParallelEvaluate[kernelvalue = 42]')
+        self.assertEqual(self.evaluate(a, 'Union[ParallelEvaluate[kernelvalue]]'), '{42}')
+
+        self.assertEqual(self.evaluate(b, 'Union[ParallelEvaluate[DownValues[secret]]]'), '{{}}')
+        self.assertEqual(self.evaluate(b, 'Union[ParallelEvaluate[kernelvalue]]'), '{kernelvalue}')
+        self.assertEqual(self.evaluate(a, 'ParallelMap[secret, {1}]'), '{2}')
+
+
+if __name__ == "__main__":
+    unittest.main()
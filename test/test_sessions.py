@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from mathics.core.definitions import Definitions
+from mathics.core.evaluation import Evaluation
+from mathics.core.parser import parse, SingleLineFeeder
+from mathics.web.sessions import DefinitionsStore
+
+definitions = Definitions(add_builtin=True)
+
+
+class DefinitionsStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = {}
+
+    def save(self, session_key, record, replace):
+        # like the web views, which keep the records in the session
+        records = [] if replace else self.saved.get(session_key, [])
+        self.saved[session_key] = records + [record]
+
+    def evaluate(self, store, session_key, query):
+        definitions = store.get(session_key, self.saved.get(session_key))
+        evaluation = Evaluation(definitions, catch_interrupt=False)
+        expr = parse(definitions, SingleLineFeeder(query))
+        try:
+            return evaluation.evaluate(expr).result
+        finally:
+            store.persist(session_key, definitions)
+
+    def recorded_names(self, record):
+        # every query also changes In, Out and $Line
+        definitions = Definitions()
+        definitions.set_user_definitions(record[2])
+        return sorted(name for name in definitions.user
+                      if name.startswith('Global`'))
+
+    def testSessions(self):
+        store = DefinitionsStore(definitions, 2, save=self.save)
+        self.evaluate(store, 'a', 'x = 1; Format[y] := "why"')
+        self.evaluate(store, 'b', 'x = 2')
+        self.assertIs(store.get('a', self.saved['a']),
+                      store.get('a', self.saved['a']))
+        self.assertEqual(self.evaluate(store, 'a', 'x'), '1')
+        self.assertEqual(self.evaluate(store, 'b', 'x'), '2')
+        self.assertEqual(self.evaluate(store, 'b', 'y'), 'y')
+
+        # evicts the least recently used session a, which was persisted by
+        # its queries
+        self.assertEqual(self.evaluate(store, 'c', 'x'), 'x')
+        self.assertEqual(list(store.sessions.keys()), ['b', 'c'])
+        self.assertEqual(self.evaluate(store, 'a', 'x'), '1')
+        self.assertEqual(self.evaluate(store, 'a', 'y'), 'why')
+
+    def testDeltas(self):
+        store = DefinitionsStore(definitions, 1, save=self.save)
+        self.evaluate(store, 'a', 'x = 1; y = 2')
+        self.evaluate(store, 'a', 'x + y')
+        self.evaluate(store, 'a', 'y = 3')
+        records = self.saved['a']
+        self.assertEqual(len(records), 3)
+        self.assertEqual(self.recorded_names(records[0]), ['Global`x', 'Global`y'])
+        self.assertEqual(self.recorded_names(records[1]), [])
+        self.assertEqual(records[2][1], [])
+        self.assertEqual(self.recorded_names(records[2]), ['Global`y'])
+
+        # nothing changed since
+        store.persist('a', store.get('a', records))
+        self.assertEqual(len(self.saved['a']), 3)
+
+        session = store.get('a', records)
+        session.reset_user_definition('Global`x')
+        store.persist('a', session)
+        self.assertEqual(self.saved['a'][-1][1], ['Global`x'])
+        self.assertEqual(self.recorded_names(self.saved['a'][-1]), [])
+
+        # another process, or this one after a restart
+        other = DefinitionsStore(definitions, 1, save=self.save)
+        self.assertEqual(self.evaluate(other, 'a', '{x, y}'), '{x, 3}')
+
+    def testCompaction(self):
+        store = DefinitionsStore(definitions, 1, save=self.save)
+        store.max_records = 3
+        for i in range(4):
+            self.evaluate(store, 'a', 'x%d = %d' % (i, i))
+        records = self.saved['a']
+        self.assertEqual(len(records), 1)
+        self.assertIsNone(records[0][1])
+        self.assertEqual(self.recorded_names(records[0]),
+                         ['Global`x0', 'Global`x1', 'Global`x2', 'Global`x3'])
+
+    def testProcesses(self):
+        first = DefinitionsStore(definitions, 1, save=self.save)
+        second = DefinitionsStore(definitions, 1, save=self.save)
+        self.evaluate(first, 'a', 'x = 1')
+        self.assertEqual(self.evaluate(second, 'a', 'x'), '1')
+        self.evaluate(second, 'a', 'x = 2; f[z_] := z ^ 2')
+        self.assertEqual(self.evaluate(first, 'a', 'f[x]'), '4')
+
+    def testLegacy(self):
+        session = definitions.overlay()
+        Evaluation(session, catch_interrupt=False).evaluate(
+            parse(session, SingleLineFeeder('x = 1; y = 2')))
+        self.saved['a'] = session.get_user_definitions()
+        store = DefinitionsStore(definitions, 1, save=self.save)
+        self.assertEqual(self.evaluate(store, 'a', 'y = x + y'), '3')
+        records = self.saved['a']
+        self.assertEqual(len(records), 1)
+        self.assertEqual(self.recorded_names(records[0]), ['Global`x', 'Global`y'])
+
+    def testSpill(self):
+        directory = tempfile.mkdtemp()
+        try:
+            store = DefinitionsStore(definitions, 1, spill_dir=directory,
+                                     save=self.save)
+            self.evaluate(store, 'a', 'f[x_] := x ^ 2')
+            self.assertEqual(os.listdir(directory), ['a.definitions'])
+            self.evaluate(store, 'b', 'x = 1')
+            self.assertEqual(sorted(os.listdir(directory)), ['a.definitions', 'b.definitions'])
+            self.assertEqual(self.evaluate(store, 'a', 'f[3]'), '9')
+            self.assertEqual(self.saved, {})
+
+            other = DefinitionsStore(definitions, 1, spill_dir=directory)
+            self.evaluate(other, 'a', 'f[x_] := x ^ 3')
+            self.assertEqual(self.evaluate(store, 'a', 'f[3]'), '27')
+        finally:
+            shutil.rmtree(directory)
+
+    def testRename(self):
+        directory = tempfile.mkdtemp()
+        try:
+            store = DefinitionsStore(definitions, 1, spill_dir=directory,
+                                     save=self.save)
+            self.evaluate(store, 'a', 'x = 1')
+            store.rename('a', 'b')
+            self.assertEqual(os.listdir(directory), ['b.definitions'])
+            self.assertEqual(self.evaluate(store, 'b', 'x'), '1')
+
+            # logging in after the session was evicted
+            self.evaluate(store, 'c', 'x')
+            store.rename('b', 'd')
+            self.assertEqual(sorted(os.listdir(directory)), ['c.definitions', 'd.definitions'])
+            self.assertEqual(self.evaluate(store, 'd', 'x'), '1')
+            self.assertEqual(self.evaluate(store, 'b', 'x'), 'x')
+            self.assertEqual(self.saved, {})
+        finally:
+            shutil.rmtree(directory)
+
+    def testRemoveExpired(self):
+        directory = tempfile.mkdtemp()
+        try:
+            store = DefinitionsStore(definitions, 1, spill_dir=directory,
+                                     max_age=3600)
+            self.evaluate(store, 'a', 'x = 1')
+            self.evaluate(store, 'b', 'x = 2')
+            old = time.time() - 7200
+            for name in ('a.definitions', 'b.definitions'):
+                os.utime(os.path.join(directory, name), (old, old))
+
+            # b is still in memory
+            store.remove_expired()
+            self.assertEqual(os.listdir(directory), ['b.definitions'])
+            self.assertEqual(self.evaluate(store, 'a', 'x'), 'x')
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()